@@ -0,0 +1,14 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'accessjobs.settings')
+# serve the async variants of the read-heavy pages (core.async_views)
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', '1')
+django_application = get_asgi_application()
+
+# Live notification streams are answered straight from the event loop
+from core.sse import NotificationStreamApp  # noqa: E402  (needs apps loaded)
+from core.sweeper import start_sweeper  # noqa: E402
+
+application = NotificationStreamApp(django_application)
+start_sweeper()  # no-op unless SWEEPER_INTERVAL is set; servers only, not commands
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -19,6 +20,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ProfilingMiddleware',  # only active with PROFILING_ENABLED
+    'core.middleware.CompressionMiddleware',  # gzip, or brotli when installed
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -39,10 +43,17 @@ TEMPLATES = [{
         'django.template.context_processors.request',
         'django.contrib.auth.context_processors.auth',
         'django.contrib.messages.context_processors.messages',
+        'core.sse.notification_stream_context',
     ]},
 }]
 
 WSGI_APPLICATION = 'accessjobs.wsgi.application'
+# Live notifications (/notifications/stream/) need the ASGI entry point,
+# e.g. `uvicorn accessjobs.asgi:application`; under WSGI pages leave them out.
+ASGI_APPLICATION = 'accessjobs.asgi.application'
+# Route home / job list / job detail / recommendations to core.async_views.
+# accessjobs.asgi switches this on; under WSGI the sync views are faster.
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS', '0') == '1'
 
 DATABASES = {
     'default': {
@@ -51,8 +62,105 @@ DATABASES = {
     }
 }
 
+# ----------------- READ REPLICAS -----------------
+# Views marked @read_replica (job list, recommendations, admin dashboard,
+# API lists) read from the DATABASE_REPLICAS aliases; writes and all other
+# reads use 'default' (core.routers). Locally, DB_REPLICAS=path[,path]
+# adds SQLite copies that `manage.py check_replicas --copy` refreshes.
+def replica_databases(primary, overrides):
+    """replica_1, replica_2, ... copying ``primary``'s settings with each override applied."""
+    return {
+        f'replica_{i}': {**primary, **override, 'TEST': {'MIRROR': 'default'}}
+        for i, override in enumerate(overrides, 1)
+    }
+
+DATABASES.update(replica_databases(
+    DATABASES['default'], [{'NAME': name} for name in os.environ.get('DB_REPLICAS', '').split(',') if name]
+))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# After writing, a user reads from the primary for this many seconds.
+REPLICA_PIN_SECONDS = 5
+# Seconds between health probes of each replica; a PostgreSQL replica
+# further behind than REPLICA_MAX_LAG seconds (None = no limit) is skipped.
+REPLICA_HEALTH_CHECK_INTERVAL = 10
+REPLICA_MAX_LAG = None
+
 
 AUTH_PASSWORD_VALIDATORS = []
+# request.user comes from the cache with its Profile attached (core.auth),
+# for sessions and for JWT-authenticated API calls alike. New logins record
+# the cached backend; ModelBackend stays listed so sessions created before
+# it keep working (uncached) instead of being logged out.
+AUTHENTICATION_BACKENDS = [
+    'core.auth.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CACHE_TIMEOUT = 300
+
+# ----------------- CACHING -----------------
+# Seconds a public page (home, job list, job detail) stays cached for
+# logged-out visitors; JobPosting changes invalidate it earlier.
+PUBLIC_PAGE_CACHE_TIMEOUT = 300
+# Seconds the catalog and similar-jobs versions behind those pages are cached;
+# writes clear them at once, this only bounds per-process (locmem) caches in
+# other workers.
+CATALOG_VERSION_CACHE_TIMEOUT = 10
+
+# ----------------- RATE LIMITING -----------------
+# Limits per client IP and per username/email, counted atomically in the
+# cache (per-process memory if the cache is unavailable). Override a scope's
+# rate with e.g. RATELIMITS = {'login': '20/m'}.
+# DJANGO_RATELIMIT=0 turns it off (loadtest_journeys does this for the
+# server it launches, since all its virtual users share one IP).
+RATELIMIT_ENABLED = os.environ.get('DJANGO_RATELIMIT', '1') == '1'
+RATELIMITS = {}
+RATELIMIT_TRUST_X_FORWARDED_FOR = False
+
+# ----------------- REQUEST PROFILING -----------------
+# Off by default. When on, every sync request is stack-sampled every
+# PROFILING_INTERVAL_MS and its SQL timed; a PROFILING_SAMPLE_RATE share
+# of requests, plus any slower than PROFILING_SLOW_MS, are kept in a ring
+# of PROFILING_BUFFER_SIZE cache slots shown at /admin/profiling/.
+PROFILING_ENABLED = os.environ.get('DJANGO_PROFILING', '0') == '1'
+PROFILING_SAMPLE_RATE = 0.01
+PROFILING_SLOW_MS = 500
+PROFILING_INTERVAL_MS = 5
+PROFILING_BUFFER_SIZE = 100
+PROFILING_MAX_QUERIES = 200
+
+# ----------------- AUDIT LOG RETENTION -----------------
+# `manage.py compact_audit_logs` moves older rows into monthly gzip archives.
+AUDIT_LOG_RETENTION_DAYS = 90
+AUDIT_ARCHIVE_DIR = BASE_DIR / 'archives' / 'audit'
+
+# ----------------- EXPIRED DATA SWEEPER -----------------
+# `manage.py sweep_expired` (cron, or --every N as its own process) or a
+# thread in each WSGI/ASGI server process every SWEEPER_INTERVAL seconds
+# (None = off) removes expired reset codes, read notifications older than
+# NOTIFICATION_RETENTION_DAYS and expired sessions.
+NOTIFICATION_RETENTION_DAYS = 30
+SWEEPER_INTERVAL = None
+SWEEPER_BATCH_SIZE = 1000
+
+# ----------------- RECOMMENDATIONS -----------------
+# The recommendations page shows each user's best RECOMMENDATION_TOP_K
+# postings from a list kept in the cache and updated one posting at a
+# time as jobs are posted, edited or deleted (core.recommender).
+RECOMMENDATION_TOP_K = 50
+RECOMMENDATION_TOP_K_TIMEOUT = 24 * 60 * 60
+# `manage.py train_recommender` writes collaborative-filtering factors
+# learned from applications and bookmarks; their scores are blended with
+# the skill match at RECOMMENDER_CF_WEIGHT (needs NumPy).
+RECOMMENDER_MODEL_PATH = BASE_DIR / 'models' / 'collaborative.npz'
+RECOMMENDER_CF_WEIGHT = 0.3
+# Similar postings listed on each job page, kept in core_similarjob
+# (`manage.py build_similar_jobs` fills it once; signals keep it current).
+SIMILAR_JOBS_COUNT = 5
+# A new posting whose title/company/description shingles overlap an older
+# one at least this much (Jaccard) is marked as its duplicate and hidden
+# from listings (core.dedupe; `manage.py dedupe_jobs` for the backlog).
+DUPLICATE_JOB_THRESHOLD = 0.8
 
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -66,6 +174,11 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 # ----------------- MEDIA FILES (Uploads) -----------------
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Uploads always spool to disk and are cut off past their field's limit
+# (core.uploads); profile-picture thumbnails render on a small thread pool.
+FILE_UPLOAD_HANDLERS = ['core.uploads.LimitedUploadHandler']
+UPLOAD_SIZE_LIMITS = {'profile_picture': 5 * 1024 * 1024, 'resume': 10 * 1024 * 1024}
+THUMBNAIL_WORKERS = 2
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'core.User'
@@ -87,7 +200,7 @@ DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.auth.CachedJWTAuthentication",
     ],
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
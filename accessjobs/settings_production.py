@@ -0,0 +1,109 @@
+# Production profile: DJANGO_SETTINGS_MODULE=accessjobs.settings_production
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, replica_databases
+
+DEBUG = False
+# the base settings' key is public; sessions and reset codes signed with it can be forged
+SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY")
+if not SECRET_KEY:
+    raise ImproperlyConfigured("Set DJANGO_SECRET_KEY for the production profile.")
+ALLOWED_HOSTS = [h for h in os.environ.get("DJANGO_ALLOWED_HOSTS", "localhost").split(",") if h]
+
+# ----------------- DATABASE -----------------
+# DB_ENGINE=sqlite (default) or postgres. Persistent connections are kept
+# for CONN_MAX_AGE seconds; with DB_POOL=1 (PostgreSQL only) psycopg's
+# connection pool is used instead, which Django requires CONN_MAX_AGE=0 for.
+# DB_REPLICAS lists read replicas: host[:port][/name] entries for
+# PostgreSQL, file paths for SQLite.
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+DB_REPLICAS = [entry for entry in os.environ.get("DB_REPLICAS", "").split(",") if entry]
+
+if DB_ENGINE == "postgres":
+    DB_POOL = os.environ.get("DB_POOL", "0") == "1"
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DB_NAME", "accessjobs"),
+            "USER": os.environ.get("DB_USER", "accessjobs"),
+            "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+            "HOST": os.environ.get("DB_HOST", "localhost"),
+            "PORT": os.environ.get("DB_PORT", "5432"),
+            "CONN_MAX_AGE": 0 if DB_POOL else CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.environ.get("DB_POOL_MIN", "2")),
+                    "max_size": int(os.environ.get("DB_POOL_MAX", "20")),
+                    "timeout": 10,
+                },
+            } if DB_POOL else {},
+        }
+    }
+    replicas = []
+    for entry in DB_REPLICAS:
+        address, _, name = entry.partition("/")
+        host, _, port = address.partition(":")
+        override = {"HOST": host, "PORT": port or DATABASES["default"]["PORT"]}
+        if name:
+            override["NAME"] = name
+        replicas.append(override)
+else:
+    # WAL lets readers run alongside the single writer; IMMEDIATE
+    # transactions take the write lock up front instead of failing on
+    # upgrade, and the busy timeout makes writers queue rather than raise
+    # "database is locked".
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DB_NAME", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", "20")),
+                "transaction_mode": "IMMEDIATE",
+                "init_command": (
+                    "PRAGMA journal_mode=WAL;"
+                    "PRAGMA synchronous=NORMAL;"
+                    "PRAGMA temp_store=MEMORY;"
+                    "PRAGMA cache_size=-20000;"
+                ),
+            },
+        }
+    }
+    replicas = [{"NAME": name} for name in DB_REPLICAS]
+
+DATABASES.update(replica_databases(DATABASES["default"], replicas))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+
+# ----------------- CACHE & SESSIONS -----------------
+# REDIS_URL gives every worker process one shared cache (sessions, cached
+# users, page cache, rate limits); without it each process has its own
+# memory cache and only sees its own invalidations.
+# Sessions then come from the cache (cached_db: written through to the
+# database), so they don't query django_session per request; without a
+# shared cache they stay in the database. Never in a signed cookie: the
+# password-reset flow keeps its verified user in the session, and a
+# client-side session can be replayed. SESSION_STORE overrides: cached_db,
+# cache or db.
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+SESSION_STORE = os.environ.get("SESSION_STORE", "cached_db" if REDIS_URL else "db")
+SESSION_ENGINE = {
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "db": "django.contrib.sessions.backends.db",
+}[SESSION_STORE]
+# A per-process cache can't hear about a password change or profile edit
+# made in another worker, so cached users expire sooner without Redis.
+USER_CACHE_TIMEOUT = int(os.environ.get("USER_CACHE_TIMEOUT", "300" if REDIS_URL else "30"))
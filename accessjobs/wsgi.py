@@ -3,3 +3,8 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'accessjobs.settings')
 application = get_wsgi_application()
+
+# only server processes sweep, not migrate/shell/other commands
+from core.sweeper import start_sweeper  # noqa: E402  (needs apps loaded)
+
+start_sweeper()  # no-op unless SWEEPER_INTERVAL is set
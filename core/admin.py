@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     User, Profile, JobPosting, Application,
-    Bookmark, AuditLog, RecommendationAudit
+    Bookmark, AuditLog, AuditLogArchive, RecommendationAudit, Skill, SkillAlias
 )
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
@@ -34,7 +34,21 @@ class AuditLogAdmin(admin.ModelAdmin):
     list_display = ("action", "user", "created_at")
     search_fields = ("action", "user__username")
 
+@admin.register(AuditLogArchive)
+class AuditLogArchiveAdmin(admin.ModelAdmin):
+    list_display = ("month", "row_count", "path", "updated_at")
+
 @admin.register(RecommendationAudit)
 class RecommendationAuditAdmin(admin.ModelAdmin):
     list_display = ("user", "job", "match_score", "created_at")
     search_fields = ("user__username", "job__title", "explanation")
+
+class SkillAliasInline(admin.TabularInline):
+    model = SkillAlias
+    extra = 1
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ("display_name", "name")
+    search_fields = ("name", "display_name", "aliases__alias")
+    inlines = [SkillAliasInline]
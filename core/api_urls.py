@@ -1,11 +1,13 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from . import api_views
+from .ratelimit import ratelimit
 
 urlpatterns = [
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/', ratelimit('token', '10/m', fields=('username',))(TokenObtainPairView.as_view()), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('jobs/', api_views.JobListCreateView.as_view(), name='api_jobs'),
     path('jobs/<int:pk>/', api_views.JobRetrieveUpdateDestroyView.as_view(), name='api_job_detail'),
     path('applications/', api_views.ApplicationListCreateView.as_view(), name='api_applications'),
+    path('recommendations/', api_views.RecommendationListView.as_view(), name='api_recommendations'),
 ]
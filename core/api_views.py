@@ -1,20 +1,56 @@
+import base64
+import hashlib
+
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags, quote_etag
 from rest_framework import generics, filters, permissions
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from .models import JobPosting, Application
-from .serializers import JobPostingSerializer, ApplicationSerializer
+from .serializers import (
+    JobPostingSerializer, JobPostingListSerializer, ApplicationSerializer,
+    RecommendationSerializer, serialize_values, only_paths,
+)
+from .routers import read_replica
+from .structured import filter_jobs
+from .recommender import recommend_jobs, recommendation_version, parse_filters
 
+@method_decorator(read_replica, name='dispatch')
 class JobListCreateView(generics.ListCreateAPIView):
-    queryset = JobPosting.objects.all().order_by('-created_at')
+    queryset = JobPosting.objects.filter(duplicate_of__isnull=True).order_by('-created_at')
     serializer_class = JobPostingSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ['title','location','company']
 
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return JobPostingListSerializer
+        return JobPostingSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related('created_by')
+        if self.request.method == 'GET':
+            # salary_min / salary_max / salary_currency / location / near + radius
+            queryset = filter_jobs(queryset, self.request.query_params)
+            queryset = queryset.only(*only_paths(self.get_serializer()))
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        # fast path: plain dicts from values(), no model instances
+        return Response(list(serialize_values(self.get_serializer(), queryset)))
+
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
 class JobRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = JobPosting.objects.all()
+    queryset = JobPosting.objects.select_related('created_by')
     serializer_class = JobPostingSerializer
 
+@method_decorator(read_replica, name='dispatch')
 class ApplicationListCreateView(generics.ListCreateAPIView):
     serializer_class = ApplicationSerializer
 
@@ -23,3 +59,78 @@ class ApplicationListCreateView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+@method_decorator(read_replica, name='dispatch')
+class RecommendationListView(generics.GenericAPIView):
+    """
+    Scored recommendations for the current user, using the same engine as
+    the HTML page. Responses carry a strong ETag built from the profile,
+    catalog and application versions so unchanged lists answer 304.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = RecommendationSerializer
+    cursor_query_param = 'cursor'
+    page_size = 20
+    max_page_size = 100
+
+    def get_etag(self, request):
+        parts = recommendation_version(request.user) + (request.get_full_path(),)
+        digest = hashlib.sha256(repr(parts).encode()).hexdigest()
+        return quote_etag(digest)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get('page_size', self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    # cursor = position of the last item sent, as (score, job id); the list is
+    # ordered by score desc, job id asc so the cursor stays valid across pages
+    def encode_cursor(self, rec):
+        raw = f"{rec['score']}:{rec['job'].id}".encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            score, job_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+            return int(score), int(job_id)
+        except (ValueError, TypeError):
+            raise NotFound('Invalid cursor')
+
+    def paginate(self, request, recommendations):
+        after = self.decode_cursor(request)
+        if after is not None:
+            recommendations = [
+                rec for rec in recommendations
+                if (-rec['score'], rec['job'].id) > (-after[0], after[1])
+            ]
+        size = self.get_page_size(request)
+        page = recommendations[:size]
+        next_url = None
+        if len(recommendations) > size:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), self.cursor_query_param, self.encode_cursor(page[-1])
+            )
+        return page, next_url
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache', 'Vary': 'Authorization'}
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or if_none_match == ['*']:
+            return Response(status=304, headers=headers)
+
+        recommendations, facet_counts = recommend_jobs(request.user, parse_filters(request.query_params))
+        page, next_url = self.paginate(request, recommendations)
+        serializer = self.get_serializer(page, many=True)
+        return Response({
+            'count': len(recommendations),
+            'next': next_url,
+            'facets': facet_counts,
+            'results': serializer.data,
+        }, headers=headers)
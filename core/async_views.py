@@ -0,0 +1,81 @@
+from django.contrib.auth.decorators import login_required
+from django.http import Http404
+from django.shortcuts import render
+
+from .caching import anonymous_page_cache
+from .concurrency import aload_user, gather_reads
+from .models import JobPosting
+from .routers import read_replica
+from .similarity import neighbours_version
+from .recommender import recommend_jobs, parse_filters, top_k_size
+from .views import user_job_ids, search_jobs, similar_jobs
+
+# --------------------------------------------------
+# Async variants of the read-heavy pages
+# --------------------------------------------------
+# Routed instead of their views.py counterparts when settings.ASYNC_VIEWS
+# is on (the ASGI entry point turns it on). Same templates and context;
+# the job query and the user's applied / bookmarked ids are fetched
+# concurrently and the event loop stays free while they run.
+
+
+@anonymous_page_cache
+async def home(request):
+    user = await aload_user(request)
+    jobs, applied_ids, bookmarked_ids = await gather_reads(
+        JobPosting.objects.filter(duplicate_of__isnull=True).order_by('-created_at')[:5], *user_job_ids(user)
+    )
+    return render(request, "core/home.html", {
+        "jobs": jobs,
+        "applied_ids": set(applied_ids or ()),
+        "bookmarked_ids": set(bookmarked_ids or ()),
+    })
+
+
+@anonymous_page_cache
+@read_replica
+async def job_list(request):
+    user = await aload_user(request)
+    jobs, applied_ids, bookmarked_ids = await gather_reads(search_jobs(request.GET), *user_job_ids(user))
+    return render(request, "core/job_list.html", {
+        "jobs": jobs,
+        "query": request.GET.get("q", ""),
+        "location": request.GET.get("location", ""),
+        "company": request.GET.get("company", ""),
+        "skill": request.GET.get("skill", ""),
+        "applied_ids": set(applied_ids or ()),
+        "bookmarked_ids": set(bookmarked_ids or ()),
+    })
+
+
+@anonymous_page_cache(version=neighbours_version)
+async def job_detail(request, job_id):
+    user = await aload_user(request)
+    jobs, similar, applied_ids, bookmarked_ids = await gather_reads(
+        JobPosting.objects.filter(id=job_id), similar_jobs(job_id), *user_job_ids(user, job_id)
+    )
+    if not jobs:
+        raise Http404("No JobPosting matches the given query.")
+    return render(request, "core/job_detail.html", {
+        "job": jobs[0],
+        "similar_jobs": similar,
+        "applied_ids": set(applied_ids or ()),
+        "bookmarked_ids": set(bookmarked_ids or ()),
+    })
+
+
+@login_required
+@read_replica
+async def recommendations(request):
+    user = await aload_user(request)
+    filters = parse_filters(request.GET)
+    (recs, facet_counts), applied_ids, bookmarked_ids = await gather_reads(
+        lambda: recommend_jobs(user, filters, limit=top_k_size()), *user_job_ids(user)
+    )
+    return render(request, "core/recommendations.html", {
+        "recommendations": recs,
+        "applied_ids": set(applied_ids or ()),
+        "bookmarked_ids": set(bookmarked_ids or ()),
+        "filters": filters,
+        "facet_counts": facet_counts,
+    })
@@ -0,0 +1,129 @@
+import gzip
+import json
+import os
+from itertools import takewhile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditLog, AuditLogArchive
+
+# --------------------------------------------------
+# Audit log archives: old AuditLog rows are moved into gzip-compressed
+# JSON-lines files, one per compacted batch, each recorded by an
+# AuditLogArchive row. Readers only open recorded files.
+# --------------------------------------------------
+EXPORT_FIELDS = ("id", "created_at", "user_id", "user__username", "action", "extra_data")
+
+
+def archive_dir():
+    return Path(getattr(settings, "AUDIT_ARCHIVE_DIR", settings.BASE_DIR / "archives" / "audit"))
+
+
+def month_start(value):
+    return value.date().replace(day=1)
+
+
+def row_to_json(row):
+    return json.dumps(row, cls=DjangoJSONEncoder, separators=(",", ":"))
+
+
+def write_archive(month, rows):
+    """
+    Write ``rows`` (dicts of EXPORT_FIELDS) to a new archive file for the
+    month. It is written under a temporary name, synced and renamed into
+    place, so the file exists whole or not at all.
+    """
+    directory = archive_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"audit-{month:%Y-%m}-{rows[0]['id']}-{rows[-1]['id']}.jsonl.gz"
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as raw:
+        with gzip.open(raw, "wt", encoding="utf-8") as fh:
+            for row in rows:
+                fh.write(row_to_json(row) + "\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+    # make the rename itself durable before the rows are deleted
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return path
+
+
+def _archived_date(line):
+    created_at = parse_datetime(json.loads(line)["created_at"])
+    if timezone.is_aware(created_at):
+        created_at = timezone.localtime(created_at)
+    return created_at.date()
+
+
+def iter_archived_lines(since=None, until=None):
+    """
+    Yield archived JSON lines for rows created within [since, until]
+    (dates, compared in the current time zone like created_at__date).
+    """
+    archives = AuditLogArchive.objects.all()
+    if since:
+        archives = archives.filter(month__gte=since.replace(day=1))
+    if until:
+        archives = archives.filter(month__lte=until)
+    for archive in archives:
+        path = Path(archive.path)
+        if not path.exists():
+            continue
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                # an archive covers part or all of a month, which can run past either end
+                if since or until:
+                    created = _archived_date(line)
+                    if (since and created < since) or (until and created > until):
+                        continue
+                yield line
+
+
+def iter_live_lines(queryset, chunk_size=2000):
+    for row in queryset.order_by("id").values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size):
+        yield row_to_json(row) + "\n"
+
+
+def compact(cutoff, batch_size=5000, dry_run=False, stdout=None):
+    """
+    Move AuditLog rows created before ``cutoff`` into the archives, one
+    batch per transaction so the write lock is never held for long. A batch
+    stays within one month and its file is durably written before the
+    transaction that deletes its rows and records the file. A crash in
+    between leaves an unrecorded file that readers skip and the next run
+    overwrites, and the rows still in the database.
+    """
+    moved = 0
+    last_id = 0
+    while True:
+        batch = list(
+            AuditLog.objects.filter(created_at__lt=cutoff, id__gt=last_id)
+            .order_by("id")
+            .values(*EXPORT_FIELDS)[:batch_size]
+        )
+        if not batch:
+            break
+        month = month_start(batch[0]["created_at"])
+        batch = list(takewhile(lambda row: month_start(row["created_at"]) == month, batch))
+        last_id = batch[-1]["id"]
+
+        if not dry_run:
+            path = write_archive(month, batch)
+            with transaction.atomic():
+                AuditLog.objects.filter(id__in=[row["id"] for row in batch]).delete()
+                AuditLogArchive.objects.create(month=month, path=str(path), row_count=len(batch))
+
+        moved += len(batch)
+        if stdout is not None:
+            stdout.write(f"{'would move' if dry_run else 'moved'} {moved} rows (up to id {last_id})")
+    return moved
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+# --------------------------------------------------
+# Cached request.user
+# --------------------------------------------------
+# Session and JWT authentication load request.user from the cache, with
+# its Profile attached, instead of querying both on every request. Saving
+# or deleting either row drops the entry once the transaction commits,
+# so a concurrent request can't put the old row back.
+
+USER_KEY = "core:user:{}"
+
+
+def user_cache_timeout():
+    return getattr(settings, "USER_CACHE_TIMEOUT", 300)
+
+
+def cached_user(user_id):
+    """The user with ``profile`` already loaded, or None if there is no such user."""
+    key = USER_KEY.format(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.select_related("profile").filter(pk=user_id).first()
+        if user is not None:
+            cache.set(key, user, user_cache_timeout())
+    return user
+
+
+def forget_user(user_id):
+    transaction.on_commit(lambda: cache.delete(USER_KEY.format(user_id)))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        user = cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_FIELD not in ("id", "pk") or getattr(api_settings, "CHECK_REVOKE_TOKEN", False):
+            return super().get_user(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = cached_user(user_id) if user_id is not None else None
+        if user is None or (api_settings.CHECK_USER_IS_ACTIVE and not user.is_active):
+            return super().get_user(validated_token)  # raises the usual errors
+        return user
@@ -0,0 +1,127 @@
+import hashlib
+from functools import partial, wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .concurrency import aload_user
+from .models import JobPosting
+from .recommender import cached_catalog_version
+
+# --------------------------------------------------
+# Anonymous page cache for the public job pages
+# --------------------------------------------------
+# Keys embed the catalog version, so any JobPosting save/delete (which bumps
+# the version) invalidates every cached page at once without a key scan. The
+# version is itself read from the cache, so a hit makes no queries.
+# A view can add its own version, e.g. the job page's similar-jobs list,
+# which changes without a catalog bump.
+
+
+def _cacheable(request):
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if request.user.is_authenticated:
+        return False
+    # a flash message queued for this visitor would be baked into the page
+    return len(get_messages(request)) == 0
+
+
+def page_cache_key(request, version, extra=None):
+    query = sorted(request.GET.lists())
+    raw = f"{version}:{extra}:{request.path}:{query}"
+    return "core:page:" + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def newest_posting_timestamp(version):
+    """Unix time of the newest JobPosting.created_at, cached per catalog version."""
+    key = f"core:page:last_modified:{version}"
+    timestamp = cache.get(key)
+    if timestamp is None:
+        newest = JobPosting.objects.aggregate(newest=Max("created_at"))["newest"]
+        timestamp = int(newest.timestamp()) if newest else 0
+        cache.set(key, timestamp, None)
+    return timestamp
+
+
+def _validators(request, page_version=None, args=(), kwargs=None):
+    """(cache key, ETag, Last-Modified) for a cacheable request, else None."""
+    if not _cacheable(request):
+        return None
+    version = cached_catalog_version()
+    extra = page_version(*args, **(kwargs or {})) if page_version else None
+    key = page_cache_key(request, version, extra)
+    return key, quote_etag(key.rsplit(":", 1)[-1]), newest_posting_timestamp(version)
+
+
+def _finish(response, etag, last_modified):
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=60)
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+def _storable(response):
+    return response.status_code == 200 and not response.cookies
+
+
+def anonymous_page_cache(view_func=None, *, version=None):
+    """
+    Serve logged-out GET requests from the cache, answering conditional
+    requests with 304 from ETag / Last-Modified before touching the view.
+    Authenticated users always get a fresh render. Works on sync and async
+    views. ``version``, called with the view's URL arguments, adds a token
+    of its own to the cache key.
+    """
+    if view_func is None:
+        return partial(anonymous_page_cache, version=version)
+    timeout = getattr(settings, "PUBLIC_PAGE_CACHE_TIMEOUT", 300)
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            user = await aload_user(request)
+            validators = None
+            if not user.is_authenticated:
+                validators = await sync_to_async(_validators)(request, version, args, kwargs)
+            if validators is None:
+                return await view_func(request, *args, **kwargs)
+
+            key, etag, last_modified = validators
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified or None)
+            if response is None:
+                response = await cache.aget(key)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    if not _storable(response):
+                        return response
+                    await cache.aset(key, response, timeout)
+            return _finish(response, etag, last_modified)
+
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        validators = _validators(request, version, args, kwargs)
+        if validators is None:
+            return view_func(request, *args, **kwargs)
+
+        key, etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified or None)
+        if response is None:
+            response = cache.get(key)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                if not _storable(response):
+                    return response
+                cache.set(key, response, timeout)
+        return _finish(response, etag, last_modified)
+
+    return wrapper
@@ -0,0 +1,191 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+try:
+    import numpy as np
+except ImportError:  # optional: recommendations fall back to skill matching only
+    np = None
+
+from .models import Application, Bookmark
+
+# --------------------------------------------------
+# Collaborative filtering from applications and bookmarks
+# --------------------------------------------------
+# `manage.py train_recommender` factorizes the implicit-feedback matrix
+# (users x postings; an application counts 1, a bookmark 0.5) with
+# alternating least squares and saves both factor matrices to
+# RECOMMENDER_MODEL_PATH. Web processes keep the factors in memory and
+# score a user against every posting with one matrix-vector product.
+# Users the model has not seen are placed at the mean of the users who
+# share a skill with them ("people with your profile").
+
+FEEDBACK_WEIGHTS = {"application": 1.0, "bookmark": 0.5}
+MAX_NEIGHBOURS = 500
+
+
+def load_feedback():
+    """{(user_id, job_id): weight} summed over applications and bookmarks."""
+    feedback = {}
+    for model, weight in ((Application, FEEDBACK_WEIGHTS["application"]), (Bookmark, FEEDBACK_WEIGHTS["bookmark"])):
+        for pair in model.objects.values_list("user_id", "job_id").iterator():
+            feedback[pair] = feedback.get(pair, 0.0) + weight
+    return feedback
+
+
+def _csr(rows, cols, values, n_rows):
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, cols[order], values[order]
+
+
+class Interactions:
+    """The feedback matrix in compressed rows, once per user and once per posting."""
+
+    def __init__(self, feedback):
+        pairs = list(feedback)
+        self.user_ids = np.unique(np.fromiter((u for u, _ in pairs), dtype=np.int64, count=len(pairs)))
+        self.job_ids = np.unique(np.fromiter((j for _, j in pairs), dtype=np.int64, count=len(pairs)))
+        rows = np.searchsorted(self.user_ids, np.fromiter((u for u, _ in pairs), dtype=np.int64, count=len(pairs)))
+        cols = np.searchsorted(self.job_ids, np.fromiter((j for _, j in pairs), dtype=np.int64, count=len(pairs)))
+        values = np.fromiter(feedback.values(), dtype=np.float64, count=len(pairs))
+        self.by_user = _csr(rows, cols, values, len(self.user_ids))
+        self.by_job = _csr(cols, rows, values, len(self.job_ids))
+
+    def __len__(self):
+        return len(self.by_user[1])
+
+
+def _solve_rows(fixed, gram, csr, out, start, stop, alpha):
+    # x_u = (YtY + Yu^T (Cu - I) Yu)^-1 Yu^T Cu p_u  (Hu, Koren & Volinsky 2008)
+    indptr, indices, values = csr
+    for row in range(start, stop):
+        lo, hi = indptr[row], indptr[row + 1]
+        if lo == hi:
+            out[row] = 0.0
+            continue
+        factors = fixed[indices[lo:hi]]
+        confidence = alpha * values[lo:hi]
+        a = gram + (factors.T * confidence) @ factors
+        b = factors.T @ (1.0 + confidence)
+        out[row] = np.linalg.solve(a, b)
+
+
+def _half_step(pool, fixed, csr, out, regularization, alpha, workers):
+    gram = fixed.T @ fixed + regularization * np.eye(fixed.shape[1])
+    bounds = np.linspace(0, len(out), workers + 1, dtype=int)
+    futures = [
+        pool.submit(_solve_rows, fixed, gram, csr, out, start, stop, alpha)
+        for start, stop in zip(bounds[:-1], bounds[1:]) if start < stop
+    ]
+    for future in futures:
+        future.result()
+
+
+def train_als(interactions, factors=32, iterations=15, regularization=0.1, alpha=20.0, workers=None, seed=0):
+    """
+    Implicit-feedback ALS. Rows of each half-step are split across a thread
+    pool; NumPy releases the GIL inside its linear algebra, so the solves
+    run on every core. Returns (user_factors, job_factors).
+    """
+    workers = workers or os.cpu_count() or 1
+    rng = np.random.default_rng(seed)
+    user_factors = rng.normal(scale=0.01, size=(len(interactions.user_ids), factors))
+    job_factors = rng.normal(scale=0.01, size=(len(interactions.job_ids), factors))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="als") as pool:
+        for _ in range(iterations):
+            _half_step(pool, job_factors, interactions.by_user, user_factors, regularization, alpha, workers)
+            _half_step(pool, user_factors, interactions.by_job, job_factors, regularization, alpha, workers)
+    return user_factors, job_factors
+
+
+def model_path():
+    return str(getattr(settings, "RECOMMENDER_MODEL_PATH", settings.BASE_DIR / "models" / "collaborative.npz"))
+
+
+def save_model(interactions, user_factors, job_factors, path=None):
+    path = path or model_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npz")
+    with os.fdopen(fd, "wb") as fh:
+        np.savez(
+            fh,
+            user_ids=interactions.user_ids,
+            job_ids=interactions.job_ids,
+            user_factors=user_factors.astype(np.float32),
+            job_factors=job_factors.astype(np.float32),
+        )
+    os.replace(tmp, path)  # readers never see a half-written file
+    return path
+
+
+class FactorModel:
+    def __init__(self, user_ids, job_ids, user_factors, job_factors, version=None):
+        self.version = version
+        self.user_row = {int(user_id): row for row, user_id in enumerate(user_ids)}
+        self.job_ids = job_ids
+        self.job_row = {int(job_id): row for row, job_id in enumerate(job_ids)}
+        self.user_factors = user_factors
+        self.job_factors = job_factors
+
+    @classmethod
+    def load(cls, path, version=None):
+        with np.load(path) as data:
+            return cls(data["user_ids"], data["job_ids"], data["user_factors"], data["job_factors"], version)
+
+    def user_vector(self, user_id, neighbour_ids=()):
+        """The user's factors, or the mean of their neighbours' for an unseen user."""
+        row = self.user_row.get(user_id)
+        if row is not None:
+            return self.user_factors[row]
+        rows = [self.user_row[n] for n in neighbour_ids if n in self.user_row][:MAX_NEIGHBOURS]
+        if not rows:
+            return None
+        return self.user_factors[rows].mean(axis=0)
+
+    def scores(self, vector):
+        """Predicted preference for every posting in the model, clipped to [0, 1]."""
+        return np.clip(self.job_factors @ vector, 0.0, 1.0)
+
+    def score_for(self, scores, job_id):
+        row = self.job_row.get(job_id)
+        return 0.0 if row is None else float(scores[row])
+
+    def ranked_jobs(self, scores, minimum=0.0):
+        """(job_id, score) pairs at or above ``minimum``, best first."""
+        rows = np.flatnonzero(scores >= minimum)
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+        return ((int(self.job_ids[row]), float(scores[row])) for row in rows)
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def model_version():
+    """mtime of the saved factors, or 0 when there is no model."""
+    try:
+        return os.stat(model_path()).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def get_model():
+    """The trained factors, reloaded after each training run; None without a model or NumPy."""
+    global _model
+    if np is None:
+        return None
+    version = model_version()
+    if not version:
+        return None
+    model = _model
+    if model is None or model.version != version:
+        with _model_lock:
+            if _model is None or _model.version != version:
+                _model = FactorModel.load(model_path(), version=version)
+            model = _model
+    return model
@@ -0,0 +1,42 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+# --------------------------------------------------
+# Concurrent reads for async views
+# --------------------------------------------------
+# Django's async ORM hands every query to the request's thread-sensitive
+# executor, so awaiting several querysets together still runs them one
+# after another on a single thread. gather_reads() evaluates independent,
+# read-only work on separate pool threads (each with its own DB
+# connection) so their I/O overlaps. Connections are recycled around each
+# call the same way Django does around a request, so CONN_MAX_AGE applies.
+
+
+async def aload_user(request):
+    """
+    Resolve request.user without blocking the event loop. Templates read
+    ``user`` synchronously, so the resolved object replaces the lazy one.
+    """
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+def _run(job):
+    close_old_connections()
+    try:
+        if job is None:
+            return None
+        return job() if callable(job) else list(job)
+    finally:
+        close_old_connections()
+
+
+async def gather_reads(*jobs):
+    """
+    Run each job concurrently and return the results in order. A job is a
+    queryset (evaluated to a list), a zero-argument callable, or None.
+    """
+    return await asyncio.gather(*(sync_to_async(_run, thread_sensitive=False)(job) for job in jobs))
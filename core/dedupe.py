@@ -0,0 +1,168 @@
+import hashlib
+import random
+import re
+import struct
+
+from django.conf import settings
+from django.db.models import Q
+
+try:
+    import numpy as np
+except ImportError:  # optional: signatures are computed in pure Python
+    np = None
+
+from .models import JobLSHBucket, JobPosting
+
+# --------------------------------------------------
+# Near-duplicate postings (MinHash + LSH)
+# --------------------------------------------------
+# A posting's title, company and description are cut into word 3-gram
+# shingles and summarised by a 128-value MinHash signature. The signature
+# is split into 16 bands of 8 values and each band hashed into a bucket
+# (JobLSHBucket, indexed on band + bucket). Postings sharing any bucket
+# are candidates; only those are compared exactly, so a new posting is
+# checked with one indexed lookup instead of a catalog scan. With 16x8
+# bands, pairs above ~0.7 Jaccard almost always share a bucket.
+#
+# A confirmed duplicate points at the oldest posting of its group through
+# duplicate_of and is left out of listings and recommendations.
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MERSENNE = (1 << 31) - 1
+
+_WORD = re.compile(r"\w+")
+_rng = random.Random(20240917)  # fixed: stored buckets must stay comparable
+_PERMUTATIONS = [(_rng.randrange(1, MERSENNE), _rng.randrange(0, MERSENNE)) for _ in range(NUM_PERM)]
+if np is not None:
+    _A = np.array([a for a, _ in _PERMUTATIONS], dtype=np.uint64)[:, None]
+    _B = np.array([b for _, b in _PERMUTATIONS], dtype=np.uint64)[:, None]
+
+
+def duplicate_threshold():
+    return getattr(settings, "DUPLICATE_JOB_THRESHOLD", 0.8)
+
+
+def shingles(title, company, description):
+    words = _WORD.findall(f"{title} {company} {description}".lower())
+    if len(words) < SHINGLE_SIZE:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = (" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    return {int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), "little") for g in grams}
+
+
+def signature(shingle_set):
+    if not shingle_set:
+        return None
+    if np is not None:
+        x = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+        return ((_A * x + _B) % MERSENNE).min(axis=1).tolist()
+    return [min((a * x + b) % MERSENNE for x in shingle_set) for a, b in _PERMUTATIONS]
+
+
+def buckets(sig):
+    """[(band, bucket)] for a signature; bucket ids fit a signed 64-bit column."""
+    out = []
+    for band in range(BANDS):
+        packed = struct.pack(f"<{ROWS}I", *sig[band * ROWS:(band + 1) * ROWS])
+        digest = hashlib.blake2b(packed, digest_size=8).digest()
+        out.append((band, int.from_bytes(digest, "little") & ((1 << 63) - 1)))
+    return out
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _job_shingles(row):
+    return shingles(row["title"], row["company"], row["description"])
+
+
+def index_job(job):
+    """
+    Store ``job``'s LSH buckets and mark it as a duplicate of the oldest
+    matching posting, or clear the mark if it no longer matches. Returns
+    the canonical posting's id or None.
+    """
+    own = shingles(job.title, job.company, job.description)
+    sig = signature(own)
+    JobLSHBucket.objects.filter(job=job).delete()
+    canonical = None
+    if sig is not None:
+        keys = buckets(sig)
+        JobLSHBucket.objects.bulk_create(JobLSHBucket(job=job, band=band, bucket=bucket) for band, bucket in keys)
+        match = Q()
+        for band, bucket in keys:
+            match |= Q(band=band, bucket=bucket)
+        candidate_ids = set(
+            JobLSHBucket.objects.filter(match).exclude(job=job).values_list("job_id", flat=True)
+        )
+        candidates = JobPosting.objects.filter(id__in=candidate_ids, id__lt=job.pk).values(
+            "id", "title", "company", "description", "duplicate_of_id"
+        )
+        threshold = duplicate_threshold()
+        matches = [row for row in candidates if jaccard(own, _job_shingles(row)) >= threshold]
+        if matches:
+            oldest = min(matches, key=lambda row: row["id"])
+            canonical = oldest["duplicate_of_id"] or oldest["id"]
+
+    if canonical != job.duplicate_of_id:
+        job.duplicate_of_id = canonical
+        JobPosting.objects.filter(pk=job.pk).update(duplicate_of=canonical)  # no second post_save
+    return canonical
+
+
+def promote_duplicate(duplicate_ids):
+    """After a canonical posting is deleted, its oldest duplicate takes its place."""
+    duplicate_ids = sorted(duplicate_ids)
+    if len(duplicate_ids) > 1:
+        JobPosting.objects.filter(id__in=duplicate_ids[1:]).update(duplicate_of=duplicate_ids[0])
+    return duplicate_ids[0] if duplicate_ids else None
+
+
+def find_duplicate_groups(rows, threshold=None):
+    """
+    {duplicate_id: canonical_id} over ``rows`` (dicts with id, title,
+    company, description), plus the buckets of every row. Candidates come
+    from in-memory LSH buckets; the oldest posting of a group is canonical.
+    """
+    threshold = duplicate_threshold() if threshold is None else threshold
+    table = {}
+    parent = {}
+    sets = {}
+    all_buckets = []
+
+    def find(job_id):
+        while parent[job_id] != job_id:
+            parent[job_id] = parent[parent[job_id]]
+            job_id = parent[job_id]
+        return job_id
+
+    for row in rows:
+        job_id = row["id"]
+        own = _job_shingles(row)
+        parent[job_id] = job_id
+        sig = signature(own)
+        if sig is None:
+            continue
+        sets[job_id] = own
+        seen = set()
+        for key in buckets(sig):
+            all_buckets.append((job_id, *key))
+            for other in table.get(key, ()):
+                if other in seen:
+                    continue
+                seen.add(other)
+                if jaccard(own, sets[other]) >= threshold:
+                    a, b = find(job_id), find(other)
+                    if a != b:
+                        parent[max(a, b)] = min(a, b)
+            table.setdefault(key, []).append(job_id)
+
+    groups = {job_id: find(job_id) for job_id in parent}
+    return {job_id: root for job_id, root in groups.items() if job_id != root}, all_buckets
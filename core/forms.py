@@ -1,6 +1,11 @@
+import os
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
+from django.db import transaction
+from django.template.defaultfilters import filesizeformat
 from .models import User, JobPosting, Profile
+from .uploads import schedule_thumbnails, store_deduplicated
 
 
 # ✅ Registration Form
@@ -92,3 +97,53 @@ class ProfileForm(forms.ModelForm):
             "skills": forms.Textarea(attrs={"rows": 2, "placeholder": "List your skills", "class": "form-control"}),
             "experience": forms.TextInput(attrs={"placeholder": "e.g. 2 years in Python", "class": "form-control"}),
         }
+
+    PICTURE_FORMATS = {"JPEG": ".jpg", "PNG": ".png", "GIF": ".gif", "WEBP": ".webp"}
+    MAX_PICTURE_PIXELS = 40_000_000
+    RESUME_EXTENSIONS = (".pdf", ".doc", ".docx", ".odt", ".rtf", ".txt")
+
+    def __init__(self, *args, rejected_uploads=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # fields LimitedUploadHandler stopped reading because they were too large
+        self.rejected_uploads = rejected_uploads or {}
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for field, limit in self.rejected_uploads.items():
+            if field in self.fields:
+                self.add_error(field, f"File is too large (maximum {filesizeformat(limit)}).")
+        return cleaned_data
+
+    def clean_profile_picture(self):
+        picture = self.cleaned_data.get("profile_picture")
+        image = getattr(picture, "image", None)  # only set on a fresh upload
+        if image is not None:
+            if image.format not in self.PICTURE_FORMATS:
+                raise forms.ValidationError("Upload a JPEG, PNG, GIF or WebP image.")
+            if image.width * image.height > self.MAX_PICTURE_PIXELS:
+                raise forms.ValidationError("Image dimensions are too large.")
+        return picture
+
+    def clean_resume(self):
+        resume = self.cleaned_data.get("resume")
+        if resume and "resume" in self.changed_data:
+            if os.path.splitext(resume.name)[1].lower() not in self.RESUME_EXTENSIONS:
+                raise forms.ValidationError("Upload a PDF, Word, ODT, RTF or text document.")
+        return resume
+
+    def save(self, commit=True):
+        profile = super().save(commit=False)
+        # new uploads are stored once per distinct content
+        picture = self.cleaned_data.get("profile_picture")
+        if "profile_picture" in self.changed_data and picture:
+            extension = self.PICTURE_FORMATS[picture.image.format]
+            profile.profile_picture = store_deduplicated(picture, "profile_pics", extension)
+            name = profile.profile_picture.name
+            transaction.on_commit(lambda: schedule_thumbnails(name))
+        resume = self.cleaned_data.get("resume")
+        if "resume" in self.changed_data and resume:
+            extension = os.path.splitext(resume.name)[1].lower()
+            profile.resume = store_deduplicated(resume, "resumes", extension)
+        if commit:
+            profile.save()
+        return profile
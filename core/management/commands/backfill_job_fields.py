@@ -0,0 +1,59 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.models import JobPosting
+from core.recommender import bump_catalog_version
+from core.structured import locate, parse_salary
+
+FIELDS = ("salary_min", "salary_max", "salary_currency", "location_key", "latitude", "longitude")
+
+
+class Command(BaseCommand):
+    help = (
+        "Parse every posting's salary and location text into the structured columns "
+        "(yearly salary range and currency, location key and gazetteer coordinates). "
+        "New and edited postings get them on save; this fills in existing rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        stats = Counter()
+        unresolved = Counter()
+        changed = []
+        start = time.perf_counter()
+
+        rows = JobPosting.objects.order_by("id").values("id", "salary", "location", *FIELDS)
+        for row in rows.iterator(chunk_size=batch_size):
+            values = dict(zip(FIELDS, (*parse_salary(row["salary"]), *locate(row["location"]))))
+            stats["postings"] += 1
+            stats["with salary"] += values["salary_min"] is not None or values["salary_max"] is not None
+            stats["geocoded"] += values["latitude"] is not None
+            if values["latitude"] is None and values["location_key"]:
+                unresolved[values["location_key"]] += 1
+            if any(row[field] != values[field] for field in FIELDS):
+                changed.append(JobPosting(id=row["id"], **values))
+
+        self.stdout.write(
+            f"Parsed {stats['postings']} postings in {time.perf_counter() - start:.1f}s: "
+            f"{stats['with salary']} with a salary, {stats['geocoded']} geocoded; {len(changed)} change."
+        )
+        for key, count in unresolved.most_common(10):
+            self.stdout.write(f"  not in the gazetteer: {key!r} ({count})")
+        if options["dry_run"] or not changed:
+            return
+
+        # bulk_update skips the save signals, which would re-parse every row
+        with transaction.atomic():
+            JobPosting.objects.bulk_update(changed, FIELDS, batch_size=batch_size)
+        with connection.cursor() as cursor:
+            # fresh statistics, so the planner picks the new indexes (SQLite has none until ANALYZE)
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(JobPosting._meta.db_table)}")
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f"Updated {len(changed)} postings."))
@@ -0,0 +1,145 @@
+import asyncio
+import resource
+import statistics
+import time
+from importlib import import_module
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Application, AuditLog, Bookmark, JobPosting, User
+
+BENCH_USERNAME = "bench_async_views"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput of the read-heavy pages (home, job list, job detail, "
+        "recommendations) between running servers, e.g. the ASGI build "
+        "(`uvicorn accessjobs.asgi:application`) and the WSGI build "
+        "(`gunicorn accessjobs.wsgi`). Requests are sent as a logged-in user so "
+        "the anonymous page cache does not answer them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target", action="append", metavar="LABEL=URL",
+            help="Server to benchmark (repeatable). Default: asgi=http://127.0.0.1:8000 wsgi=http://127.0.0.1:8001",
+        )
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 500])
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per target and concurrency level.")
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--paths", nargs="+", help="Paths to request in rotation (default: the four read-heavy pages).")
+
+    def handle(self, *args, **options):
+        targets = options["target"] or ["asgi=http://127.0.0.1:8000", "wsgi=http://127.0.0.1:8001"]
+        parsed = []
+        for target in targets:
+            label, _, url = target.partition("=")
+            url = urlsplit(url)
+            if url.scheme != "http" or not url.hostname:
+                raise CommandError(f"Expected LABEL=http://host:port, got {target!r}")
+            parsed.append((label, url.hostname, url.port or 80))
+
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < max(options["concurrency"]) * 2 + 100 and hard > soft:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+        paths = options["paths"] or self.bench_paths()
+        session = self.create_session()
+        cookie = f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+        try:
+            self.stdout.write(f"{'target':<8} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            for concurrency in options["concurrency"]:
+                for label, host, port in parsed:
+                    stats = asyncio.run(self.run(host, port, paths, cookie, concurrency, options))
+                    self.report(label, concurrency, stats)
+        finally:
+            session.delete()
+            self.remove_bench_user()
+
+    def bench_paths(self):
+        job_ids = list(JobPosting.objects.order_by("-created_at").values_list("id", flat=True)[:20])
+        if not job_ids:
+            raise CommandError("No job postings to benchmark against.")
+        paths = ["/", "/jobs/", "/recommendations/"]
+        paths += [f"/jobs/{job_id}/" for job_id in job_ids[:5]]
+        return paths
+
+    def remove_bench_user(self):
+        user = User.objects.filter(username=BENCH_USERNAME).first()
+        if user is not None:
+            # withdrawing an application writes an audit row for its user
+            Application.objects.filter(user=user).delete()
+            AuditLog.objects.filter(user=user).delete()
+            user.delete()
+
+    def create_session(self):
+        self.remove_bench_user()
+        user = User.objects.create_user(BENCH_USERNAME)
+        jobs = list(JobPosting.objects.order_by("-created_at")[:6])
+        Application.objects.bulk_create(Application(user=user, job=job) for job in jobs[::2])
+        Bookmark.objects.bulk_create(Bookmark(user=user, job=job) for job in jobs[1::2])
+
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session
+
+    async def run(self, host, port, paths, cookie, concurrency, options):
+        total = options["requests"]
+        latencies = []
+        errors = {}
+        counter = iter(range(total))
+
+        async def fetch(path):
+            writer = None
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+                writer.write((
+                    f"GET {path} HTTP/1.1\r\nHost: {host}\r\nCookie: {cookie}\r\n"
+                    f"Accept-Encoding: identity\r\nConnection: close\r\n\r\n"
+                ).encode())
+                await writer.drain()
+                status = await reader.readline()
+                await reader.read()  # server closes after the body
+                if b" 200 " not in status:
+                    raise ConnectionError(status.decode(errors="replace").strip() or "no response")
+            finally:
+                if writer is not None:
+                    writer.close()
+
+        async def worker():
+            for n in counter:
+                path = paths[n % len(paths)]
+                start = time.perf_counter()
+                try:
+                    await asyncio.wait_for(fetch(path), options["timeout"])
+                except Exception as exc:
+                    key = f"{type(exc).__name__}: {exc}"[:120]
+                    errors[key] = errors.get(key, 0) + 1
+                else:
+                    latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return {"elapsed": time.perf_counter() - start, "latencies": latencies, "errors": errors}
+
+    def report(self, label, concurrency, stats):
+        latencies = sorted(stats["latencies"])
+        failed = sum(stats["errors"].values())
+        if latencies:
+            cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            p50, p95, p99 = (cuts[i] * 1000 for i in (49, 94, 98))
+        else:
+            p50 = p95 = p99 = float("nan")
+        self.stdout.write(
+            f"{label:<8} {concurrency:>5} {len(latencies) / stats['elapsed']:>8.0f} "
+            f"{p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {failed:>7}"
+        )
+        for error, count in sorted(stats["errors"].items(), key=lambda kv: -kv[1])[:3]:
+            self.stderr.write(f"  {count} x {error}")
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, OperationalError
+
+from core.models import User, JobPosting, Application
+
+PREFIX = "bench_writer_"
+
+
+class Command(BaseCommand):
+    help = (
+        "Submit applications from concurrent threads against a scratch copy of the "
+        "configured database (same engine and options, freshly migrated, dropped "
+        "afterwards) and report write throughput and lock errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--users", type=int, default=40)
+        parser.add_argument("--jobs", type=int, default=25)
+        parser.add_argument(
+            "--db", help="Scratch database: a file path for SQLite, a database name otherwise "
+                         "(default: a temporary file / the test database name).",
+        )
+
+    def handle(self, *args, **options):
+        db = connection.settings_dict
+        scratch = options["db"]
+        if scratch is None and connection.vendor == "sqlite":
+            scratch = os.path.join(tempfile.gettempdir(), "bench_concurrent_writes.sqlite3")
+        if scratch and str(scratch) == str(db["NAME"]):
+            raise CommandError("--db must not be the configured database; it is dropped afterwards.")
+        if scratch:
+            db.setdefault("TEST", {})["NAME"] = scratch
+        # every row the run creates, signal side effects included, goes with the scratch database
+        real_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(real_name, verbosity=0)
+
+    def run(self, options):
+        db = connection.settings_dict
+        self.stdout.write(f"engine={db['ENGINE']} conn_max_age={db.get('CONN_MAX_AGE')} options={db.get('OPTIONS')}")
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                self.stdout.write(f"journal_mode={cursor.fetchone()[0]}")
+
+        users, jobs = self.seed(options["users"], options["jobs"])
+        pairs = [(u, j) for u in users for j in jobs]
+        chunks = [pairs[i::options["threads"]] for i in range(options["threads"])]
+        results = {"ok": 0, "locked": 0, "failed": 0}
+        lock = threading.Lock()
+
+        def worker(chunk):
+            ok = locked = failed = 0
+            try:
+                for user_id, job_id in chunk:
+                    try:
+                        Application.objects.create(user_id=user_id, job_id=job_id)
+                        ok += 1
+                    except OperationalError as exc:
+                        if "locked" in str(exc):
+                            locked += 1
+                        else:
+                            failed += 1
+            finally:
+                connection.close()
+            with lock:
+                results["ok"] += ok
+                results["locked"] += locked
+                results["failed"] += failed
+
+        threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"threads={options['threads']} attempted={len(pairs)} ok={results['ok']} "
+            f"locked={results['locked']} failed={results['failed']} "
+            f"elapsed={elapsed:.2f}s throughput={results['ok'] / elapsed:.1f} applications/s"
+        )
+
+    def seed(self, n_users, n_jobs):
+        User.objects.bulk_create([User(username=f"{PREFIX}{i}") for i in range(n_users)])
+        JobPosting.objects.bulk_create([
+            JobPosting(title=f"{PREFIX}{i}", description="bench", company="bench", location="bench")
+            for i in range(n_jobs)
+        ])
+        users = list(User.objects.filter(username__startswith=PREFIX).values_list("id", flat=True))
+        jobs = list(JobPosting.objects.filter(title__startswith=PREFIX).values_list("id", flat=True))
+        return users, jobs
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from core.management.rollback import rolled_back
+from core.models import User, JobPosting
+from core.serializers import (
+    JobPostingSerializer, JobPostingListSerializer, serialize_values, only_paths,
+)
+
+
+class Command(BaseCommand):
+    help = "Compare payload size, latency and query count of the job list serializers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=2000, help="Synthetic postings to create (rolled back).")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.seed(options["jobs"])
+            self.run(options["repeat"])
+
+    def seed(self, count):
+        owners = [User.objects.create_user(f"bench_owner_{i}", f"bench{i}@example.com") for i in range(20)]
+        JobPosting.objects.bulk_create([
+            JobPosting(
+                title=f"Engineer {i}",
+                description="Python Django SQL REST " * 50,
+                company=f"Company {i % 50}",
+                location="Lahore",
+                salary="$50,000 - $70,000",
+                skill_requirements="python, django, sql",
+                skill_vector={"python": 1.0, "django": 0.8, "sql": 0.6, "rest": 0.4},
+                created_by=owners[i % len(owners)],
+            )
+            for i in range(count)
+        ], batch_size=500)
+
+    def measure(self, label, build, repeat):
+        best = None
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                payload = JSONRenderer().render(build())
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        self.stdout.write(
+            f"{label:<28} {len(payload) / 1024:>10.1f} KiB {best * 1000:>10.1f} ms {len(queries):>6} queries"
+        )
+
+    def run(self, repeat):
+        base = JobPosting.objects.order_by("-created_at")
+        list_serializer = JobPostingListSerializer()
+
+        self.stdout.write(f"{'variant':<28} {'payload':>14} {'latency':>13} {'db':>13}")
+        self.measure("full serializer (before)",
+                     lambda: JobPostingSerializer(base.all(), many=True).data, repeat)
+        self.measure("list serializer + only()",
+                     lambda: JobPostingListSerializer(
+                         base.select_related("created_by").only(*only_paths(list_serializer)), many=True
+                     ).data, repeat)
+        self.measure("values() fast path",
+                     lambda: list(serialize_values(list_serializer, base.all())), repeat)
@@ -0,0 +1,57 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+PROFILER = "core.middleware.ProfilingMiddleware"
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-request cost of the profiling middleware: not installed, installed but "
+        "disabled, enabled but keeping nothing, and enabled keeping every request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/jobs/")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per configuration per round.")
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        without = [name for name in settings.MIDDLEWARE if name != PROFILER]
+        configs = {
+            "not installed": {"MIDDLEWARE": without},
+            "disabled": {"MIDDLEWARE": [PROFILER] + without, "PROFILING_ENABLED": False},
+            "on, keeps none": {
+                "MIDDLEWARE": [PROFILER] + without, "PROFILING_ENABLED": True,
+                "PROFILING_SAMPLE_RATE": 0, "PROFILING_SLOW_MS": float("inf"),
+            },
+            "on, keeps all": {
+                "MIDDLEWARE": [PROFILER] + without, "PROFILING_ENABLED": True, "PROFILING_SAMPLE_RATE": 1,
+            },
+        }
+        clients = {label: Client(HTTP_HOST="localhost") for label in configs}
+        timings = {label: [] for label in configs}
+        n = options["requests"]
+
+        # rounds interleave the configurations so drift hits them all alike
+        for _ in range(options["rounds"]):
+            for label, overrides in configs.items():
+                with override_settings(**overrides):
+                    client = clients[label]
+                    client.get(options["path"])  # warm up (builds the middleware chain)
+                    start = time.perf_counter()
+                    for _ in range(n):
+                        client.get(options["path"])
+                    timings[label].append((time.perf_counter() - start) / n * 1e6)
+
+        baseline = statistics.median(timings["not installed"])
+        self.stdout.write(f"{options['path']}: median of {options['rounds']} rounds x {n} requests")
+        for label, values in timings.items():
+            median = statistics.median(values)
+            self.stdout.write(
+                f"{label:<16} {median:>9.1f} us/request  {median - baseline:>+8.1f} us "
+                f"({(median - baseline) / baseline:+.1%})"
+            )
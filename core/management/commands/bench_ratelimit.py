@@ -0,0 +1,53 @@
+import time
+
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.ratelimit import clear_bucket
+from core.views import login_view
+
+
+class Command(BaseCommand):
+    help = "Per-request cost of a rate-limited login rejection versus a failed login that reaches the view."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+
+    def build_request(self, factory, ip):
+        request = factory.post(
+            "/login/", {"username": "bench-nobody", "password": "wrong"}, REMOTE_ADDR=ip
+        )
+        request.session = SessionBase()
+        request._messages = FallbackStorage(request)
+        return request
+
+    def measure(self, label, factory, ip, n):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            statuses = set()
+            for _ in range(n):
+                statuses.add(login_view(self.build_request(factory, ip)).status_code)
+            elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{label:<24} {elapsed / n * 1e6:>10.1f} us/request "
+            f"{len(queries) / n:>6.2f} queries/request  status={sorted(statuses)}"
+        )
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        n = options["requests"]
+
+        # limiter off: every request reaches the view and hashes a password
+        with override_settings(RATELIMIT_ENABLED=False):
+            self.measure("reaches view (no limit)", factory, "10.0.0.1", max(1, n // 10))
+
+        # exhaust one bucket, then everything is rejected up front
+        for _ in range(50):
+            login_view(self.build_request(factory, "10.0.0.2"))
+        self.measure("rejected (429)", factory, "10.0.0.2", n)
+        for key in ("core:rl:login:ip:10.0.0.2", "core:rl:login:id:bench-nobody"):
+            clear_bucket(key, "10/m")
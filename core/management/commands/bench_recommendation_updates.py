@@ -0,0 +1,110 @@
+import random
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.management.rollback import rolled_back
+from core.models import JobPosting, Profile, User
+from core.recommender import (
+    TOP_K_KEY, _build_top_k, bump_catalog_version, bump_skill_index_version, parse_skills, splice_job,
+)
+
+SKILLS = [
+    "python", "django", "sql", "react", "java", "kotlin", "swift", "rust", "golang", "php",
+    "figma", "excel", "tableau", "spark", "kafka", "docker", "kubernetes", "terraform", "aws", "azure",
+    "pandas", "pytorch", "accessibility", "copywriting", "seo", "salesforce", "sap", "photoshop",
+    "braille", "sign language", "customer support", "bookkeeping", "recruiting", "logistics",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time posting a job with incremental top-k updates (score the new posting for the "
+        "users whose skills it mentions) against rebuilding every user's list. Synthetic "
+        "data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5000)
+        parser.add_argument("--jobs", type=int, default=2000)
+        parser.add_argument("--posts", type=int, default=50, help="New postings to splice in.")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.user_ids = []
+        try:
+            with rolled_back():
+                self.seed(options["users"], options["jobs"])
+                self.run(options["posts"])
+        finally:
+            cache.delete_many([TOP_K_KEY.format(user_id) for user_id in self.user_ids])
+            bump_catalog_version()
+            bump_skill_index_version()
+
+    def description(self):
+        return "We are hiring. You will work with " + ", ".join(self.rng.sample(SKILLS, 3)) + "."
+
+    def seed(self, users, jobs):
+        owner = User.objects.create_user("bench_updates_owner")
+        created = User.objects.bulk_create(User(username=f"bench_updates_{i}") for i in range(users))
+        Profile.objects.bulk_create(
+            Profile(user=user, skills=", ".join(self.rng.sample(SKILLS, self.rng.randint(1, 4))))
+            for user in created
+        )
+        self.user_ids = [user.pk for user in created]
+        JobPosting.objects.bulk_create([
+            JobPosting(title=f"Job {i}", description=self.description(), company="Bench", created_by=owner)
+            for i in range(jobs)
+        ], batch_size=500)
+        self.owner = owner
+        bump_catalog_version()
+        bump_skill_index_version()
+
+    def rebuild_all(self, profiles, today):
+        for user_id, skills in profiles:
+            cache.set(TOP_K_KEY.format(user_id), _build_top_k(user_id, parse_skills(skills), today), None)
+
+    def run(self, posts):
+        today = timezone.localdate()
+        profiles = list(Profile.objects.filter(user_id__in=self.user_ids).values_list("user_id", "skills"))
+
+        start = time.perf_counter()
+        self.rebuild_all(profiles, today)
+        full = time.perf_counter() - start
+
+        timings, touched = [], []
+        for i in range(posts):
+            # bulk_create skips the signals, so the splice below is the only update
+            job = JobPosting.objects.bulk_create([
+                JobPosting(title=f"New job {i}", description=self.description(), company="Bench", created_by=self.owner)
+            ])[0]
+            bump_catalog_version()
+            start = time.perf_counter()
+            touched.append(splice_job(job.pk))
+            timings.append(time.perf_counter() - start)
+
+        # the spliced lists must match a rebuild from scratch
+        stale = evicted = 0
+        for user_id, skills in profiles:
+            stored = cache.get(TOP_K_KEY.format(user_id))
+            if stored is None:
+                evicted += 1
+                continue
+            fresh = _build_top_k(user_id, parse_skills(skills), today)
+            if stored["items"] != fresh["items"][:len(stored["items"])]:
+                stale += 1
+
+        timings.sort()
+        self.stdout.write(f"users={len(profiles)} jobs={JobPosting.objects.count()}")
+        self.stdout.write(f"rebuild every list:       {full * 1000:>10.1f} ms")
+        self.stdout.write(
+            f"splice one posting:       {sum(timings) / len(timings) * 1000:>10.1f} ms mean, "
+            f"{timings[len(timings) // 2] * 1000:.1f} ms median, "
+            f"{sum(touched) / len(touched):.0f} lists updated on average"
+        )
+        self.stdout.write(f"lists differing from a rebuild: {stale}")
+        if evicted:
+            self.stderr.write(f"{evicted} lists were evicted; raise the cache's MAX_ENTRIES for a fair run.")
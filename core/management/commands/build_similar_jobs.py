@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.similarity import rebuild_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every posting's similar-jobs list. Signals keep the lists current "
+        "afterwards; run this once after migrating and after bulk imports that skip them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = rebuild_all(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt similar jobs for {count} postings in {time.perf_counter() - start:.1f}s."
+        ))
@@ -0,0 +1,67 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.models import Max
+
+from core.models import Application, JobPosting
+from core.routers import probe, replica_aliases, replica_lag
+
+
+class Command(BaseCommand):
+    help = (
+        "Probe each read replica and report its health, latency and how far behind the "
+        "primary it is. --copy refreshes SQLite replicas from the primary, for trying "
+        "the replica router locally without real replication."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--copy", action="store_true", help="Copy the primary over each SQLite replica first.")
+
+    def handle(self, *args, **options):
+        aliases = replica_aliases()
+        if not aliases:
+            raise CommandError("No replicas configured (set DB_REPLICAS).")
+        if options["copy"]:
+            for alias in aliases:
+                self.copy(alias)
+
+        newest = self.newest(DEFAULT_DB_ALIAS)
+        for alias in aliases:
+            start = time.perf_counter()
+            healthy = probe(alias)
+            elapsed = (time.perf_counter() - start) * 1000
+            if not healthy:
+                self.stdout.write(self.style.ERROR(f"{alias}: unhealthy ({elapsed:.1f}ms); reads fall back to the primary"))
+                continue
+            lag = replica_lag(alias)
+            copy = self.newest(alias)
+            behind = ", ".join(f"{name} {newest[name] - copy[name]}" for name in newest)
+            self.stdout.write(
+                f"{alias}: healthy, probe {elapsed:.1f}ms"
+                + ("" if lag is None else f", lag {lag:.2f}s")
+                + f", ids behind the primary: {behind}"
+            )
+
+    def newest(self, alias):
+        try:
+            return {
+                model._meta.model_name: model.objects.using(alias).aggregate(newest=Max("id"))["newest"] or 0
+                for model in (JobPosting, Application)
+            }
+        except DatabaseError as exc:
+            raise CommandError(f"{alias}: {exc}")
+
+    def copy(self, alias):
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("--copy only works between SQLite databases.")
+        replica.close()
+        primary.ensure_connection()
+        target = sqlite3.connect(replica.settings_dict["NAME"])
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(f"Copied {primary.settings_dict['NAME']} to {replica.settings_dict['NAME']}")
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.forms.models import model_to_dict
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.forms import JobForm
+from core.management.rollback import rolled_back
+from core.models import JobPosting, User
+
+PREFIX = "write_queries_"
+
+# Queries per action, on-commit work included. Raise a budget only together
+# with the change that needs it.
+BUDGETS = {
+    "login": 9,
+    "apply": 6,
+    "edit job (salary)": 6,
+    "edit job (description)": 19,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Count the queries behind a login, an application and two job edits, signal "
+        "receivers and on-commit work included, and fail if any goes over its budget. "
+        "Runs in a transaction that is rolled back."
+    )
+
+    def handle(self, *args, **options):
+        counts = {}
+        with override_settings(RATELIMIT_ENABLED=False), rolled_back():
+            seeker = User.objects.create_user(f"{PREFIX}seeker", password="queries")
+            admin = User.objects.create_user(f"{PREFIX}admin", password="queries", is_staff=True)
+            job = JobPosting.objects.create(
+                title=f"{PREFIX}job", description="Python developer", company=PREFIX,
+                location="Remote", skills_required="python, django", created_by=admin,
+            )
+            seeker_client = Client(SERVER_NAME="localhost")
+            admin_client = Client(SERVER_NAME="localhost")
+            admin_client.force_login(admin)
+            form = model_to_dict(job, fields=JobForm._meta.fields)
+            form = {key: "" if value is None else value for key, value in form.items()}
+
+            actions = {
+                "login": lambda: seeker_client.post(
+                    reverse("login"), {"username": seeker.username, "password": "queries"}
+                ),
+                "apply": lambda: seeker_client.post(reverse("apply_job", args=[job.id])),
+                "edit job (salary)": lambda: admin_client.post(
+                    reverse("edit_job", args=[job.id]), {**form, "salary": "50000"}
+                ),
+                "edit job (description)": lambda: admin_client.post(
+                    reverse("edit_job", args=[job.id]), {**form, "salary": "50000", "description": "Django developer"}
+                ),
+            }
+            for label, action in actions.items():
+                with CaptureQueriesContext(connection) as queries:
+                    with TestCase.captureOnCommitCallbacks(execute=True):
+                        response = action()
+                if response.status_code != 302:
+                    raise CommandError(f"{label}: expected a redirect, got {response.status_code}")
+                counts[label] = len(queries)
+                self.stdout.write(f"{label:<24} {len(queries):>3} queries (budget {BUDGETS[label]})")
+                if options["verbosity"] > 1:
+                    for query in queries.captured_queries:
+                        self.stdout.write(f"    {query['sql'][:160]}")
+
+        over = [label for label, count in counts.items() if count > BUDGETS[label]]
+        if over:
+            raise CommandError(f"Over budget: {', '.join(over)}")
+        self.stdout.write(self.style.SUCCESS("All within budget."))
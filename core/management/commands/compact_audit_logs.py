@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.audit import compact
+
+
+class Command(BaseCommand):
+    help = "Move audit log rows older than the retention window into gzip JSONL archives, one file per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=getattr(settings, "AUDIT_LOG_RETENTION_DAYS", 90),
+            help="Keep this many days of audit logs in the database.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        moved = compact(cutoff, batch_size=options["batch_size"], dry_run=options["dry_run"], stdout=self.stdout)
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {moved} audit log rows older than {cutoff:%Y-%m-%d}."))
@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.dedupe import duplicate_threshold, find_duplicate_groups
+from core.models import JobLSHBucket, JobPosting
+from core.recommender import bump_catalog_version
+from core.similarity import rebuild_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Find near-duplicate postings across the whole catalog with MinHash/LSH, mark each "
+        "as a duplicate of the oldest posting in its group and rebuild the LSH buckets used "
+        "at ingest. Duplicates are hidden from listings and recommendations, not deleted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold", type=float, help="Jaccard similarity (default: DUPLICATE_JOB_THRESHOLD).")
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        threshold = options["threshold"] or duplicate_threshold()
+        current = {}
+
+        def rows():
+            queryset = JobPosting.objects.order_by("id").values("id", "title", "company", "description", "duplicate_of_id")
+            for row in queryset.iterator(chunk_size=options["batch_size"]):
+                current[row["id"]] = row["duplicate_of_id"]
+                yield row
+
+        start = time.perf_counter()
+        groups, all_buckets = find_duplicate_groups(rows(), threshold)
+        elapsed = time.perf_counter() - start
+
+        changes = {}
+        for job_id, duplicate_of in current.items():
+            wanted = groups.get(job_id)
+            if wanted != duplicate_of:
+                changes.setdefault(wanted, []).append(job_id)
+        changed = sum(len(ids) for ids in changes.values())
+
+        self.stdout.write(
+            f"Scanned {len(current)} postings in {elapsed:.1f}s: {len(groups)} duplicates in "
+            f"{len(set(groups.values()))} groups at Jaccard >= {threshold}; {changed} postings change."
+        )
+        for duplicate_id, canonical_id in sorted(groups.items())[:10]:
+            self.stdout.write(f"  #{duplicate_id} duplicates #{canonical_id}")
+        if options["dry_run"]:
+            return
+
+        with transaction.atomic():
+            JobLSHBucket.objects.all().delete()
+            JobLSHBucket.objects.bulk_create(
+                (JobLSHBucket(job_id=job_id, band=band, bucket=bucket) for job_id, band, bucket in all_buckets),
+                batch_size=options["batch_size"],
+            )
+            for canonical_id, job_ids in changes.items():
+                for i in range(0, len(job_ids), options["batch_size"]):
+                    JobPosting.objects.filter(id__in=job_ids[i:i + options["batch_size"]]).update(duplicate_of=canonical_id)
+        if changed:
+            bump_catalog_version()
+            rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f"Stored {len(all_buckets)} LSH buckets; updated {changed} postings."))
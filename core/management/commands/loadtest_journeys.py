@@ -0,0 +1,410 @@
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode, urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Application, AuditLog, JobPosting, User
+
+PREFIX = "loadtest_"
+FIXTURE = "loadtest"  # core/fixtures/loadtest.json
+FIXTURE_COMPANIES = ("Loadtest Labs", "Loadtest Systems", "Loadtest Works", "Loadtest Digital")
+PASSWORD = "loadtest-Pass-2024"
+SKILL_SETS = [
+    "Python, Django, PostgreSQL",
+    "JavaScript, React, TypeScript",
+    "SQL, Excel, Tableau",
+    "Python, Machine Learning, AWS",
+    "Kubernetes, AWS, Linux",
+    "UX Design, Figma",
+]
+QUERIES = ["", "", "engineer", "python", "data", "remote", "designer", "senior"]
+STATUSES = ["accepted", "declined", "pending"]
+
+
+class StepFailed(Exception):
+    """A request in a journey failed; the virtual user starts over."""
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def ok(self, label, seconds):
+        self.latencies.setdefault(label, []).append(seconds)
+
+    def error(self, label, reason):
+        kinds = self.errors.setdefault(label, {})
+        kinds[reason] = kinds.get(reason, 0) + 1
+
+    @staticmethod
+    def summarize(latencies, failed, elapsed):
+        latencies = sorted(latencies)
+        total = len(latencies) + failed
+        summary = {
+            "requests": total,
+            "errors": failed,
+            "error_rate": round(failed / total, 4) if total else 0.0,
+            "throughput_rps": round(total / elapsed, 2),
+        }
+        if latencies:
+            cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+            for name, index in (("p50_ms", 49), ("p90_ms", 89), ("p95_ms", 94), ("p99_ms", 98)):
+                summary[name] = round(cuts[index] * 1000, 1)
+            summary["max_ms"] = round(latencies[-1] * 1000, 1)
+        return summary
+
+    def report(self, elapsed):
+        labels = sorted(set(self.latencies) | set(self.errors))
+        endpoints = {}
+        for label in labels:
+            endpoints[label] = self.summarize(
+                self.latencies.get(label, []), sum(self.errors.get(label, {}).values()), elapsed
+            )
+            if label in self.errors:
+                endpoints[label]["error_kinds"] = self.errors[label]
+        total = self.summarize(
+            [s for values in self.latencies.values() for s in values],
+            sum(sum(kinds.values()) for kinds in self.errors.values()),
+            elapsed,
+        )
+        return {"duration_s": round(elapsed, 1), "total": total, "endpoints": endpoints}
+
+
+class VirtualUser:
+    """One simulated browser: a keep-alive connection and a cookie jar."""
+
+    def __init__(self, host, port, stats, timeout, host_header=None):
+        self.host, self.port = host, port
+        self.host_header = f"{host_header or host}:{port}"
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies = {}
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def request(self, label, method, path, form=None, json_body=None, ajax=False, expect=(200,)):
+        headers = [f"Host: {self.host_header}", "Accept-Encoding: identity"]
+        if self.cookies:
+            headers.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        csrf = self.cookies.get("csrftoken", "")
+        body = b""
+        if form is not None:
+            body = urlencode({**form, "csrfmiddlewaretoken": csrf}).encode()
+            headers.append("Content-Type: application/x-www-form-urlencoded")
+        elif json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers.append("Content-Type: application/json")
+        if ajax or json_body is not None:
+            headers += ["X-Requested-With: XMLHttpRequest", "Accept: application/json", f"X-CSRFToken: {csrf}"]
+        if method != "GET":
+            headers.append(f"Content-Length: {len(body)}")
+        head = f"{method} {path} HTTP/1.1\r\n" + "\r\n".join(headers) + "\r\n\r\n"
+
+        start = time.perf_counter()
+        try:
+            status, response_body = await asyncio.wait_for(self.exchange(head.encode() + body), self.timeout)
+        except Exception as exc:
+            await self.close()
+            self.stats.error(label, f"{type(exc).__name__}: {exc}"[:120])
+            raise StepFailed(label) from exc
+        if status not in expect:
+            self.stats.error(label, f"HTTP {status}")
+            raise StepFailed(label)
+        self.stats.ok(label, time.perf_counter() - start)
+        return response_body
+
+    async def exchange(self, raw):
+        for _ in range(2):
+            fresh = self.writer is None
+            if fresh:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self.writer.write(raw)
+                await self.writer.drain()
+                status_line = await self.reader.readline()
+            except ConnectionError:
+                status_line = b""
+            if status_line:
+                break
+            await self.close()  # the server dropped an idle keep-alive connection
+            if fresh:
+                raise ConnectionError("connection closed without a response")
+
+        version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+        headers = []
+        while True:
+            line = (await self.reader.readline()).decode("latin-1").rstrip("\r\n")
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers.append((name.strip().lower(), value.strip()))
+        fields = dict(headers)
+
+        if "content-length" in fields:
+            body = await self.reader.readexactly(int(fields["content-length"]))
+        elif fields.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b"\r\n", b""):
+                        pass
+                    break
+                chunks.append((await self.reader.readexactly(size + 2))[:-2])
+            body = b"".join(chunks)
+        else:
+            body = await self.reader.read()
+            await self.close()
+
+        for name, value in headers:
+            if name == "set-cookie":
+                cookie, _, attributes = value.partition(";")
+                key, _, cookie_value = cookie.strip().partition("=")
+                if cookie_value in ("", '""') or "max-age=0" in attributes.lower():
+                    self.cookies.pop(key, None)
+                else:
+                    self.cookies[key] = cookie_value
+        if fields.get("connection", "").lower() == "close" or version == "HTTP/1.0":
+            await self.close()
+        return int(status), body
+
+
+class Run:
+    """What the journeys share: the catalog, the admin account and the clock."""
+
+    def __init__(self, job_ids, admin_username, think, deadline):
+        self.tag = format(int(time.time()) % 100000, "05d")
+        self.job_ids = job_ids
+        self.admin_username = admin_username
+        self.think_time = think
+        self.deadline = deadline
+        self._applications = ([], 0.0)
+
+    @property
+    def stopping(self):
+        return time.monotonic() >= self.deadline
+
+    async def think(self):
+        if self.think_time:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.think_time)
+
+    async def recent_applications(self):
+        # the admin journey needs ids it could have read off the dashboard
+        ids, fetched = self._applications
+        if time.monotonic() - fetched > 1.0:
+            ids = await sync_to_async(lambda: list(
+                Application.objects.filter(user__username__startswith=PREFIX)
+                .order_by("-id").values_list("id", flat=True)[:50]
+            ))()
+            self._applications = (ids, time.monotonic())
+        return ids
+
+
+async def seeker_journey(user, run, name):
+    """Register, sign in, add skills, then browse / recommend / apply / bookmark until the run ends."""
+    await user.request("register_form", "GET", "/register/")
+    await user.request("register", "POST", "/register/", form={
+        "username": name, "email": f"{name}@example.com", "password1": PASSWORD, "password2": PASSWORD,
+    }, expect=(302,))
+    await user.request("login", "POST", "/login/", form={"username": name, "password": PASSWORD}, expect=(302,))
+    await user.request("profile_form", "GET", "/profile/edit/")
+    await user.request("edit_profile", "POST", "/profile/edit/", form={
+        "username": name, "email": f"{name}@example.com", "skills": random.choice(SKILL_SETS),
+        "location": random.choice(["Karachi", "Lahore", "Remote"]), "experience": "2 years",
+    }, expect=(302,))
+    while not run.stopping:
+        query = random.choice(QUERIES)
+        await user.request("job_list", "GET", "/jobs/" + (f"?{urlencode({'q': query})}" if query else ""))
+        job_id = random.choice(run.job_ids)
+        await user.request("job_detail", "GET", f"/jobs/{job_id}/")
+        await user.request("recommendations", "GET", "/recommendations/")
+        await user.request("apply", "POST", f"/apply/{job_id}/", ajax=True)
+        await user.request("bookmark", "POST", f"/bookmark/{random.choice(run.job_ids)}/", form={"action": "save"}, ajax=True)
+        await run.think()
+
+
+async def admin_journey(user, run, name):
+    """Sign in as staff, then watch the dashboard and move applications between statuses."""
+    await user.request("login_form", "GET", "/login/")
+    await user.request("admin_login", "POST", "/login/", form={
+        "username": run.admin_username, "password": PASSWORD,
+    }, expect=(302,))
+    while not run.stopping:
+        await user.request("admin_dashboard", "GET", "/admin-dashboard/")
+        app_ids = await run.recent_applications()
+        if app_ids:
+            status = random.choice(STATUSES)
+            await user.request(
+                "update_status", "GET", f"/admin/update-status/{random.choice(app_ids)}/{status}/", expect=(302,)
+            )
+            await user.request("bulk_status", "POST", "/admin/applications/bulk-status/", json_body={
+                "status": random.choice(STATUSES), "ids": random.sample(app_ids, min(5, len(app_ids))),
+            })
+        await run.think()
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive scripted user journeys (job seekers: register, add skills, browse, view "
+        "recommendations, apply, bookmark; admins: dashboard and status updates) from "
+        "asyncio virtual users against a server it launches (--serve) or one already "
+        "running on this database, and report throughput, latency percentiles and "
+        "error rates per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--serve", choices=["wsgi", "asgi"], help="Launch runserver (wsgi) or uvicorn (asgi) on a free port.")
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server to test when not using --serve.")
+        parser.add_argument("--users", type=int, default=50, help="Concurrent job seekers.")
+        parser.add_argument("--admins", type=int, default=2)
+        parser.add_argument("--duration", type=float, default=60.0, help="Seconds to run.")
+        parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which virtual users start.")
+        parser.add_argument("--think", type=float, default=0.5, help="Mean pause between journey loops (0 = closed loop).")
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--json", metavar="PATH", help="Write the report as JSON to PATH ('-' for stdout).")
+        parser.add_argument("--keep-data", action="store_true", help="Keep the load-test users and seeded postings.")
+
+    def handle(self, *args, **options):
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < (options["users"] + options["admins"]) * 2 + 100 and hard > soft:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+        job_ids, admin_username = self.seed()
+        server = None
+        try:
+            if options["serve"]:
+                host, port = "127.0.0.1", self.free_port()
+                server = self.launch(options["serve"], host, port)
+            else:
+                url = urlsplit(options["url"])
+                if url.scheme != "http" or not url.hostname:
+                    raise CommandError("Only plain http:// URLs are supported.")
+                host, port = url.hostname, url.port or 80
+
+            # a launched server is addressed as localhost, which every settings profile allows
+            host_header = "localhost" if server is not None else None
+            report = asyncio.run(self.run(host, port, job_ids, admin_username, options, host_header))
+            report["target"] = options["serve"] or options["url"]
+            report["config"] = {key: options[key] for key in ("users", "admins", "duration", "ramp", "think")}
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+            if not options["keep_data"]:
+                self.cleanup()
+
+        if options["json"] == "-":
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        if options["json"]:
+            with open(options["json"], "w") as fh:
+                json.dump(report, fh, indent=2)
+        self.print_table(report)
+
+    def seed(self):
+        if not JobPosting.objects.filter(company__in=FIXTURE_COMPANIES).exists():
+            call_command("loaddata", FIXTURE, verbosity=0)
+        job_ids = list(
+            JobPosting.objects.filter(duplicate_of__isnull=True).order_by("-created_at").values_list("id", flat=True)[:200]
+        )
+        admin_username = f"{PREFIX}admin"
+        User.objects.filter(username=admin_username).delete()
+        User.objects.create_user(admin_username, password=PASSWORD, is_staff=True)
+        return job_ids, admin_username
+
+    def cleanup(self):
+        users = User.objects.filter(username__startswith=PREFIX)
+        # withdrawing an application writes an audit row for its user
+        Application.objects.filter(user__in=users).delete()
+        AuditLog.objects.filter(user__in=users).delete()
+        users.delete()
+        for job in JobPosting.objects.filter(company__in=FIXTURE_COMPANIES):
+            job.delete()
+
+    def free_port(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    def launch(self, mode, host, port):
+        # every virtual user comes from one IP, so the launched server runs without rate limits
+        env = dict(os.environ, DJANGO_RATELIMIT="0")
+        if mode == "asgi":
+            command = [sys.executable, "-m", "uvicorn", "accessjobs.asgi:application",
+                       "--host", host, "--port", str(port), "--log-level", "warning"]
+        else:
+            command = [sys.executable, "manage.py", "runserver", f"{host}:{port}", "--noreload"]
+        server = subprocess.Popen(
+            command, cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"{' '.join(command)} exited with {server.returncode}")
+            try:
+                socket.create_connection((host, port), timeout=1).close()
+                self.stdout.write(f"Started {mode} server on {host}:{port}")
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError("The server did not start listening within 30s.")
+
+    async def run(self, host, port, job_ids, admin_username, options, host_header=None):
+        stats = Stats()
+        run = Run(job_ids, admin_username, options["think"], time.monotonic() + options["duration"])
+        journeys = [seeker_journey] * options["users"] + [admin_journey] * options["admins"]
+        random.shuffle(journeys)
+
+        async def virtual_user(n, journey):
+            await asyncio.sleep(options["ramp"] * n / max(1, len(journeys)))
+            attempt = 0
+            while not run.stopping:
+                user = VirtualUser(host, port, stats, options["timeout"], host_header)
+                try:
+                    await journey(user, run, f"{PREFIX}{run.tag}_{n}_{attempt}")
+                except StepFailed:
+                    await asyncio.sleep(0.5)  # don't hammer a failing server
+                finally:
+                    await user.close()
+                attempt += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(virtual_user(n, journey) for n, journey in enumerate(journeys)))
+        return stats.report(time.perf_counter() - start)
+
+    def print_table(self, report):
+        self.stdout.write(
+            f"{report['target']}: {report['config']['users']} seekers + {report['config']['admins']} admins "
+            f"for {report['duration_s']}s"
+        )
+        self.stdout.write(
+            f"{'endpoint':<16} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err %':>7}"
+        )
+        rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+        for label, row in rows:
+            self.stdout.write(
+                f"{label:<16} {row['requests']:>7} {row['throughput_rps']:>8.1f} {row.get('p50_ms', float('nan')):>8.1f} "
+                f"{row.get('p95_ms', float('nan')):>8.1f} {row.get('p99_ms', float('nan')):>8.1f} "
+                f"{row['error_rate'] * 100:>7.2f}"
+            )
+        for label, row in report["endpoints"].items():
+            for error, count in sorted(row.get("error_kinds", {}).items(), key=lambda kv: -kv[1])[:3]:
+                self.stderr.write(f"  {label}: {count} x {error}")
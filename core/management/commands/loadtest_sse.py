@@ -0,0 +1,134 @@
+import asyncio
+import resource
+import time
+from importlib import import_module
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import User
+
+PREFIX = "sse_load_"
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many idle Server-Sent Events connections to a locally running ASGI server "
+        "(e.g. `uvicorn accessjobs.asgi:application`) and hold them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/notifications/stream/")
+        parser.add_argument("--connections", type=int, default=10000)
+        parser.add_argument("--users", type=int, default=100, help="Spread connections over this many users.")
+        parser.add_argument("--hold", type=float, default=30.0, help="Seconds to hold the connections open.")
+        parser.add_argument("--ramp", type=int, default=500, help="Concurrent connection attempts.")
+        parser.add_argument("--server-pid", type=int, help="Report this process's RSS while connections are held.")
+
+    def handle(self, *args, **options):
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < options["connections"] + 100 and hard > soft:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+        url = urlsplit(options["url"])
+        if url.scheme != "http":
+            raise CommandError("Only plain http:// URLs are supported.")
+        sessions = self.create_sessions(options["users"])
+        cookies = [f"{settings.SESSION_COOKIE_NAME}={s.session_key}" for s in sessions]
+        try:
+            stats = asyncio.run(self.run(url, cookies, options))
+        finally:
+            for session in sessions:
+                session.delete()
+            User.objects.filter(username__startswith=PREFIX).delete()
+
+        self.stdout.write(
+            f"established={stats['ok']}/{options['connections']} failed={stats['failed']} "
+            f"connect_time={stats['connect_time']:.1f}s still_open_after_hold={stats['alive']}"
+        )
+        if stats.get("rss_kb"):
+            self.stdout.write(
+                f"server RSS={stats['rss_kb'] / 1024:.0f} MiB "
+                f"(~{stats['rss_kb'] / max(1, stats['ok']):.1f} KiB per connection)"
+            )
+        for error, count in sorted(stats["errors"].items(), key=lambda kv: -kv[1])[:5]:
+            self.stderr.write(f"{count} x {error}")
+
+    def create_sessions(self, n_users):
+        store_cls = import_module(settings.SESSION_ENGINE).SessionStore
+        User.objects.filter(username__startswith=PREFIX).delete()
+        sessions = []
+        for i in range(n_users):
+            user = User.objects.create_user(f"{PREFIX}{i}")
+            session = store_cls()
+            session[SESSION_KEY] = str(user.pk)
+            session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+            session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+            session.create()
+            sessions.append(session)
+        return sessions
+
+    async def run(self, url, cookies, options):
+        host, port = url.hostname, url.port or 80
+        path = url.path + (f"?{url.query}" if url.query else "")
+        gate = asyncio.Semaphore(options["ramp"])
+        stop = asyncio.Event()
+        stats = {"ok": 0, "failed": 0, "alive": 0, "errors": {}}
+        established = []
+
+        async def client(n):
+            writer = None
+            try:
+                async with gate:
+                    reader, writer = await asyncio.open_connection(host, port)
+                    writer.write((
+                        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n"
+                        f"Cookie: {cookies[n % len(cookies)]}\r\n\r\n"
+                    ).encode())
+                    await writer.drain()
+                    status = await asyncio.wait_for(reader.readline(), 30)
+                    if b" 200 " not in status:
+                        raise ConnectionError(status.decode(errors="replace").strip() or "no response")
+                    stats["ok"] += 1
+                    established.append(time.perf_counter())
+                # idle: drain keep-alives until told to stop
+                while not stop.is_set():
+                    try:
+                        chunk = await asyncio.wait_for(reader.read(4096), 1.0)
+                    except asyncio.TimeoutError:
+                        continue
+                    if not chunk:
+                        return
+                stats["alive"] += 1
+            except Exception as exc:
+                stats["failed"] += 1
+                key = f"{type(exc).__name__}: {exc}"[:120]
+                stats["errors"][key] = stats["errors"].get(key, 0) + 1
+            finally:
+                if writer is not None:
+                    writer.close()
+
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(client(n)) for n in range(options["connections"])]
+        while len(established) + stats["failed"] < options["connections"]:
+            await asyncio.sleep(0.2)
+        stats["connect_time"] = time.perf_counter() - start
+        self.stdout.write(f"{stats['ok']} connections open, holding for {options['hold']:.0f}s ...")
+
+        await asyncio.sleep(options["hold"])
+        if options.get("server_pid"):
+            stats["rss_kb"] = self.rss_kb(options["server_pid"])
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return stats
+
+    def rss_kb(self, pid):
+        try:
+            with open(f"/proc/{pid}/status") as fh:
+                for line in fh:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1])
+        except OSError:
+            return None
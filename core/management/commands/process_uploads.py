@@ -0,0 +1,104 @@
+import os
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+from PIL import Image
+
+from core.forms import ProfileForm
+from core.models import Profile
+from core.uploads import (
+    THUMBNAIL_DIR, THUMBNAIL_SIZES, is_deduplicated, render_thumbnails, store_deduplicated, thumbnail_name,
+)
+
+UPLOAD_DIRS = {"profile_picture": "profile_pics", "resume": "resumes"}
+ORPHAN_GRACE = timedelta(hours=1)  # a fresh upload may not be saved on its profile yet
+
+
+def walk(directory):
+    if not default_storage.exists(directory):
+        return
+    subdirs, files = default_storage.listdir(directory)
+    for name in files:
+        yield f"{directory}/{name}"
+    for subdir in subdirs:
+        yield from walk(f"{directory}/{subdir}")
+
+
+def disk_usage():
+    return sum(default_storage.size(name) for d in (*UPLOAD_DIRS.values(), THUMBNAIL_DIR) for name in walk(d))
+
+
+class Command(BaseCommand):
+    help = (
+        "Move existing profile pictures and resumes into the content-addressed store, "
+        "render missing thumbnails, and optionally delete files no profile references."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delete-orphans", action="store_true")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        before = disk_usage()
+        moved = rendered = missing = 0
+
+        for profile in Profile.objects.only("id", "profile_picture", "resume").iterator():
+            for field, directory in UPLOAD_DIRS.items():
+                name = getattr(profile, field).name
+                if not name:
+                    continue
+                if not default_storage.exists(name):
+                    missing += 1
+                    self.stderr.write(f"Profile {profile.pk}: {field} file {name} is missing")
+                    continue
+                if not is_deduplicated(name):
+                    moved += 1
+                    if dry_run:
+                        continue
+                    with default_storage.open(name, "rb") as fh:
+                        name = store_deduplicated(fh, directory, self.extension(field, name, fh))
+                    Profile.objects.filter(pk=profile.pk).update(**{field: name})
+                if field == "profile_picture" and not dry_run:
+                    if not all(default_storage.exists(thumbnail_name(name, s)) for s in THUMBNAIL_SIZES.values()):
+                        render_thumbnails(name)
+                        rendered += 1
+
+        deleted = self.delete_orphans(dry_run) if options["delete_orphans"] else 0
+
+        verb = "Would move" if dry_run else "Moved"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {moved} files into the content-addressed store, rendered thumbnails for "
+            f"{rendered} pictures, {'would delete' if dry_run else 'deleted'} {deleted} orphaned files "
+            f"({missing} missing)."
+        ))
+        self.stdout.write(f"Upload storage: {filesizeformat(before)} -> {filesizeformat(disk_usage())}")
+
+    def extension(self, field, name, fh):
+        if field == "profile_picture":
+            try:
+                with Image.open(fh) as image:
+                    return ProfileForm.PICTURE_FORMATS.get(image.format, os.path.splitext(name)[1].lower())
+            except Exception:
+                pass
+        return os.path.splitext(name)[1].lower()
+
+    def delete_orphans(self, dry_run):
+        referenced = set()
+        for picture, resume in Profile.objects.values_list("profile_picture", "resume").iterator():
+            referenced.update(n for n in (picture, resume) if n)
+            if picture:
+                referenced.update(thumbnail_name(picture, size) for size in THUMBNAIL_SIZES.values())
+
+        deleted = 0
+        cutoff = timezone.now() - ORPHAN_GRACE
+        for directory in (*UPLOAD_DIRS.values(), THUMBNAIL_DIR):
+            for name in list(walk(directory)):
+                if name not in referenced and default_storage.get_modified_time(name) < cutoff:
+                    deleted += 1
+                    if not dry_run:
+                        default_storage.delete(name)
+        return deleted
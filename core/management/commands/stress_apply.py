@@ -0,0 +1,103 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.models import User, JobPosting, Application, Bookmark
+
+PREFIX = "stress_apply_"
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer apply_job and bookmark_job from concurrent clients for the same "
+        "user and job and check that exactly one row results with no errors. Runs "
+        "against a scratch copy of the configured database, dropped afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=16)
+        parser.add_argument("--rounds", type=int, default=10)
+        parser.add_argument(
+            "--db", help="Scratch database: a file path for SQLite, a database name otherwise "
+                         "(default: a temporary file / the test database name).",
+        )
+
+    def handle(self, *args, **options):
+        db = connection.settings_dict
+        scratch = options["db"]
+        if scratch is None and connection.vendor == "sqlite":
+            scratch = os.path.join(tempfile.gettempdir(), "stress_apply.sqlite3")
+        if scratch and str(scratch) == str(db["NAME"]):
+            raise CommandError("--db must not be the configured database; it is dropped afterwards.")
+        if scratch:
+            db.setdefault("TEST", {})["NAME"] = scratch
+        # every row the run creates, audit log included, goes with the scratch database;
+        # a private cache keeps its users, sessions and versions out of the shared one
+        real_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES={"default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "stress_apply",
+            }}):
+                self.run(options)
+        finally:
+            connection.creation.destroy_test_db(real_name, verbosity=0)
+
+    def run(self, options):
+        errors = []
+        statuses = {}
+        lock = threading.Lock()
+        for round_no in range(options["rounds"]):
+            user = User.objects.create_user(f"{PREFIX}{round_no}", password="stress")
+            job = JobPosting.objects.create(
+                title=f"{PREFIX}{round_no}", description="stress", company="stress", location="stress"
+            )
+            barrier = threading.Barrier(options["clients"])
+            # half the clients retry with one shared key, half send their own
+            shared_key = uuid.uuid4().hex
+
+            def worker(n):
+                client = Client(SERVER_NAME="localhost")
+                client.force_login(user)
+                key = shared_key if n % 2 else uuid.uuid4().hex
+                headers = {"X-Requested-With": "XMLHttpRequest", "Idempotency-Key": key}
+                try:
+                    barrier.wait()
+                    for name, data in (("apply_job", {}), ("bookmark_job", {"action": "save"})):
+                        resp = client.post(reverse(name, args=[job.id]), data, headers=headers)
+                        with lock:
+                            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+                except Exception as exc:  # report everything, the point is to find races
+                    with lock:
+                        errors.append(repr(exc))
+                finally:
+                    connection.close()
+
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(options["clients"])]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+
+            applications = Application.objects.filter(user=user, job=job).count()
+            bookmarks = Bookmark.objects.filter(user=user, job=job).count()
+            if applications != 1 or bookmarks != 1:
+                errors.append(f"round {round_no}: applications={applications} bookmarks={bookmarks}")
+            self.stdout.write(f"round {round_no}: {options['clients']} clients in {elapsed * 1000:.0f} ms")
+
+        self.stdout.write(f"status codes: {statuses}")
+        if errors:
+            for error in errors:
+                self.stderr.write(error)
+            self.stderr.write(self.style.ERROR(f"{len(errors)} problem(s) found"))
+        else:
+            self.stdout.write(self.style.SUCCESS("no duplicates, no errors"))
+
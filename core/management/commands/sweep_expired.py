@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.sweeper import sweep
+
+
+class Command(BaseCommand):
+    help = "Delete expired password reset codes, old read notifications and expired sessions in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--notification-days", type=int, default=None,
+            help="Delete read notifications older than this (default NOTIFICATION_RETENTION_DAYS).",
+        )
+        parser.add_argument(
+            "--every", type=int, default=None, metavar="SECONDS",
+            help="Keep running, sweeping every SECONDS, instead of sweeping once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            counts = sweep(batch_size=options["batch_size"], notification_days=options["notification_days"])
+            for name, count in counts.items():
+                self.stdout.write(f"{name}: {count} deleted")
+            self.stdout.write(self.style.SUCCESS(f"Reclaimed {sum(counts.values())} rows."))
+            if not options["every"]:
+                return
+            close_old_connections()
+            time.sleep(options["every"])
@@ -0,0 +1,132 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import collaborative
+from core.collaborative import FactorModel, Interactions, load_feedback, save_model, train_als
+from core.models import Application, Profile
+from core.recommender import JobIndex, _profile_neighbours, _score_candidates, blend, parse_skills
+
+
+class Command(BaseCommand):
+    help = (
+        "Factorize the application/bookmark matrix with implicit ALS and save the factors "
+        "the recommendation pages blend in. --evaluate first reports hit-rate@k on each "
+        "user's most recent application, held out of a separate training run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--factors", type=int, default=16)
+        parser.add_argument("--iterations", type=int, default=15)
+        parser.add_argument("--regularization", type=float, default=1.0)
+        parser.add_argument("--alpha", type=float, default=10.0, help="Confidence per unit of feedback.")
+        parser.add_argument("--workers", type=int, help="Solver threads (default: one per CPU).")
+        parser.add_argument("--evaluate", action="store_true")
+        parser.add_argument("--k", type=int, nargs="+", default=[5, 10, 20])
+        parser.add_argument("--weight", type=float, help="Blend weight to evaluate (default: RECOMMENDER_CF_WEIGHT).")
+        parser.add_argument("--no-save", action="store_true")
+
+    def handle(self, *args, **options):
+        if collaborative.np is None:
+            raise CommandError("NumPy is required to train the collaborative recommender.")
+        feedback = load_feedback()
+        if not feedback:
+            raise CommandError("No applications or bookmarks to learn from.")
+
+        if options["evaluate"]:
+            self.evaluate(feedback, options)
+        if options["no_save"]:
+            return
+
+        interactions, user_factors, job_factors = self.train(feedback, options)
+        path = save_model(interactions, user_factors, job_factors)
+        self.stdout.write(self.style.SUCCESS(f"Saved factors to {path}"))
+
+    def train(self, feedback, options):
+        interactions = Interactions(feedback)
+        start = time.perf_counter()
+        user_factors, job_factors = train_als(
+            interactions,
+            factors=options["factors"],
+            iterations=options["iterations"],
+            regularization=options["regularization"],
+            alpha=options["alpha"],
+            workers=options["workers"],
+        )
+        self.stdout.write(
+            f"Trained on {len(interactions)} interactions ({len(interactions.user_ids)} users x "
+            f"{len(interactions.job_ids)} jobs) in {time.perf_counter() - start:.1f}s"
+        )
+        return interactions, user_factors, job_factors
+
+    def evaluate(self, feedback, options):
+        # hold out each user's latest application when they have other feedback to learn from
+        per_user = {}
+        for user_id, _ in feedback:
+            per_user[user_id] = per_user.get(user_id, 0) + 1
+        holdout = {}
+        for user_id, job_id in Application.objects.order_by("id").values_list("user_id", "job_id").iterator():
+            if per_user.get(user_id, 0) >= 2:
+                holdout[user_id] = job_id
+        if not holdout:
+            raise CommandError("No user has enough feedback to hold one application out.")
+
+        train = {pair: weight for pair, weight in feedback.items() if holdout.get(pair[0]) != pair[1]}
+        interactions, user_factors, job_factors = self.train(train, options)
+        model = FactorModel(interactions.user_ids, interactions.job_ids, user_factors, job_factors)
+
+        index = JobIndex.build()
+        skills = {
+            user_id: parse_skills(text)
+            for user_id, text in Profile.objects.filter(user_id__in=holdout).values_list("user_id", "skills")
+        }
+        seen = {}
+        popularity = {}
+        for user_id, job_id in train:
+            seen.setdefault(user_id, set()).add(job_id)
+            popularity[job_id] = popularity.get(job_id, 0) + 1
+        popular = sorted(popularity, key=lambda job_id: (-popularity[job_id], job_id))
+
+        ks = sorted(options["k"])
+        top = max(ks)
+        hits = {method: dict.fromkeys(ks, 0) for method in ("popularity", "skills", "collaborative", "blended")}
+        for user_id, held_out in holdout.items():
+            exclude = seen.get(user_id, set())
+            candidates = index.all_bits & ~index.mask_for_ids(exclude)
+
+            def is_candidate(job_id):
+                pos = index.position.get(job_id)
+                return pos is not None and bool(candidates >> pos & 1)
+
+            user_skills = skills.get(user_id, [])
+            scored = _score_candidates(index, user_skills, candidates) if user_skills else []
+            vector = model.user_vector(user_id, _profile_neighbours(user_id, user_skills))
+            cf_scores = None if vector is None else model.scores(vector)
+            ranked = {
+                "popularity": [job_id for job_id in popular if job_id not in exclude][:top],
+                "skills": [job_id for _, job_id, _, _ in scored[:top]],
+                "collaborative": [] if cf_scores is None else [
+                    job_id for job_id, _ in self.take(model.ranked_jobs(cf_scores), is_candidate, top)
+                ],
+                "blended": [job_id for _, job_id, _, _, _ in blend(
+                    scored, model, cf_scores, is_candidate, top, weight=options["weight"]
+                )],
+            }
+            for method, job_ids in ranked.items():
+                for k in ks:
+                    if held_out in job_ids[:k]:
+                        hits[method][k] += 1
+
+        self.stdout.write(f"hit-rate@k over {len(holdout)} held-out applications")
+        self.stdout.write(f"{'method':<14}" + "".join(f"{'@' + str(k):>8}" for k in ks))
+        for method, counts in hits.items():
+            self.stdout.write(f"{method:<14}" + "".join(f"{counts[k] / len(holdout):>8.3f}" for k in ks))
+
+    def take(self, pairs, is_candidate, n):
+        taken = []
+        for job_id, score in pairs:
+            if is_candidate(job_id):
+                taken.append((job_id, score))
+                if len(taken) == n:
+                    break
+        return taken
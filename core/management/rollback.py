@@ -0,0 +1,11 @@
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+@contextmanager
+def rolled_back(using=None):
+    """Run the block in a transaction that is rolled back when it ends."""
+    with transaction.atomic(using=using):
+        yield
+        transaction.set_rollback(True, using=using)
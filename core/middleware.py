@@ -1,14 +1,127 @@
-import threading
-from django.utils.deprecation import MiddlewareMixin
+import re
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
 
-_local = threading.local()
+from . import profiling
+
+try:
+    import brotli
+except ImportError:  # optional: fall back to gzip only
+    brotli = None
+
+# A ContextVar follows the request into sync_to_async threads under ASGI.
+# It holds the request rather than the lazy request.user: asgiref inspects
+# context values when switching threads, which would force the user to load.
+_current_request = ContextVar('current_request', default=None)
+
+def get_current_request():
+    return _current_request.get()
 
 def get_current_user():
-    return getattr(_local, 'user', None)
+    return getattr(_current_request.get(), 'user', None)
+
+class CurrentUserMiddleware:
+    # natively sync and async, so ASGI requests skip a thread hop here
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware that prefers Brotli when the optional ``brotli`` package is installed."""
+    re_accepts_br = re.compile(r"\bbr\b")
 
-class CurrentUserMiddleware(MiddlewareMixin):
-    def process_request(self, request):
-        _local.user = getattr(request, 'user', None)
     def process_response(self, request, response):
-        _local.user = None
+        # compressing an event stream would buffer events inside the gzip window
+        if response.get("Content-Type", "").startswith("text/event-stream"):
+            return response
+        if (
+            brotli is None
+            or response.streaming
+            or len(response.content) < 200
+            or response.has_header("Content-Encoding")
+            or not self.re_accepts_br.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed = brotli.compress(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(response.content))
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Samples the stack and times the SQL of each sync request and keeps the
+    sampled or slow ones for the staff profiling page (core.profiling).
+    Removes itself from the chain when PROFILING_ENABLED is off.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not profiling.profiling_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sampled = profiling.should_sample()
+        query_log = profiling.QueryLog(profiling.max_queries())
+        sampler = profiling.get_sampler()
+        start = time.perf_counter()
+        stacks = sampler.track()
+        try:
+            with ExitStack() as stack:
+                query_log.install(stack)
+                response = self.get_response(request)
+        finally:
+            sampler.untrack()
+        elapsed = (time.perf_counter() - start) * 1000
+        profiling.store(request, response.status_code, elapsed, sampled, stacks, query_log)
+        return response
+
+    async def __acall__(self, request):
+        sampled = profiling.should_sample()
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        elapsed = (time.perf_counter() - start) * 1000
+        if sampled or elapsed >= profiling.slow_ms():
+            await sync_to_async(profiling.store)(request, response.status_code, elapsed, sampled)
         return response
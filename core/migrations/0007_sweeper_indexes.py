@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_auditlog_archive'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='passwordresetcode',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['is_read', 'created_at'], name='core_notifi_is_read_57486b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresetcode',
+            index=models.Index(fields=['user', 'created_at'], name='core_passwo_user_id_53f4b0_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_similarjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('display_name', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='skill_tags',
+            field=models.ManyToManyField(blank=True, related_name='jobs', to='core.skill'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='skill_tags',
+            field=models.ManyToManyField(blank=True, related_name='profiles', to='core.skill'),
+        ),
+        migrations.CreateModel(
+            name='SkillAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=100, unique=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='core.skill')),
+            ],
+        ),
+    ]
@@ -0,0 +1,107 @@
+import re
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+# Frozen copies of core.skills.DEFAULT_ALIASES and skill_names() as of this
+# migration, so later edits to that module can't change what it does.
+DEFAULT_ALIASES = {  # display name: aliases
+    "JavaScript": ["js", "java script", "ecmascript"],
+    "TypeScript": ["ts"],
+    "Python": ["python3", "py"],
+    "PostgreSQL": ["postgres", "psql"],
+    "React": ["react.js", "reactjs"],
+    "Node.js": ["node", "nodejs"],
+    "Machine Learning": ["ml"],
+    "Artificial Intelligence": ["ai"],
+    "Excel": ["ms excel", "microsoft excel"],
+    "C#": ["csharp", "c sharp"],
+    "C++": ["cpp"],
+    "Go": ["golang"],
+    "Kubernetes": ["k8s"],
+    "AWS": ["amazon web services"],
+    "UX Design": ["ux", "user experience"],
+    "UI Design": ["ui", "user interface"],
+}
+
+_SPACES = re.compile(r"\s+")
+
+
+def skill_names(text):
+    names = {}
+    for part in (text or "").split(","):
+        display = _SPACES.sub(" ", part).strip()
+        if display and len(display) <= 100:
+            names.setdefault(display.lower(), display)
+    return list(names.items())
+
+
+def _batches(queryset):
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by("id")[:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def populate(apps, schema_editor):
+    Skill = apps.get_model("core", "Skill")
+    SkillAlias = apps.get_model("core", "SkillAlias")
+    Profile = apps.get_model("core", "Profile")
+    JobPosting = apps.get_model("core", "JobPosting")
+
+    Skill.objects.bulk_create(
+        [Skill(name=display.lower(), display_name=display) for display in DEFAULT_ALIASES], ignore_conflicts=True
+    )
+    skill_ids = dict(Skill.objects.values_list("name", "id"))
+    SkillAlias.objects.bulk_create(
+        [
+            SkillAlias(alias=alias, skill_id=skill_ids[display.lower()])
+            for display, aliases in DEFAULT_ALIASES.items()
+            for alias in aliases
+        ],
+        ignore_conflicts=True,
+    )
+    aliases = dict(SkillAlias.objects.values_list("alias", "skill__name"))
+
+    def link(model, text_fields):
+        through = model.skill_tags.through
+        owner_field = f"{model._meta.model_name}_id"
+        for batch in _batches(model.objects.only("id", *text_fields)):
+            wanted = {}
+            for obj in batch:
+                for field in text_fields:
+                    for name, display in skill_names(getattr(obj, field)):
+                        wanted.setdefault(obj.id, {}).setdefault(aliases.get(name, name), display)
+            new = {name: display for names in wanted.values() for name, display in names.items()}
+            new = {name: display for name, display in new.items() if name not in skill_ids}
+            if new:
+                Skill.objects.bulk_create(
+                    [Skill(name=name, display_name=display) for name, display in new.items()], ignore_conflicts=True
+                )
+                skill_ids.update(Skill.objects.filter(name__in=new).values_list("name", "id"))
+            through.objects.bulk_create(
+                [
+                    through(**{owner_field: obj_id, "skill_id": skill_ids[name]})
+                    for obj_id, names in wanted.items()
+                    for name in names
+                ],
+                ignore_conflicts=True,
+            )
+
+    link(Profile, ["skills"])
+    link(JobPosting, ["skills_required", "skill_requirements"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_skill'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
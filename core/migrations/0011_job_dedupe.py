@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_populate_skills'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='core.jobposting'),
+        ),
+        migrations.CreateModel(
+            name='JobLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='core.jobposting')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket'], name='core_joblsh_band_67add3_idx')],
+            },
+        ),
+    ]
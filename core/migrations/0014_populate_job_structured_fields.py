@@ -0,0 +1,227 @@
+import re
+import unicodedata
+from pathlib import Path
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+FIELDS = ("salary_min", "salary_max", "salary_currency", "location_key", "latitude", "longitude")
+
+# Frozen copies of core.structured's parse_salary() and locate() as of this
+# migration, so later edits to that module can't change what it does.
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "data" / "gazetteer.tsv"
+LOCATION_KEY_LENGTH = 100
+
+CURRENCY_SYMBOLS = (("us$", "USD"), ("c$", "CAD"), ("a$", "AUD"), ("$", "USD"), ("£", "GBP"), ("€", "EUR"), ("₹", "INR"))
+CURRENCY_WORDS = {
+    "usd": "USD", "dollars": "USD", "pkr": "PKR", "rs": "PKR", "rupees": "PKR", "inr": "INR",
+    "aed": "AED", "dirhams": "AED", "sar": "SAR", "riyals": "SAR", "qar": "QAR", "eur": "EUR",
+    "euros": "EUR", "gbp": "GBP", "pounds": "GBP", "cad": "CAD", "aud": "AUD",
+}
+MULTIPLIERS = {
+    "k": 1_000, "m": 1_000_000, "mn": 1_000_000, "million": 1_000_000,
+    "lac": 100_000, "lacs": 100_000, "lakh": 100_000, "lakhs": 100_000,
+    "crore": 10_000_000, "crores": 10_000_000,
+}
+MIN_YEARLY_SALARY = 1_000
+# pay per period → per year (40-hour weeks, 260 working days)
+PERIODS = (
+    (re.compile(r"hour|/\s*hr?\b|\bph\b"), 2080),
+    (re.compile(r"\bday\b|daily|/\s*d\b"), 260),
+    (re.compile(r"week"), 52),
+    (re.compile(r"month|/\s*mo\b|\bpm\b|p\.m\."), 12),
+)
+
+_AMOUNT = re.compile(r"(\d(?:[\d,.]*\d)?)\s*(k|mn|m|million|lacs?|lakhs?|crores?)?\b", re.IGNORECASE)
+_DOTTED_THOUSANDS = re.compile(r"\d{1,3}(?:\.\d{3})+")
+_RANGE_GAP = re.compile(r"\s*(?:-|–|—|to)\s*(?:[^\w\s]{1,2}|[a-z]{2,3}\.?)?\s*")
+_WORD = re.compile(r"[a-z]+")
+_UP_TO = re.compile(r"up\s*to|upto|max|under|below|<")
+_FROM = re.compile(r"from|min|starting|at\s*least|\+|>")
+
+
+def _currency(text):
+    for symbol, code in CURRENCY_SYMBOLS:
+        if symbol in text:
+            return code
+    for word in _WORD.findall(text):
+        if word in CURRENCY_WORDS:
+            return CURRENCY_WORDS[word]
+    return ""
+
+
+def _amounts(text):
+    amounts = []
+    previous_end = None
+    for match in _AMOUNT.finditer(text):
+        digits, suffix = match[1], match[2] or ""
+        if not suffix and _DOTTED_THOUSANDS.fullmatch(digits):
+            digits = digits.replace(".", "")  # 50.000
+        try:
+            value = float(digits.replace(",", ""))
+        except ValueError:
+            continue
+        multiplier = MULTIPLIERS.get(suffix.lower(), 1)
+        if (
+            multiplier > 1 and amounts and amounts[-1][1] == 1 and amounts[-1][0] < 1000
+            and _RANGE_GAP.fullmatch(text[previous_end:match.start()])
+        ):
+            amounts[-1] = (amounts[-1][0], multiplier)  # "50-70k"
+        amounts.append((value, multiplier))
+        previous_end = match.end()
+    return amounts
+
+
+def parse_salary(text):
+    """
+    (min, max, currency) from free text such as "$50,000 - $70,000",
+    "50-70k", "PKR 1.5 lakh per month" or "up to €60k". Amounts are per
+    year and either bound can be None; (None, None, "") when there is no
+    amount.
+    """
+    text = (text or "").strip().lower()
+    per_year = next((factor for pattern, factor in PERIODS if pattern.search(text)), 1)
+    values = [round(value * multiplier * per_year) for value, multiplier in _amounts(text)]
+    # "3-5 years exp, 100k": numbers too small to be a yearly pay are something else
+    values = [value for value in values if value >= MIN_YEARLY_SALARY][:2]
+    if not values:
+        return None, None, ""
+
+    if len(values) == 2:
+        low, high = sorted(values)
+    elif _UP_TO.search(text):
+        low, high = None, values[0]
+    elif _FROM.search(text):
+        low, high = values[0], None
+    else:
+        low = high = values[0]
+    return low, high, _currency(text)
+
+
+COUNTRIES = {
+    "pakistan": "PK", "india": "IN", "uae": "AE", "united arab emirates": "AE", "qatar": "QA",
+    "saudi arabia": "SA", "ksa": "SA", "kuwait": "KW", "bahrain": "BH", "oman": "OM", "turkey": "TR",
+    "turkiye": "TR", "iran": "IR", "egypt": "EG", "jordan": "JO", "israel": "IL", "lebanon": "LB",
+    "bangladesh": "BD", "afghanistan": "AF", "sri lanka": "LK", "nepal": "NP", "singapore": "SG",
+    "malaysia": "MY", "indonesia": "ID", "thailand": "TH", "philippines": "PH", "vietnam": "VN",
+    "china": "CN", "taiwan": "TW", "south korea": "KR", "korea": "KR", "japan": "JP",
+    "uk": "GB", "united kingdom": "GB", "england": "GB", "scotland": "GB", "ireland": "IE",
+    "france": "FR", "germany": "DE", "netherlands": "NL", "belgium": "BE", "switzerland": "CH",
+    "austria": "AT", "czech republic": "CZ", "czechia": "CZ", "poland": "PL", "hungary": "HU",
+    "spain": "ES", "portugal": "PT", "italy": "IT", "sweden": "SE", "norway": "NO", "denmark": "DK",
+    "finland": "FI", "greece": "GR", "romania": "RO", "ukraine": "UA", "russia": "RU",
+    "usa": "US", "us": "US", "united states": "US", "america": "US", "canada": "CA", "mexico": "MX",
+    "brazil": "BR", "argentina": "AR", "colombia": "CO", "chile": "CL", "peru": "PE",
+    "nigeria": "NG", "kenya": "KE", "south africa": "ZA", "morocco": "MA", "ghana": "GH",
+    "australia": "AU", "new zealand": "NZ",
+}
+_PARTS = re.compile(r"[,;/|()]|\s-\s")
+_NON_WORD = re.compile(r"[\W_]+")
+_POINT = re.compile(r"\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*")
+
+
+def normalize_location(text):
+    """Lowercase words without accents or punctuation: "São Paulo, BR" → "sao paulo br"."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+class Place:
+    __slots__ = ("key", "name", "country", "latitude", "longitude")
+
+    def __init__(self, name, country, latitude, longitude):
+        self.name = name
+        self.country = country
+        self.latitude = latitude
+        self.longitude = longitude
+        self.key = f"{normalize_location(name).replace(' ', '-')}-{country.lower()}"
+
+    def __repr__(self):
+        return f"<Place {self.key}>"
+
+
+_gazetteer = None  # normalized name or alias: [Place], first row first
+
+
+def gazetteer():
+    global _gazetteer
+    if _gazetteer is None:
+        names = {}
+        with open(GAZETTEER_PATH, encoding="utf-8") as rows:
+            for line in rows:
+                if line.startswith("#") or line.startswith("name\t") or not line.strip():
+                    continue
+                name, country, latitude, longitude, aliases = line.rstrip("\n").split("\t")
+                place = Place(name, country, float(latitude), float(longitude))
+                for alias in [name, *aliases.split("|")]:
+                    if alias.strip():
+                        names.setdefault(normalize_location(alias), []).append(place)
+        _gazetteer = names
+    return _gazetteer
+
+
+def _pick(places, countries):
+    for place in places:
+        if place.country in countries:
+            return place
+    return places[0]
+
+
+def resolve_location(text):
+    """
+    The gazetteer place ``text`` names, or None. Each comma-separated part
+    is tried whole, then by its words ("DHA Phase 5 Lahore"); a country
+    in the text picks between places sharing a name.
+    """
+    names = gazetteer()
+    parts = [normalize_location(part) for part in _PARTS.split(text or "")]
+    parts = [part for part in parts if part]
+    codes = {place.country for places in names.values() for place in places}
+    countries = {COUNTRIES.get(part) or (part.upper() if part.upper() in codes else None) for part in parts}
+
+    for part in parts:
+        if part in names:
+            return _pick(names[part], countries)
+    for part in parts:
+        words = part.split()
+        for size in (3, 2, 1):
+            for start in range(len(words) - size + 1):
+                places = names.get(" ".join(words[start:start + size]))
+                if places:
+                    return _pick(places, countries)
+    return None
+
+
+def locate(text):
+    """(location_key, latitude, longitude) for a posting's location text."""
+    place = resolve_location(text)
+    if place is not None:
+        return place.key, place.latitude, place.longitude
+    return normalize_location(text)[:LOCATION_KEY_LENGTH], None, None
+
+
+def populate(apps, schema_editor):
+    JobPosting = apps.get_model("core", "JobPosting")
+    last_id = 0
+    while True:
+        batch = list(JobPosting.objects.filter(id__gt=last_id).order_by("id").only("id", "salary", "location")[:BATCH_SIZE])
+        if not batch:
+            return
+        for job in batch:
+            values = (*parse_salary(job.salary), *locate(job.location))
+            for field, value in zip(FIELDS, values):
+                setattr(job, field, value)
+        JobPosting.objects.bulk_update(batch, FIELDS)
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_index_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_populate_job_structured_fields'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='auditlogarchive',
+            options={'ordering': ['month', 'id']},
+        ),
+        migrations.AlterField(
+            model_name='auditlogarchive',
+            name='month',
+            field=models.DateField(db_index=True),
+        ),
+    ]
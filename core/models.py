@@ -5,6 +5,53 @@ from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
 
+# ---------------------------
+# ✅ Saved-value tracking for signal receivers
+# ---------------------------
+class TracksSavedFields:
+    """
+    Remembers ``tracked_fields`` as loaded from the database and as of the
+    last save, so receivers can tell what a save changed without a query.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_saved_fields()
+        return instance
+
+    def remember_saved_fields(self, values=None, names=None):
+        """Take the saved values from ``values`` (a dict by attname) or from the instance."""
+        values = self.__dict__ if values is None else values
+        saved = self.__dict__.setdefault("_saved_fields", {})
+        for name in self.tracked_fields:
+            attname = self._meta.get_field(name).attname
+            if (names is None or name in names or attname in names) and attname in values:
+                saved[name] = values[attname]
+
+    def knows_saved_fields(self):
+        return "_saved_fields" in self.__dict__
+
+    def saved_value(self, name, default=None):
+        return self.__dict__.get("_saved_fields", {}).get(name, default)
+
+    def changed_fields(self, *names):
+        """Which of ``names`` differ from the saved values; unknown ones count as changed."""
+        saved = self.__dict__.get("_saved_fields", {})
+        changed = set()
+        for name in names:
+            attname = self._meta.get_field(name).attname
+            if name not in saved or saved[name] != self.__dict__.get(attname):
+                changed.add(name)
+        return changed
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save receivers ran inside save() and compared against the old values
+        self.remember_saved_fields(names=kwargs.get("update_fields"))
+
+
 # ---------------------------
 # ✅ Custom User model
 # ---------------------------
@@ -15,10 +62,29 @@ class User(AbstractUser):
         return self.username
 
 
+# ---------------------------
+# ✅ Skills (normalized from the free-text skill fields, see core.skills)
+# ---------------------------
+class Skill(models.Model):
+    name = models.CharField(max_length=100, unique=True)  # canonical, lowercase
+    display_name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.display_name
+
+
+class SkillAlias(models.Model):
+    alias = models.CharField(max_length=100, unique=True)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="aliases")
+
+    def __str__(self):
+        return f"{self.alias} → {self.skill.name}"
+
+
 # ---------------------------
 # ✅ Profile linked to custom User model
 # ---------------------------
-class Profile(models.Model):
+class Profile(TracksSavedFields, models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
     phone = models.CharField(max_length=20, blank=True, null=True)
     location = models.CharField(max_length=100, blank=True, null=True)
@@ -28,6 +94,7 @@ class Profile(models.Model):
 
     # ✅ Professional Details
     skills = models.TextField(blank=True, null=True)
+    skill_tags = models.ManyToManyField(Skill, blank=True, related_name="profiles")
     experience = models.CharField(max_length=50, blank=True, null=True)
     education = models.TextField(blank=True, null=True)
     certificates = models.TextField(blank=True, null=True)
@@ -39,14 +106,25 @@ class Profile(models.Model):
     skill_vector = models.JSONField(blank=True, null=True)
     last_profile_update = models.DateTimeField(auto_now=True)
 
+    # lets the skill index tell a skills edit from any other profile save
+    tracked_fields = ("skills",)
+
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
+    @property
+    def picture_thumbnails(self):
+        """{"1x": url, "2x": url} for the avatar, or None (use the original)."""
+        if not self.profile_picture:
+            return None
+        from .uploads import thumbnail_urls
+        return thumbnail_urls(self.profile_picture.name)
+
 
 # ---------------------------
 # ✅ Job Posting model
 # ---------------------------
-class JobPosting(models.Model):
+class JobPosting(TracksSavedFields, models.Model):
     JOB_TYPE_CHOICES = [
         ("Full-time", "Full-time"),
         ("Part-time", "Part-time"),
@@ -86,11 +164,75 @@ class JobPosting(models.Model):
     # ✅ For AI skill matching
     skill_requirements = models.TextField(blank=True, null=True)
     skill_vector = models.JSONField(blank=True, null=True)
+    skill_tags = models.ManyToManyField(Skill, blank=True, related_name="jobs")
+
+    # ✅ Near-duplicate of an earlier posting (core.dedupe); hidden from listings
+    duplicate_of = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="duplicates"
+    )
+
+    # ✅ Parsed from salary / location on save (core.structured); yearly amounts
+    salary_min = models.PositiveBigIntegerField(blank=True, null=True, db_index=True, editable=False)
+    salary_max = models.PositiveBigIntegerField(blank=True, null=True, db_index=True, editable=False)
+    salary_currency = models.CharField(max_length=3, blank=True, default="", editable=False)
+    location_key = models.CharField(max_length=100, blank=True, default="", db_index=True, editable=False)
+    latitude = models.FloatField(blank=True, null=True, editable=False)
+    longitude = models.FloatField(blank=True, null=True, editable=False)
+
+    # what the signal receivers derive indexes from (see core.signals)
+    tracked_fields = (
+        "title", "company", "description", "skills_required", "skill_requirements", "deadline", "duplicate_of",
+        "salary", "location",
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["latitude", "longitude"])]
 
     def __str__(self):
         return f"{self.title} - {self.company}"
 
 
+class JobLSHBucket(models.Model):
+    """One MinHash band of a posting; postings sharing a bucket are duplicate candidates."""
+    job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name="lsh_buckets")
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["band", "bucket"])]
+
+
+# ---------------------------
+# ✅ Similar postings (precomputed by core.similarity)
+# ---------------------------
+class SimilarJob(models.Model):
+    job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name="neighbours")
+    similar = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name="neighbour_of")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["job", "rank"], name="unique_similar_job_rank")]
+
+    def __str__(self):
+        return f"{self.job_id} ~ {self.similar_id} ({self.score:.2f})"
+
+
+# ---------------------------
+# ✅ Index versions (see core.recommender)
+# ---------------------------
+class IndexVersion(models.Model):
+    """
+    A counter bumped in the same transaction as the rows an in-process index
+    is built from, so every worker sees the change once it commits.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
 # ---------------------------
 # ✅ Application model
 # ---------------------------
@@ -134,13 +276,30 @@ class Bookmark(models.Model):
 class AuditLog(models.Model):
     action = models.CharField(max_length=200)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     extra_data = models.JSONField(blank=True, null=True)
 
     def __str__(self):
         return f"{self.created_at:%Y-%m-%d %H:%M} - {self.action}"
 
 
+# ---------------------------
+# ✅ Audit Log archive (one gzip JSONL file per month)
+# ---------------------------
+class AuditLogArchive(models.Model):
+    # one row per archive file; a month can span several
+    month = models.DateField(db_index=True)  # first day of the month
+    path = models.CharField(max_length=500)
+    row_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["month", "id"]
+
+    def __str__(self):
+        return f"Audit archive {self.month:%Y-%m} ({self.row_count} rows)"
+
+
 # ---------------------------
 # ✅ Recommendation Audit
 # ---------------------------
@@ -159,12 +318,17 @@ class RecommendationAudit(models.Model):
 # ✅ Password Reset Code (5-digit system)
 # ---------------------------
 class PasswordResetCode(models.Model):
+    TTL = timedelta(minutes=10)
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     code = models.CharField(max_length=5)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "created_at"])]
 
     def is_expired(self):
-        return timezone.now() > self.created_at + timedelta(minutes=10)
+        return timezone.now() > self.created_at + self.TTL
 
     def __str__(self):
         return f"{self.user.email} - {self.code}"
@@ -174,14 +338,14 @@ class PasswordResetCode(models.Model):
 # ✅ Signal: Create Profile automatically
 # ---------------------------
 @receiver(post_save, sender=User)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
+def create_user_profile(sender, instance, created, update_fields=None, **kwargs):
+    # a User save changes nothing on the Profile row, so it isn't rewritten
+    # (that would bump last_profile_update on every login); a full save
+    # only makes sure there is one
     if created:
         Profile.objects.create(user=instance)
-    else:
-        try:
-            instance.profile.save()
-        except Profile.DoesNotExist:
-            Profile.objects.create(user=instance)
+    elif update_fields is None and not User.profile.related.is_cached(instance):
+        Profile.objects.get_or_create(user=instance)
 
 
 # ---------------------------
@@ -193,5 +357,8 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["is_read", "created_at"])]
+
     def __str__(self):
         return f"Notification for {self.user.username}: {self.message[:20]}"
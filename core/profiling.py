@@ -0,0 +1,204 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+
+# --------------------------------------------------
+# Request profiling (opt-in: PROFILING_ENABLED)
+# --------------------------------------------------
+# While a sync request runs, a daemon thread samples its stack every
+# PROFILING_INTERVAL_MS and every query it issues is timed. Requests that
+# were picked at PROFILING_SAMPLE_RATE or took longer than PROFILING_SLOW_MS
+# are kept in a ring of PROFILING_BUFFER_SIZE cache slots (oldest
+# overwritten), so the staff page sees requests from every process when
+# the cache is shared. Stacks are stored collapsed ("a;b;c count"), the
+# input format of flamegraph.pl and speedscope.
+#
+# A sampler rather than cProfile: it gives whole stacks, its cost does not
+# grow with the number of function calls, and it can run on every request
+# so a slow one is caught without being picked in advance. Async views
+# run on the event loop, shared by every in-flight request, so they are
+# timed but get neither stacks nor SQL.
+
+RING_KEY = "core:profile:{}"
+RING_NEXT_KEY = "core:profile:next"
+MAX_DEPTH = 128
+
+
+def profiling_enabled():
+    return getattr(settings, "PROFILING_ENABLED", False)
+
+
+def sample_rate():
+    return getattr(settings, "PROFILING_SAMPLE_RATE", 0.01)
+
+
+def slow_ms():
+    return getattr(settings, "PROFILING_SLOW_MS", 500)
+
+
+def buffer_size():
+    return getattr(settings, "PROFILING_BUFFER_SIZE", 100)
+
+
+def max_queries():
+    return getattr(settings, "PROFILING_MAX_QUERIES", 200)
+
+
+# --------------------------------------------------
+# Stack sampler
+# --------------------------------------------------
+_prefixes = sorted({os.path.abspath(p) + os.sep for p in sys.path if p}, key=len, reverse=True)
+_names = {}  # code object: frame label
+
+
+def _label(code):
+    label = _names.get(code)
+    if label is None:
+        filename = code.co_filename
+        for prefix in _prefixes:
+            if filename.startswith(prefix):
+                filename = filename[len(prefix):]
+                break
+        label = _names[code] = f"{filename}:{getattr(code, 'co_qualname', code.co_name)}".replace(";", ":")
+    return label
+
+
+def collapse(frame):
+    """Root-first ``a;b;c`` for a frame's stack."""
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Samples the stacks of the threads being tracked, from one daemon thread."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.tracked = {}  # thread id: Counter of collapsed stacks
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def track(self):
+        counts = Counter()
+        self.tracked[threading.get_ident()] = counts
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self.run, name="request-profiler", daemon=True)
+                    self._thread.start()
+        return counts
+
+    def untrack(self):
+        self.tracked.pop(threading.get_ident(), None)
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            if not self.tracked:
+                continue
+            frames = sys._current_frames()
+            for thread_id, counts in list(self.tracked.items()):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    counts[collapse(frame)] += 1
+
+
+_sampler = None
+
+
+def get_sampler():
+    global _sampler
+    if _sampler is None:
+        _sampler = StackSampler(getattr(settings, "PROFILING_INTERVAL_MS", 5) / 1000)
+    return _sampler
+
+
+# --------------------------------------------------
+# SQL capture
+# --------------------------------------------------
+class QueryLog:
+    """execute_wrapper that times every query and keeps the first ``limit``."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.queries = []
+        self.count = 0
+        self.total_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.total_ms += elapsed
+            if len(self.queries) < self.limit:
+                self.queries.append((context["connection"].alias, sql, round(elapsed, 3)))
+
+    def install(self, stack):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+
+
+# --------------------------------------------------
+# Ring buffer
+# --------------------------------------------------
+def should_sample():
+    rate = sample_rate()
+    return rate > 0 and random.random() < rate
+
+
+def store(request, status, elapsed_ms, sampled, stacks=None, query_log=None):
+    """Keep the request's profile if it was sampled or slow; returns its id or None."""
+    slow = elapsed_ms >= slow_ms()
+    if not (sampled or slow):
+        return None
+    cache.add(RING_NEXT_KEY, 0, None)
+    record_id = cache.incr(RING_NEXT_KEY)
+    user = getattr(request, "user", None)
+    cache.set(RING_KEY.format(record_id % buffer_size()), {
+        "id": record_id,
+        "at": timezone.now(),
+        "method": request.method,
+        "path": request.get_full_path(),
+        "status": status,
+        "user": user.get_username() if user is not None and user.is_authenticated else "",
+        "duration_ms": round(elapsed_ms, 1),
+        "reason": "slow" if slow else "sampled",
+        "pid": os.getpid(),
+        "stacks": dict(stacks or {}),
+        "samples": sum((stacks or {}).values()),
+        "query_count": query_log.count if query_log else None,
+        "query_ms": round(query_log.total_ms, 1) if query_log else None,
+        "queries": query_log.queries if query_log else [],
+    }, None)
+    return record_id
+
+
+def profiles():
+    """Every stored profile, slowest first."""
+    stored = cache.get_many([RING_KEY.format(slot) for slot in range(buffer_size())])
+    return sorted(stored.values(), key=lambda record: -record["duration_ms"])
+
+
+def get_profile(record_id):
+    record = cache.get(RING_KEY.format(record_id % buffer_size()))
+    return record if record is not None and record["id"] == record_id else None
+
+
+def folded(record):
+    """The record's stacks in collapsed format, heaviest first."""
+    stacks = sorted(record["stacks"].items(), key=lambda item: -item[1])
+    return "".join(f"{stack} {count}\n" for stack, count in stacks)
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+# --------------------------------------------------
+# In-process pub/sub for live notifications
+# --------------------------------------------------
+# Each open notification stream registers an asyncio.Queue under its user
+# id. publish() may be called from any thread (sync views run in a worker
+# thread under ASGI), so messages are handed to the subscriber's event
+# loop with call_soon_threadsafe. Messages only reach streams served by
+# this process; clients that reconnect elsewhere catch up from the DB.
+
+QUEUE_SIZE = 100
+
+_subscribers = {}
+_lock = threading.Lock()
+
+
+class Subscription:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def deliver(self, payload):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            pass  # slow consumer: it will catch up from the DB on reconnect
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+def subscribe(user_id):
+    """Register a subscription for ``user_id``; must be called inside a running loop."""
+    sub = Subscription(user_id)
+    with _lock:
+        _subscribers.setdefault(user_id, set()).add(sub)
+    return sub
+
+
+def unsubscribe(sub):
+    with _lock:
+        subs = _subscribers.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del _subscribers[sub.user_id]
+
+
+def publish(user_id, payload):
+    with _lock:
+        subs = list(_subscribers.get(user_id, ()))
+    for sub in subs:
+        try:
+            sub.loop.call_soon_threadsafe(sub.deliver, payload)
+        except RuntimeError:  # loop already closed
+            unsubscribe(sub)
+    return len(subs)
+
+
+def subscriber_count():
+    with _lock:
+        return sum(len(subs) for subs in _subscribers.values())
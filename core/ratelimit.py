@@ -0,0 +1,161 @@
+import json
+import math
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+# --------------------------------------------------
+# Rate limiting
+# --------------------------------------------------
+# Each bucket allows ``capacity`` requests per ``period``. A request spends
+# one token from its IP bucket and one from its username/email bucket; if
+# either is empty it is answered with 429 straight away, before the view
+# touches the database or hashes a password. In the cache a bucket is a
+# sliding window of per-period counters; the process-local fallback is a
+# token bucket refilling at capacity / period tokens per second.
+
+_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """'5/m' -> (5 tokens, 60 seconds)."""
+    count, _, period = rate.partition("/")
+    return int(count), _PERIODS[period[:1].lower() or "s"]
+
+
+class MemoryBuckets:
+    """Process-local fallback used when the cache backend is unavailable."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, per_second, now):
+        with self._lock:
+            tokens, stamp = self._data.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - stamp) * per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._data[key] = (tokens, now)
+            return allowed, tokens
+
+
+_memory = MemoryBuckets()
+
+
+def _take_from_memory(key, capacity, period):
+    per_second = capacity / period
+    allowed, tokens = _memory.take(key, capacity, per_second, time.monotonic())
+    return allowed, 0 if allowed else max(1, int((1 - tokens) / per_second + 0.999))
+
+
+def _take_from_cache(key, capacity, period, now):
+    # cache.add + cache.incr are atomic, so concurrent workers can't both
+    # spend the last token; a get-then-set would let them
+    window = int(now // period)
+    current = f"{key}:{window}"
+    cache.add(current, 0, period * 2)
+    try:
+        count = cache.incr(current)
+    except ValueError:  # expired between add and incr
+        cache.add(current, 1, period * 2)
+        count = cache.get(current, 1)
+    previous = cache.get(f"{key}:{window - 1}", 0)
+    # the previous window counts for the part of it still inside the last ``period``
+    elapsed = now % period
+    if previous * (1 - elapsed / period) + count <= capacity:
+        return True, 0
+    cache.decr(current)  # a rejected request spends nothing, as in the token bucket
+    count -= 1
+    if previous and count < capacity:  # room once enough of the previous window has slid out
+        wait = (1 - (capacity - 1 - count) / previous) * period - elapsed
+    else:  # this window alone is full: wait until it is the previous one and has slid out enough
+        wait = period - elapsed + (1 - (capacity - 1) / count) * period
+    return False, max(1, math.ceil(wait))
+
+
+def take_token(key, rate):
+    """Spend one token from bucket ``key``; returns (allowed, seconds until next token)."""
+    capacity, period = parse_rate(rate)
+    if getattr(settings, "RATELIMIT_USE_MEMORY", False):
+        return _take_from_memory(key, capacity, period)
+    try:
+        return _take_from_cache(key, capacity, period, time.time())
+    except Exception:  # cache backend down: degrade to per-process buckets
+        return _take_from_memory(key, capacity, period)
+
+
+def clear_bucket(key, rate):
+    """Refill bucket ``key`` (for benchmarks and manual unblocking)."""
+    _, period = parse_rate(rate)
+    window = int(time.time() // period)
+    cache.delete_many([f"{key}:{window}", f"{key}:{window - 1}"])
+    with _memory._lock:
+        _memory._data.pop(key, None)
+
+
+def client_ip(request):
+    if getattr(settings, "RATELIMIT_TRUST_X_FORWARDED_FOR", False):
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _identity(request, fields):
+    data = request.POST
+    if not data and request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+    for field in fields:
+        value = data.get(field)
+        if value:
+            return str(value).strip().lower()
+    return None
+
+
+def ratelimit(scope, rate, fields=("username", "email"), methods=("POST",)):
+    """
+    Limit ``methods`` requests per client IP and per submitted username/email.
+    ``rate`` is "<count>/<s|m|h|d>" and can be overridden per scope via
+    settings.RATELIMITS.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods or not getattr(settings, "RATELIMIT_ENABLED", True):
+                return view_func(request, *args, **kwargs)
+
+            scope_rate = getattr(settings, "RATELIMITS", {}).get(scope, rate)
+            keys = [f"core:rl:{scope}:ip:{client_ip(request)}"]
+            identity = _identity(request, fields)
+            if identity:
+                keys.append(f"core:rl:{scope}:id:{identity}")
+
+            for key in keys:
+                allowed, retry_after = take_token(key, scope_rate)
+                if not allowed:
+                    return rate_limited_response(request, retry_after)
+            return view_func(request, *args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def rate_limited_response(request, retry_after):
+    message = "Too many attempts. Please try again later."
+    if request.path.startswith("/api/") or "application/json" in request.headers.get("accept", ""):
+        response = JsonResponse({"detail": message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type="text/plain")
+    response["Retry-After"] = str(retry_after)
+    return response
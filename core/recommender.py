@@ -0,0 +1,569 @@
+import math
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.utils import timezone
+
+from .collaborative import get_model as get_cf_model, model_version
+from .models import JobPosting, Application, IndexVersion, Profile, User
+from .structured import bounding_box, distance_km, parse_amount, parse_point, parse_radius, salary_bounds
+
+# --------------------------------------------------
+# Facets that recommendations can be filtered on
+# --------------------------------------------------
+FACETS = ("job_type", "experience_level", "employment_type", "remote_option", "location", "salary_currency")
+# ...and ranges over the structured columns (core.structured)
+RANGE_FILTERS = ("salary_min", "salary_max", "near")
+
+# IndexVersion rows
+CATALOG_VERSION_KEY = "catalog"
+CATALOG_VERSION_CACHE_KEY = "core:catalog_version"
+SKILL_INDEX_VERSION_KEY = "skill_index"
+TOP_K_KEY = "core:topk:{}"
+
+CF_MIN_SCORE = 0.1  # weaker collaborative-only picks are left out
+CF_EXPLAIN_SCORE = 0.3
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+_FALSE_VALUES = ("0", "false", "no", "off")
+
+
+def _version(name):
+    # read from the database rather than the cache: a per-process cache would
+    # leave the other workers serving an index built from the old rows
+    return IndexVersion.objects.filter(name=name).values_list("value", flat=True).first() or 0
+
+
+def _bump_version(name):
+    # runs in the caller's transaction, so the new value commits with the rows
+    if not IndexVersion.objects.filter(name=name).update(value=F("value") + 1):
+        IndexVersion.objects.get_or_create(name=name, defaults={"value": 1})
+
+
+def catalog_version():
+    """Opaque token that changes whenever a JobPosting is saved or deleted."""
+    return _version(CATALOG_VERSION_KEY)
+
+
+def cached_catalog_version():
+    """
+    catalog_version() read through the cache, for the anonymous page cache,
+    whose hits shouldn't touch the database. Bumps clear it on commit; the
+    timeout bounds how stale a per-process cache can be in other workers.
+    """
+    version = cache.get(CATALOG_VERSION_CACHE_KEY)
+    if version is None:
+        version = catalog_version()
+        cache.set(CATALOG_VERSION_CACHE_KEY, version, getattr(settings, "CATALOG_VERSION_CACHE_TIMEOUT", 10))
+    return version
+
+
+def bump_catalog_version():
+    _bump_version(CATALOG_VERSION_KEY)
+    transaction.on_commit(lambda: cache.delete(CATALOG_VERSION_CACHE_KEY))
+
+
+def skill_index_version():
+    """Opaque token that changes whenever a profile's skills change."""
+    return _version(SKILL_INDEX_VERSION_KEY)
+
+
+def bump_skill_index_version():
+    _bump_version(SKILL_INDEX_VERSION_KEY)
+
+
+def recommendation_version(user, today=None):
+    """
+    Everything a user's recommendation list depends on: their profile, the
+    catalog, the jobs they applied to, the collaborative model and the date
+    (deadlines expire daily).
+    """
+    # one query, straight from the database: the cached request.user and its
+    # profile may be another process's stale copy, and a stale ETag answers 304
+    applications = Application.objects.filter(user=OuterRef("pk")).order_by().values("user")
+    profile_updated, catalog, applied, last_applied = User.objects.filter(pk=user.pk).values_list(
+        "profile__last_profile_update",
+        Subquery(IndexVersion.objects.filter(name=CATALOG_VERSION_KEY).values("value")),
+        Subquery(applications.annotate(count=Count("id")).values("count")),
+        Subquery(applications.annotate(last=Max("id")).values("last")),
+    ).first() or (None, None, None, None)
+    today = today or timezone.localdate()
+    return (
+        user.pk,
+        profile_updated.isoformat() if profile_updated else "",
+        catalog or 0,
+        model_version(),
+        applied or 0,
+        last_applied or 0,
+        today.isoformat(),
+    )
+
+
+def _facet_value(facet, value):
+    if facet == "location":
+        return (value or "").strip().lower()
+    if facet == "salary_currency":
+        return (value or "").strip().upper()
+    return value
+
+
+def parse_filters(params):
+    """Pick the supported facet filters out of a QueryDict / dict."""
+    filters = {}
+    for facet in FACETS:
+        raw = params.get(facet)
+        if raw in (None, ""):
+            continue
+        if facet == "remote_option":
+            raw = str(raw).lower()
+            if raw in _TRUE_VALUES:
+                filters[facet] = True
+            elif raw in _FALSE_VALUES:
+                filters[facet] = False
+            continue
+        filters[facet] = _facet_value(facet, raw)
+
+    for name in ("salary_min", "salary_max"):
+        amount = parse_amount(params.get(name))
+        if amount is not None:
+            filters[name] = amount
+    if params.get("near"):
+        point = parse_point(params["near"])  # None: an unknown place matches nothing
+        filters["near"] = point and (*point, parse_radius(params.get("radius")))
+    return filters
+
+
+def parse_skills(text):
+    return [s.strip().lower() for s in (text or "").split(",") if s.strip()]
+
+
+def score_skills(skills, text):
+    """Keyword match used by the recommendation page: 50 + 10 per matched skill, capped at 100."""
+    matched = [skill for skill in skills if skill in text]
+    if not matched:
+        return 0, []
+    return min(100, 50 + 10 * len(matched)), matched
+
+
+# --------------------------------------------------
+# Bitmap index over the job catalog
+# --------------------------------------------------
+# Each posting gets a bit position; every facet value maps to a Python int
+# whose set bits are the postings carrying that value. Filters are then
+# plain integer ANDs and facet counts are popcounts.
+class JobIndex:
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.ids = []
+        self.texts = []
+        self.deadlines = []
+        self.position = {}
+        self.bitmaps = {facet: {} for facet in FACETS}
+        self.no_deadline = 0
+        self.by_deadline = {}
+        self._open_cache = (None, 0)
+        self.salary_tops = []  # (top of range, pos), sorted
+        self.salary_bottoms = []  # (bottom of range, pos), sorted
+        self.points = []  # (latitude, longitude, pos), sorted
+
+        for pos, row in enumerate(rows):
+            bit = 1 << pos
+            self.ids.append(row["id"])
+            self.texts.append((row["description"] or "").lower())
+            self.deadlines.append(row["deadline"])
+            self.position[row["id"]] = pos
+            for facet in FACETS:
+                value = _facet_value(facet, row[facet])
+                bucket = self.bitmaps[facet]
+                bucket[value] = bucket.get(value, 0) | bit
+            if row["deadline"] is None:
+                self.no_deadline |= bit
+            else:
+                self.by_deadline[row["deadline"]] = self.by_deadline.get(row["deadline"], 0) | bit
+            top, bottom = salary_bounds(row["salary_min"], row["salary_max"])
+            if top is not None:
+                self.salary_tops.append((top, pos))
+                self.salary_bottoms.append((bottom, pos))
+            if row["latitude"] is not None and row["longitude"] is not None:
+                self.points.append((row["latitude"], row["longitude"], pos))
+
+        self.all_bits = (1 << len(self.ids)) - 1
+        self.salary_tops.sort()
+        self.salary_bottoms.sort()
+        self.points.sort()
+
+    @classmethod
+    def build(cls, version=None):
+        rows = (
+            JobPosting.objects.filter(duplicate_of__isnull=True)
+            .order_by("id").values(
+                "id", "description", "deadline", "salary_min", "salary_max", "latitude", "longitude", *FACETS
+            )
+        )
+        return cls(list(rows), version=version)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def open_mask(self, today):
+        """Postings without a deadline or whose deadline is today or later."""
+        cached_day, mask = self._open_cache
+        if cached_day == today:
+            return mask
+        mask = self.no_deadline
+        for deadline, bits in self.by_deadline.items():
+            if deadline >= today:
+                mask |= bits
+        self._open_cache = (today, mask)
+        return mask
+
+    def mask_for_ids(self, job_ids):
+        mask = 0
+        for job_id in job_ids:
+            pos = self.position.get(job_id)
+            if pos is not None:
+                mask |= 1 << pos
+        return mask
+
+    def facet_mask(self, facet, value):
+        return self.bitmaps[facet].get(value, 0)
+
+    def salary_mask(self, at_least=None, at_most=None):
+        """Same test as structured.salary_q, by bisecting the sorted range ends."""
+        mask = self.all_bits
+        if at_least is not None:
+            start = bisect_left(self.salary_tops, (at_least,))
+            mask &= self._bits(pos for _, pos in self.salary_tops[start:])
+        if at_most is not None:
+            end = bisect_right(self.salary_bottoms, (at_most, math.inf))
+            mask &= self._bits(pos for _, pos in self.salary_bottoms[:end])
+        return mask
+
+    def radius_mask(self, latitude, longitude, radius_km):
+        """Postings within ``radius_km``: a latitude band by bisection, then the exact distance."""
+        (low, high), _ = bounding_box(latitude, longitude, radius_km)
+        mask = 0
+        for lat, lon, pos in self.points[bisect_left(self.points, (low,)):]:
+            if lat > high:
+                break
+            if distance_km(latitude, longitude, lat, lon) <= radius_km:
+                mask |= 1 << pos
+        return mask
+
+    def range_mask(self, filters):
+        mask = self.all_bits
+        if "salary_min" in filters or "salary_max" in filters:
+            mask &= self.salary_mask(filters.get("salary_min"), filters.get("salary_max"))
+        if "near" in filters:
+            mask &= self.radius_mask(*filters["near"]) if filters["near"] else 0
+        return mask
+
+    @staticmethod
+    def _bits(positions):
+        mask = 0
+        for pos in positions:
+            mask |= 1 << pos
+        return mask
+
+    def apply_filters(self, mask, filters, skip=None):
+        """Facet filters only; range filters go into the base mask (range_mask)."""
+        for facet, value in filters.items():
+            if facet != skip and facet not in RANGE_FILTERS:
+                mask &= self.facet_mask(facet, value)
+        return mask
+
+    def facet_counts(self, base_mask, filters):
+        """Disjunctive counts: each facet is counted with every other filter applied."""
+        counts = {}
+        for facet in FACETS:
+            mask = self.apply_filters(base_mask, filters, skip=facet)
+            counts[facet] = {
+                value: (bits & mask).bit_count()
+                for value, bits in self.bitmaps[facet].items()
+                if bits & mask
+            }
+        return counts
+
+    def positions(self, mask):
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_job_index():
+    global _index
+    version = catalog_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = JobIndex.build(version=version)
+            index = _index
+    return index
+
+
+class SkillIndex:
+    """Maps each skill to the ids of the users listing it on their profile."""
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.users = {}
+        for user_id, skills in rows:
+            for skill in parse_skills(skills):
+                self.users.setdefault(skill, set()).add(user_id)
+
+    @classmethod
+    def build(cls, version=None):
+        rows = Profile.objects.exclude(skills__isnull=True).exclude(skills="").values_list("user_id", "skills")
+        return cls(rows.iterator(), version=version)
+
+    def interested_users(self, text):
+        """Users with at least one skill occurring in ``text`` (lowercased)."""
+        users = set()
+        for skill, holders in self.users.items():
+            if skill in text:
+                users |= holders
+        return users
+
+
+_skill_index = None
+
+
+def get_skill_index():
+    global _skill_index
+    version = skill_index_version()
+    index = _skill_index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _skill_index is None or _skill_index.version != version:
+                _skill_index = SkillIndex.build(version=version)
+            index = _skill_index
+    return index
+
+
+# --------------------------------------------------
+# Filter-then-rank recommendations
+# --------------------------------------------------
+def _rank(item):
+    score, job_id = item[0], item[1]
+    return -score, job_id
+
+
+def _score_candidates(index, skills, candidates):
+    """(score, job_id, matched, deadline) for every matching posting, best first."""
+    scored = []
+    for pos in index.positions(candidates):
+        score, matched = score_skills(skills, index.texts[pos])
+        if matched:
+            scored.append((score, index.ids[pos], tuple(matched), index.deadlines[pos]))
+    scored.sort(key=_rank)
+    return scored
+
+
+def cf_weight():
+    return getattr(settings, "RECOMMENDER_CF_WEIGHT", 0.3)
+
+
+def blend(scored, model, cf_scores, is_candidate, limit=None, weight=None):
+    """
+    Mix skill scores with collaborative ones into (score, job_id, matched,
+    skill_score, cf_score), best first. Postings no skill matched can enter
+    on their collaborative score alone.
+    """
+    weight = cf_weight() if weight is None else weight
+    if cf_scores is None:
+        return [(score, job_id, matched, score, None) for score, job_id, matched, _ in scored][:limit]
+
+    blended = {}
+    for skill, job_id, matched, _ in scored:
+        cf = model.score_for(cf_scores, job_id)
+        blended[job_id] = (round((1 - weight) * skill + weight * 100 * cf), job_id, matched, skill, cf)
+    extra = 0
+    for job_id, cf in model.ranked_jobs(cf_scores, CF_MIN_SCORE):
+        if extra >= (limit or top_k_size()):
+            break
+        if job_id in blended or not is_candidate(job_id):
+            continue
+        blended[job_id] = (round(weight * 100 * cf), job_id, (), 0, cf)
+        extra += 1
+    return sorted(blended.values(), key=_rank)[:limit]
+
+
+def _profile_neighbours(user_id, skills):
+    users = get_skill_index().users
+    for skill in skills:
+        for other in users.get(skill, ()):
+            if other != user_id:
+                yield other
+
+
+def _explain(matched, cf):
+    reasons = []
+    if matched:
+        reasons.append("Matched skills: " + ", ".join([s.capitalize() for s in matched]))
+    if cf is not None and cf >= CF_EXPLAIN_SCORE:
+        reasons.append("People with your profile also applied to this job")
+    return ". ".join(reasons)
+
+
+def recommend_jobs(user, filters=None, today=None, limit=None):
+    """
+    Return (recommendations, facet_counts) for ``user``.
+
+    Expired, already-applied and out-of-range (salary, radius) postings are
+    removed and facet filters are intersected on the bitmap index before
+    any description is scored, so a
+    narrow filter only scores a handful of candidates. Without filters and
+    with a ``limit`` the best ``limit`` postings come from the user's
+    stored top-k list instead (see below). When a collaborative model has
+    been trained, its scores are blended in.
+    """
+    filters = filters or {}
+    profile = getattr(user, "profile", None)
+    skills = parse_skills(profile.skills if profile else "")
+
+    index = get_job_index()
+    today = today or timezone.localdate()
+    applied_ids = set(Application.objects.filter(user=user).values_list("job_id", flat=True))
+
+    base_mask = index.open_mask(today) & ~index.mask_for_ids(applied_ids) & index.range_mask(filters)
+    candidates = index.apply_filters(base_mask, filters)
+    facet_counts = index.facet_counts(base_mask, filters)
+
+    model = get_cf_model()
+    cf_scores = None
+    if model is not None:
+        vector = model.user_vector(user.pk, _profile_neighbours(user.pk, skills))
+        cf_scores = None if vector is None else model.scores(vector)
+
+    if not skills and cf_scores is None:
+        return [], facet_counts
+
+    if not skills:
+        scored = []
+    elif limit and not filters:
+        scored = stored_top_k(user.pk, skills, applied_ids, today, limit)
+    else:
+        scored = _score_candidates(index, skills, candidates)[:limit]
+
+    def is_candidate(job_id):
+        pos = index.position.get(job_id)
+        return pos is not None and bool(candidates >> pos & 1)
+
+    scored = blend(scored, model, cf_scores, is_candidate, limit)
+
+    jobs = JobPosting.objects.in_bulk([job_id for _, job_id, _, _, _ in scored])
+    recommendations = []
+    for score, job_id, matched, skill_score, cf in scored:
+        job = jobs.get(job_id)
+        if job is None:
+            continue
+        recommendations.append({
+            "job": job,
+            "score": score,
+            "skill_score": skill_score,
+            "cf_score": None if cf is None else round(cf, 3),
+            "matched_skills": list(matched),
+            "explanation": _explain(matched, cf),
+        })
+    return recommendations, facet_counts
+
+
+# --------------------------------------------------
+# Stored top-k lists, maintained one posting at a time
+# --------------------------------------------------
+# Each user's best postings are kept in the cache, ranked, with twice the
+# page size as headroom for applications and deletions. A list is either
+# complete (every matching posting is in it) or an exact prefix of the
+# full ranking. When a posting is saved or deleted, the skill index tells
+# which users could match it and only their lists are updated, so the
+# cost of a new posting follows the number of interested users instead
+# of users x postings.
+
+def top_k_size():
+    return getattr(settings, "RECOMMENDATION_TOP_K", 50)
+
+
+def _store_size():
+    return 2 * top_k_size()
+
+
+def _build_top_k(user_id, skills, today):
+    index = get_job_index()
+    applied_ids = Application.objects.filter(user_id=user_id).values_list("job_id", flat=True)
+    candidates = index.open_mask(today) & ~index.mask_for_ids(applied_ids) & index.all_bits
+    scored = _score_candidates(index, skills, candidates)
+    size = _store_size()
+    return {"skills": skills, "complete": len(scored) <= size, "items": scored[:size]}
+
+
+def stored_top_k(user_id, skills, applied_ids, today, limit):
+    """The user's best ``limit`` open, not-yet-applied postings from the stored list."""
+    listed = get_job_index().position  # drops postings deleted or deduplicated in bulk
+    key = TOP_K_KEY.format(user_id)
+    entry = cache.get(key)
+    rebuilt = entry is None or entry["skills"] != skills
+    while True:
+        if rebuilt:
+            entry = _build_top_k(user_id, skills, today)
+            cache.set(key, entry, getattr(settings, "RECOMMENDATION_TOP_K_TIMEOUT", 24 * 60 * 60))
+        live = [
+            item for item in entry["items"]
+            if item[1] in listed and item[1] not in applied_ids and (item[3] is None or item[3] >= today)
+        ]
+        # a partial list that ran short no longer covers the top ``limit``
+        if len(live) >= limit or entry["complete"] or rebuilt:
+            return live[:limit]
+        rebuilt = True
+
+
+def splice_job(job_id, old_text=None):
+    """
+    Re-score one posting for the users it concerns and update their stored
+    lists in place; a deleted or duplicate posting is removed. ``old_text``
+    is the description before an edit, so users who matched only the old
+    wording lose it. Returns the number of lists changed.
+    """
+    job = JobPosting.objects.filter(pk=job_id, duplicate_of__isnull=True).values("description", "deadline").first()
+    today = timezone.localdate()
+    text = (job["description"] or "").lower() if job else ""
+    listed = job is not None and (job["deadline"] is None or job["deadline"] >= today)
+
+    skill_index = get_skill_index()
+    users = skill_index.interested_users(text) if listed else set()
+    if old_text and old_text != text:
+        users |= skill_index.interested_users(old_text)
+    if not users:
+        return 0
+
+    keys = {TOP_K_KEY.format(user_id): user_id for user_id in users}
+    size = _store_size()
+    changed = {}
+    # users without a stored list are skipped; theirs is built on next read
+    for key, entry in cache.get_many(list(keys)).items():
+        items = [item for item in entry["items"] if item[1] != job_id]
+        touched = len(items) != len(entry["items"])
+        score, matched = score_skills(entry["skills"], text) if listed else (0, [])
+        if matched:
+            item = (score, job_id, tuple(matched), job["deadline"])
+            # beyond the end of a partial list is outside the stored prefix
+            if entry["complete"] or (items and _rank(item) < _rank(items[-1])):
+                insort(items, item, key=_rank)
+                touched = True
+        if not touched:
+            continue
+        complete = entry["complete"] and len(items) <= size
+        changed[key] = {"skills": entry["skills"], "complete": complete, "items": items[:size]}
+
+    if changed:
+        cache.set_many(changed, getattr(settings, "RECOMMENDATION_TOP_K_TIMEOUT", 24 * 60 * 60))
+    return len(changed)
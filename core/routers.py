@@ -0,0 +1,237 @@
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, InterfaceError, OperationalError, connections
+
+from .middleware import get_current_request
+
+# --------------------------------------------------
+# Read replicas
+# --------------------------------------------------
+# Views marked @read_replica send their reads to one of the aliases in
+# DATABASE_REPLICAS; writes, reads inside a transaction and every other
+# view stay on 'default'. One replica serves a whole request so its reads
+# agree with each other.
+#
+# Read-your-writes: a write pins its user to the primary for
+# REPLICA_PIN_SECONDS (a cache key, so every process sees it), and the
+# rest of that request reads from the primary too. A JobPosting write pins
+# everyone, since cached pages and the in-process indexes are keyed on the
+# catalog version it bumps and must not be rebuilt from a lagging copy.
+#
+# Health: each replica is probed at most every REPLICA_HEALTH_CHECK_INTERVAL
+# seconds per process (and, on PostgreSQL, must be within REPLICA_MAX_LAG
+# seconds of the primary). A replica that fails a query is marked down
+# and a GET/HEAD request is retried once on the primary.
+
+PIN_KEY = "core:replica:pin:{}"
+CATALOG_PIN_KEY = "core:replica:pin:catalog"
+CATALOG_MODELS = frozenset({"core.JobPosting", "core.SimilarJob"})
+SAFE_METHODS = ("GET", "HEAD")
+
+LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", ())
+
+
+def pin_seconds():
+    return getattr(settings, "REPLICA_PIN_SECONDS", 5)
+
+
+def health_check_interval():
+    return getattr(settings, "REPLICA_HEALTH_CHECK_INTERVAL", 10)
+
+
+# --------------------------------------------------
+# Health
+# --------------------------------------------------
+_health = {}  # alias: (checked at, healthy)
+
+
+def replica_lag(alias):
+    """Seconds ``alias`` is behind the primary, or None when the backend can't tell."""
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        lag = cursor.fetchone()[0]
+    return None if lag is None else float(lag)
+
+
+def probe(alias):
+    """Run the health check against ``alias`` now and remember the result."""
+    max_lag = getattr(settings, "REPLICA_MAX_LAG", None)
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+        lag = replica_lag(alias) if max_lag is not None else None
+        healthy = lag is None or lag <= max_lag
+    except DatabaseError:
+        connections[alias].close()
+        healthy = False
+    _health[alias] = (time.monotonic(), healthy)
+    return healthy
+
+
+def replica_healthy(alias):
+    checked = _health.get(alias)
+    if checked is None or time.monotonic() - checked[0] >= health_check_interval():
+        return probe(alias)
+    return checked[1]
+
+
+def mark_unhealthy(alias):
+    _health[alias] = (time.monotonic(), False)
+
+
+def choose_replica():
+    healthy = [alias for alias in replica_aliases() if replica_healthy(alias)]
+    return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+
+# --------------------------------------------------
+# Pins
+# --------------------------------------------------
+def is_pinned(user):
+    keys = [CATALOG_PIN_KEY]
+    if user is not None and user.is_authenticated:
+        keys.append(PIN_KEY.format(user.pk))
+    return bool(cache.get_many(keys))
+
+
+def _pin_writer(model):
+    request = get_current_request()
+    if request is None:
+        return
+    wanted = set()
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        wanted.add(PIN_KEY.format(user.pk))
+    if model._meta.label in CATALOG_MODELS:
+        wanted.add(CATALOG_PIN_KEY)
+
+    pinned = request.__dict__.setdefault("_primary_pins", set())
+    if wanted - pinned:
+        cache.set_many(dict.fromkeys(wanted - pinned, 1), pin_seconds())
+        pinned |= wanted
+
+
+class _Reads:
+    """Where a @read_replica request reads from; chosen at its first query."""
+
+    __slots__ = ("request", "alias", "user_pk")
+
+    def __init__(self, request):
+        self.request = request
+        self.alias = None
+        self.user_pk = None
+
+    def _user(self):
+        user = getattr(self.request, "user", None)
+        return user if user is not None and user.is_authenticated else None
+
+    def choose(self):
+        self.alias = DEFAULT_DB_ALIAS  # loading a lazy request.user reads from the primary
+        user = self._user()
+        self.user_pk = user and user.pk
+        if not is_pinned(user):
+            self.alias = choose_replica()
+
+    def signed_in_since(self):
+        # DRF authenticates (JWT) after the view starts, often with this
+        # request's first query, so a user can appear after the choice
+        return self.user_pk is None and self._user() is not None
+
+
+_reads = ContextVar("replica_reads", default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        reads = _reads.get()
+        if reads is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        if reads.alias is None or (reads.alias != DEFAULT_DB_ALIAS and reads.signed_in_since()):
+            reads.choose()
+        return reads.alias
+
+    def db_for_write(self, model, **hints):
+        if replica_aliases():
+            reads = _reads.get()
+            if reads is not None:
+                reads.alias = DEFAULT_DB_ALIAS
+            _pin_writer(model)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their schema from the primary
+        if db in replica_aliases():
+            return False
+        return None
+
+
+def _retry_on_primary(request):
+    reads = _reads.get()
+    if request.method not in SAFE_METHODS or reads.alias in (None, DEFAULT_DB_ALIAS):
+        return False
+    mark_unhealthy(reads.alias)
+    reads.alias = DEFAULT_DB_ALIAS
+    return True
+
+
+def read_replica(view):
+    """
+    Serve the view's reads from a replica (see above). For class-based DRF
+    views, decorate ``dispatch`` with method_decorator.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not replica_aliases():
+                return await view(request, *args, **kwargs)
+            token = _reads.set(_Reads(request))
+            try:
+                try:
+                    return await view(request, *args, **kwargs)
+                except (OperationalError, InterfaceError):
+                    if not _retry_on_primary(request):
+                        raise
+                    return await view(request, *args, **kwargs)
+            finally:
+                _reads.reset(token)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not replica_aliases():
+            return view(request, *args, **kwargs)
+        token = _reads.set(_Reads(request))
+        try:
+            try:
+                return view(request, *args, **kwargs)
+            except (OperationalError, InterfaceError):
+                if not _retry_on_primary(request):
+                    raise
+                return view(request, *args, **kwargs)
+        finally:
+            _reads.reset(token)
+
+    return wrapper
@@ -1,18 +1,68 @@
 from rest_framework import serializers
 from .models import User, JobPosting, Application
 
+
+class DynamicFieldsMixin:
+    """Keep only the fields named in the ``fields`` kwarg or the ``?fields=`` query parameter."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            request = self.context.get('request')
+            raw = request.query_params.get('fields') if request is not None else None
+            if raw:
+                fields = [f.strip() for f in raw.split(',') if f.strip()]
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+def serialize_values(serializer, queryset):
+    """
+    Yield the same dicts ``serializer`` would produce, built from
+    ``queryset.values()`` rows instead of model instances. Only works for
+    serializers whose fields are plain (optionally dotted) attribute sources.
+    """
+    fields = list(serializer.fields.values())
+    paths = [field.source.replace('.', '__') for field in fields]
+    for row in queryset.values(*paths):
+        yield {
+            field.field_name: None if row[path] is None else field.to_representation(row[path])
+            for field, path in zip(fields, paths)
+        }
+
+
+def only_paths(serializer):
+    """Column paths for ``QuerySet.only()`` covering the serializer's fields."""
+    return [field.source.replace('.', '__') for field in serializer.fields.values()]
+
+
 class UserSerializer(serializers.ModelSerializer):
+    # skills / experience / location live on Profile, not User
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'skills', 'experience', 'location']
+        fields = ['id', 'username', 'email']
 
-class JobPostingSerializer(serializers.ModelSerializer):
+class JobPostingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
 
     class Meta:
         model = JobPosting
         fields = '__all__'
 
+class JobPostingListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # compact shape for list responses: no description, no skill vectors
+    created_by = serializers.CharField(source='created_by.username', read_only=True, allow_null=True)
+
+    class Meta:
+        model = JobPosting
+        fields = [
+            'id', 'title', 'company', 'location', 'salary', 'job_type',
+            'experience_level', 'employment_type', 'remote_option',
+            'deadline', 'created_at', 'created_by',
+            'salary_min', 'salary_max', 'salary_currency', 'latitude', 'longitude',
+        ]
+
 class ApplicationSerializer(serializers.ModelSerializer):
     # show job title in responses for clarity
     job_title = serializers.CharField(source='job.title', read_only=True)
@@ -26,3 +76,22 @@ class ApplicationSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         validated_data["user"] = request.user
         return super().create(validated_data)
+
+
+class RecommendationSerializer(DynamicFieldsMixin, serializers.Serializer):
+    # items come from recommender.recommend_jobs()
+    id = serializers.IntegerField(source='job.id')
+    title = serializers.CharField(source='job.title')
+    company = serializers.CharField(source='job.company')
+    location = serializers.CharField(source='job.location')
+    job_type = serializers.CharField(source='job.job_type')
+    experience_level = serializers.CharField(source='job.experience_level')
+    employment_type = serializers.CharField(source='job.employment_type')
+    remote_option = serializers.BooleanField(source='job.remote_option')
+    deadline = serializers.DateField(source='job.deadline')
+    created_at = serializers.DateTimeField(source='job.created_at')
+    score = serializers.IntegerField()
+    skill_score = serializers.IntegerField()
+    cf_score = serializers.FloatField(allow_null=True)
+    matched_skills = serializers.ListField(child=serializers.CharField())
+    explanation = serializers.CharField()
@@ -1,34 +1,180 @@
-from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.db.models import CharField, Subquery, Value
+from django.db.models.functions import Coalesce, Concat
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import JobPosting, Application, AuditLog
+from .auth import forget_user
+from .models import JobPosting, Application, AuditLog, Profile, SimilarJob, User
+from .recommender import bump_catalog_version, bump_skill_index_version, parse_skills, splice_job
+from .dedupe import index_job, promote_duplicate
+from .similarity import refresh_neighbours
+from .structured import locate, parse_salary
+from .skills import sync_job_skills, sync_profile_skills
+
+# Which saved fields each derived structure reads (see TracksSavedFields)
+DEDUPE_FIELDS = ("title", "company", "description")
+SKILL_FIELDS = ("skills_required", "skill_requirements")
+# a dedupe change can flip duplicate_of, so those fields count everywhere
+TOP_K_FIELDS = DEDUPE_FIELDS + ("deadline", "duplicate_of")
+SIMILARITY_FIELDS = DEDUPE_FIELDS + SKILL_FIELDS + ("duplicate_of",)
+
+
+def _log_user_id(user_id, origin):
+    # a posting or application removed because its user is being deleted
+    # can't point its log row at that user
+    return None if isinstance(origin, User) and origin.pk == user_id else user_id
+
+
+def _job_title(instance):
+    """The application's job title, as a subquery unless the job is already loaded."""
+    if Application.job.is_cached(instance):
+        return Value(instance.job.title)
+    title = JobPosting.objects.filter(pk=instance.job_id).values("title")[:1]
+    return Coalesce(Subquery(title), Value(""))
+
 
 # --- JobPosting logs ---
 @receiver(post_save, sender=JobPosting)
 def log_jobposting_save(sender, instance, created, **kwargs):
     action = "Created job" if created else "Updated job"
-    AuditLog.objects.create(user=instance.created_by, action=f"{action}: {instance.title}")
+    AuditLog.objects.create(user_id=instance.created_by_id, action=f"{action}: {instance.title}")
 
 @receiver(post_delete, sender=JobPosting)
-def log_jobposting_delete(sender, instance, **kwargs):
-    try:
-        user = instance.created_by
-    except Exception:
-        user = None  # if user is already deleted
-
+def log_jobposting_delete(sender, instance, origin=None, **kwargs):
     AuditLog.objects.create(
-        user=user,
+        user_id=_log_user_id(instance.created_by_id, origin),
         action=f"Deleted job: {instance.title}"
     )
 
 
 
 
+# --- Cached request.user (core.auth) ---
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, update_fields=None, **kwargs):
+    # nothing reads last_login from the cached copy; logins keep it warm
+    if update_fields != {"last_login"}:
+        forget_user(instance.pk)
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def forget_cached_profile_owner(sender, instance, **kwargs):
+    forget_user(instance.user_id)
+
+
+# --- Saved fields (compared against by the receivers below) ---
+@receiver(pre_save, sender=JobPosting)
+def load_saved_job_fields(sender, instance, **kwargs):
+    # postings loaded from the database already know; one built by hand
+    # with an existing pk is compared against its row
+    if instance.pk and not instance.knows_saved_fields():
+        saved = JobPosting.objects.filter(pk=instance.pk).values(*JobPosting.tracked_fields).first()
+        if saved is not None:
+            saved["duplicate_of_id"] = saved.pop("duplicate_of")
+            instance.remember_saved_fields(saved)
+
+
+# --- Structured salary and location ---
+@receiver(pre_save, sender=JobPosting)
+def structure_job_fields(sender, instance, **kwargs):
+    if instance.changed_fields("salary"):
+        instance.salary_min, instance.salary_max, instance.salary_currency = parse_salary(instance.salary)
+    if instance.changed_fields("location"):
+        instance.location_key, instance.latitude, instance.longitude = locate(instance.location)
+
+
+# --- Recommendation index ---
+@receiver(post_save, sender=JobPosting)
+@receiver(post_delete, sender=JobPosting)
+def invalidate_job_index(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=JobPosting)
+def update_top_k_on_save(sender, instance, created, **kwargs):
+    if created or instance.changed_fields(*TOP_K_FIELDS):
+        old_text = (instance.saved_value("description") or "").lower()
+        transaction.on_commit(lambda: splice_job(instance.pk, old_text))
+
+
+@receiver(post_delete, sender=JobPosting)
+def update_top_k_on_delete(sender, instance, **kwargs):
+    job_id, old_text = instance.pk, (instance.description or "").lower()
+    transaction.on_commit(lambda: splice_job(job_id, old_text))
+
+
+@receiver(post_save, sender=Profile)
+def profile_skills_changed(sender, instance, **kwargs):
+    if parse_skills(instance.skills) != parse_skills(instance.saved_value("skills")):
+        sync_profile_skills(instance)
+        bump_skill_index_version()
+
+
+@receiver(post_delete, sender=Profile)
+def drop_from_skill_index(sender, instance, **kwargs):
+    if parse_skills(instance.skills):
+        bump_skill_index_version()
+
+
+# --- Near-duplicate postings ---
+@receiver(post_save, sender=JobPosting)
+def detect_duplicate(sender, instance, created, **kwargs):
+    if created or instance.changed_fields(*DEDUPE_FIELDS):
+        index_job(instance)
+
+
+@receiver(pre_delete, sender=JobPosting)
+def remember_duplicates(sender, instance, **kwargs):
+    instance._duplicate_ids = list(instance.duplicates.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=JobPosting)
+def promote_first_duplicate(sender, instance, **kwargs):
+    if getattr(instance, "_duplicate_ids", None):
+        promoted = promote_duplicate(instance._duplicate_ids)
+        transaction.on_commit(lambda: (splice_job(promoted), refresh_neighbours(promoted)))
+
+
+# --- Normalized skills ---
+@receiver(post_save, sender=JobPosting)
+def job_skills_changed(sender, instance, created, **kwargs):
+    if any((instance.saved_value(field) or "") != (getattr(instance, field) or "") for field in SKILL_FIELDS):
+        sync_job_skills(instance)
+
+
+# --- Similar jobs ---
+@receiver(post_save, sender=JobPosting)
+def update_neighbours_on_save(sender, instance, created, **kwargs):
+    if created or instance.changed_fields(*SIMILARITY_FIELDS):
+        transaction.on_commit(lambda: refresh_neighbours(instance.pk))
+
+
+@receiver(pre_delete, sender=JobPosting)
+def remember_listing_jobs(sender, instance, **kwargs):
+    # the cascade removes these postings' rows for it before post_delete
+    instance._listed_by = list(SimilarJob.objects.filter(similar=instance).values_list("job_id", flat=True))
+
+
+@receiver(post_delete, sender=JobPosting)
+def update_neighbours_on_delete(sender, instance, **kwargs):
+    job_id, stale = instance.pk, getattr(instance, "_listed_by", ())
+    transaction.on_commit(lambda: refresh_neighbours(job_id, stale))
+
+
 # --- Application logs ---
 @receiver(post_save, sender=Application)
 def log_application_save(sender, instance, created, **kwargs):
     action = "Submitted application" if created else "Updated application"
-    AuditLog.objects.create(user=instance.user, action=f"{action} for job: {instance.job.title}")
+    AuditLog.objects.create(
+        user_id=instance.user_id,
+        action=Concat(Value(f"{action} for job: "), _job_title(instance), output_field=CharField()),
+    )
 
 @receiver(post_delete, sender=Application)
-def log_application_delete(sender, instance, **kwargs):
-    AuditLog.objects.create(user=instance.user, action=f"Withdrew application for job: {instance.job.title}")
+def log_application_delete(sender, instance, origin=None, **kwargs):
+    # a cascade from the posting runs before the posting's row is deleted
+    AuditLog.objects.create(
+        user_id=_log_user_id(instance.user_id, origin),
+        action=Concat(Value("Withdrew application for job: "), _job_title(instance), output_field=CharField()),
+    )
@@ -0,0 +1,267 @@
+import math
+import re
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Q
+
+from .models import JobPosting, SimilarJob
+from .recommender import _bump_version, _version, parse_skills
+
+# --------------------------------------------------
+# Similar postings
+# --------------------------------------------------
+# Every posting keeps its SIMILAR_JOBS_COUNT nearest neighbours as
+# SimilarJob rows (TF-IDF cosine over title, description and listed
+# skills), so job_detail reads them with one indexed query. A saved
+# posting is updated in the process's term index, scored only against the
+# postings sharing a term with it and spliced into their lists; lists that
+# lose an entry are recomputed for that posting alone. Other processes add
+# new postings to their index as they see them; a deletion or a full
+# rebuild bumps the term index version, which rebuilds every index. Edits
+# made elsewhere reach an index at its next rebuild.
+
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the to we will with you your".split()
+)
+TERM_INDEX_VERSION_KEY = "term_index"  # an IndexVersion row
+SKILL_BOOST = 2  # a listed skill counts twice as much as a word in the text
+MAX_DF = 0.5  # terms in more than half the catalog say nothing about similarity
+MIN_SIMILARITY = 0.05
+
+
+def neighbours_count():
+    return getattr(settings, "SIMILAR_JOBS_COUNT", 5)
+
+
+def job_terms(row):
+    text = f"{row['title']} {row['description']}".lower()
+    counts = Counter(term for term in TOKEN.findall(text) if term not in STOP_WORDS)
+    for skill in parse_skills(row["skills_required"]) + parse_skills(row["skill_requirements"]):
+        counts["skill:" + skill] += SKILL_BOOST
+    return counts
+
+
+def _rows():
+    return JobPosting.objects.filter(duplicate_of__isnull=True).values(
+        "id", "title", "description", "skills_required", "skill_requirements"
+    )
+
+
+class TermIndex:
+    """
+    Unit-length TF-IDF vectors per posting plus an inverted index over them.
+    Postings added or removed in place keep the IDF weights of the build.
+    """
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        counts = {row["id"]: job_terms(row) for row in rows}
+        self.total = len(counts)
+        self.df = Counter(term for terms in counts.values() for term in terms)
+        self.idf = {
+            term: self._idf(n)
+            for term, n in self.df.items()
+            if self.total < 10 or n <= MAX_DF * self.total
+        }
+        self.last_id = max(counts, default=0)
+
+        self.vectors = {}
+        self.postings = {}
+        for job_id, terms in counts.items():
+            self._insert(job_id, terms)
+
+    @classmethod
+    def build(cls, version=None):
+        return cls(_rows().iterator(), version=version)
+
+    def _idf(self, n):
+        return math.log((1 + self.total) / (1 + n)) + 1
+
+    def _insert(self, job_id, terms):
+        vector = {term: (1 + math.log(n)) * self.idf[term] for term, n in terms.items() if term in self.idf}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        vector = {term: w / norm for term, w in vector.items()}
+        self.vectors[job_id] = vector
+        for term, weight in vector.items():
+            self.postings.setdefault(term, {})[job_id] = weight
+
+    def discard(self, job_id):
+        for term in self.vectors.pop(job_id, {}):
+            del self.postings[term][job_id]
+
+    def add(self, row):
+        """Insert or replace one posting (a row of ``_rows()``)."""
+        job_id = row["id"]
+        if job_id in self.vectors:
+            self.discard(job_id)
+        else:
+            self.total += 1
+        terms = job_terms(row)
+        for term in terms:
+            if term not in self.df:
+                self.idf[term] = self._idf(1)
+            self.df[term] += 1
+        self._insert(job_id, terms)
+        self.last_id = max(self.last_id, job_id)
+
+    def catch_up(self, job_ids=()):
+        """
+        Add the postings created (by any process) since the index last looked,
+        and re-read ``job_ids``, dropping those deleted or marked duplicate.
+        """
+        found = set()
+        for row in _rows().filter(Q(id__gt=self.last_id) | Q(id__in=job_ids)):
+            self.add(row)
+            found.add(row["id"])
+        for job_id in set(job_ids) - found:
+            self.discard(job_id)
+
+    def similarities(self, job_id):
+        """{other_id: cosine} for every posting sharing a term with ``job_id``."""
+        scores = {}
+        for term, weight in self.vectors.get(job_id, {}).items():
+            for other, other_weight in self.postings[term].items():
+                if other != job_id:
+                    scores[other] = scores.get(other, 0.0) + weight * other_weight
+        return scores
+
+    def top(self, job_id, n):
+        return _top(self.similarities(job_id), n)
+
+
+def _rank(item):
+    score, job_id = item
+    return -score, job_id
+
+
+def _top(scores, n):
+    ranked = [(score, job_id) for job_id, score in scores.items() if score >= MIN_SIMILARITY]
+    ranked.sort(key=_rank)
+    return ranked[:n]
+
+
+def term_index_version():
+    """Opaque token that changes when every process must rebuild its term index."""
+    return _version(TERM_INDEX_VERSION_KEY)
+
+
+def bump_term_index_version():
+    _bump_version(TERM_INDEX_VERSION_KEY)
+
+
+_index = None
+_index_lock = threading.RLock()  # also held while a refresh reads and updates the index
+
+
+def get_term_index(job_ids=()):
+    """This process's term index, up to date with new postings and ``job_ids``."""
+    global _index
+    version = term_index_version()
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = TermIndex.build(version=version)
+        else:
+            _index.catch_up(job_ids)
+        return _index
+
+
+def _neighbours_version_key(job_id):
+    return f"core:neighbours_version:{job_id}"
+
+
+def neighbours_version(job_id):
+    """
+    Changes whenever ``job_id``'s stored list is rewritten (the rows get new
+    ids). Cached so a page-cache hit makes no queries; write_neighbours()
+    clears it on commit.
+    """
+    key = _neighbours_version_key(job_id)
+    version = cache.get(key)
+    if version is None:
+        version = SimilarJob.objects.filter(job_id=job_id).aggregate(last=Max("id"))["last"] or 0
+        cache.set(key, version, getattr(settings, "CATALOG_VERSION_CACHE_TIMEOUT", 10))
+    return version
+
+
+def write_neighbours(lists):
+    """Replace the stored lists for {job_id: [(score, similar_id), ...]}."""
+    with transaction.atomic():
+        SimilarJob.objects.filter(job_id__in=list(lists)).delete()
+        SimilarJob.objects.bulk_create(
+            SimilarJob(job_id=job_id, similar_id=similar_id, rank=rank, score=score)
+            for job_id, items in lists.items()
+            for rank, (score, similar_id) in enumerate(items)
+        )
+        keys = [_neighbours_version_key(job_id) for job_id in lists]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def refresh_neighbours(job_id, stale=()):
+    """
+    Update ``job_id`` in the term index, recompute its neighbours and splice
+    it into the lists of the postings it resembles. A deleted or duplicate
+    posting is dropped from every list. ``stale`` postings are recomputed
+    in full. Returns the number of lists rewritten.
+    """
+    with _index_lock:
+        return _refresh_neighbours(job_id, stale)
+
+
+def _refresh_neighbours(job_id, stale):
+    index = get_term_index((job_id,))
+    n = neighbours_count()
+    exists = job_id in index.vectors
+    scores = index.similarities(job_id) if exists else {}
+
+    lists = {job_id: _top(scores, n)} if exists else {}
+    recompute = {other for other in stale if other in index.vectors and other != job_id}
+    related = {other for other, score in scores.items() if score >= MIN_SIMILARITY}
+
+    current = {}
+    rows = SimilarJob.objects.filter(job_id__in=related | set(
+        SimilarJob.objects.filter(similar_id=job_id).values_list("job_id", flat=True)
+    )).order_by("job_id", "rank").values_list("job_id", "similar_id", "score")
+    for other, similar_id, score in rows:
+        current.setdefault(other, []).append((score, similar_id))
+
+    for other in (related | set(current)) - recompute - {job_id}:
+        items = current.get(other)
+        if not items or any(similar_id == job_id for _, similar_id in items):
+            # never computed, or the posting was already listed and may drop out
+            recompute.add(other)
+            continue
+        item = (scores[other], job_id)
+        if len(items) < n or _rank(item) < _rank(items[-1]):
+            lists[other] = sorted(items + [item], key=_rank)[:n]
+
+    for other in recompute:
+        lists[other] = index.top(other, n)
+
+    if lists:
+        write_neighbours(lists)  # new row ids change neighbours_version() for these pages
+    if not exists:
+        # other processes only pick up new postings in place; make them drop this one
+        bump_term_index_version()
+    return len(lists)
+
+
+def rebuild_all(batch_size=500):
+    """Recompute every posting's list; returns the number of postings."""
+    bump_term_index_version()  # fresh IDF weights, here and in every other process
+    index = get_term_index()
+    n = neighbours_count()
+    batch = {}
+    for job_id in index.vectors:
+        batch[job_id] = index.top(job_id, n)
+        if len(batch) >= batch_size:
+            write_neighbours(batch)
+            batch = {}
+    if batch:
+        write_neighbours(batch)
+    SimilarJob.objects.exclude(job_id__in=JobPosting.objects.values("id")).delete()
+    return len(index.vectors)
@@ -0,0 +1,88 @@
+import re
+
+from django.db.models import Count, Q
+
+from .models import JobPosting, Skill, SkillAlias
+
+# --------------------------------------------------
+# Normalized skills
+# --------------------------------------------------
+# The free-text skill fields stay what users and recruiters edit; on save
+# they are split, mapped through SkillAlias to canonical Skill rows and
+# stored on Profile.skill_tags / JobPosting.skill_tags, so skill lookups
+# are indexed joins instead of string scans.
+
+DEFAULT_ALIASES = {  # display name: aliases
+    "JavaScript": ["js", "java script", "ecmascript"],
+    "TypeScript": ["ts"],
+    "Python": ["python3", "py"],
+    "PostgreSQL": ["postgres", "psql"],
+    "React": ["react.js", "reactjs"],
+    "Node.js": ["node", "nodejs"],
+    "Machine Learning": ["ml"],
+    "Artificial Intelligence": ["ai"],
+    "Excel": ["ms excel", "microsoft excel"],
+    "C#": ["csharp", "c sharp"],
+    "C++": ["cpp"],
+    "Go": ["golang"],
+    "Kubernetes": ["k8s"],
+    "AWS": ["amazon web services"],
+    "UX Design": ["ux", "user experience"],
+    "UI Design": ["ui", "user interface"],
+}
+
+_SPACES = re.compile(r"\s+")
+
+
+def skill_names(text):
+    """[(name, display_name)] from comma-separated text, in order and without repeats."""
+    names = {}
+    for part in (text or "").split(","):
+        display = _SPACES.sub(" ", part).strip()
+        if display and len(display) <= 100:
+            names.setdefault(display.lower(), display)
+    return list(names.items())
+
+
+def resolve_skills(*texts):
+    """Canonical Skill rows for the skills listed in ``texts``, created as needed."""
+    names = {}
+    for text in texts:
+        for name, display in skill_names(text):
+            names.setdefault(name, display)
+    if not names:
+        return []
+
+    aliases = dict(SkillAlias.objects.filter(alias__in=names).values_list("alias", "skill__name"))
+    canonical = {}
+    for name, display in names.items():
+        canonical.setdefault(aliases.get(name, name), display)
+    Skill.objects.bulk_create(
+        [Skill(name=name, display_name=display) for name, display in canonical.items()],
+        ignore_conflicts=True,
+    )
+    return list(Skill.objects.filter(name__in=canonical))
+
+
+def sync_profile_skills(profile):
+    profile.skill_tags.set(resolve_skills(profile.skills))
+
+
+def sync_job_skills(job):
+    job.skill_tags.set(resolve_skills(job.skills_required, job.skill_requirements))
+
+
+def jobs_with_skills(text, jobs=None):
+    """
+    Postings tagged with any skill listed in ``text`` (aliases resolved),
+    annotated with ``skill_overlap`` and ordered by it, most overlap first.
+    Stays lazy (the aliases are a subquery), so async views can evaluate it.
+    """
+    names = [name for name, _ in skill_names(text)]
+    wanted = Skill.objects.filter(Q(name__in=names) | Q(aliases__alias__in=names)).values("id")
+    jobs = JobPosting.objects.all() if jobs is None else jobs
+    return (
+        jobs.filter(skill_tags__in=wanted)
+        .annotate(skill_overlap=Count("skill_tags", filter=Q(skill_tags__in=wanted)))
+        .order_by("-skill_overlap", "-created_at")
+    )
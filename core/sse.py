@@ -0,0 +1,136 @@
+import asyncio
+import json
+from http.cookies import SimpleCookie
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import aget_user
+from django.http import HttpRequest
+
+from .models import Notification
+from .pubsub import subscribe, unsubscribe
+
+# --------------------------------------------------
+# Live notification stream (Server-Sent Events)
+# --------------------------------------------------
+# Django's ASGI handler gives every request its own thread for sync
+# middleware, and that thread lives as long as the request does, so an
+# idle SSE connection served through it pins a thread. NotificationStreamApp
+# answers the stream path directly in the event loop (session auth + one
+# backlog query), which keeps an idle connection down to a coroutine and a
+# queue. It marks the scope of every other request it passes on, and pages
+# only open the stream for requests carrying that mark (see
+# notification_stream_context); under WSGI nothing opens it.
+
+HEARTBEAT = 20  # seconds between keep-alive comments
+BACKLOG = 20
+STREAM_SCOPE_KEY = "core.notification_stream"  # set to the stream path by NotificationStreamApp
+
+
+def sse_event(payload):
+    return f"id: {payload['id']}\nevent: notification\ndata: {json.dumps(payload)}\n\n"
+
+
+def parse_last_id(value):
+    value = value or ""
+    return int(value) if value.isdigit() else None
+
+
+async def notification_events(user_id, last_id=None):
+    """Unread backlog after ``last_id``, then live notifications and heartbeats."""
+    # subscribe before reading the backlog so nothing falls in between
+    sub = subscribe(user_id)
+    try:
+        yield "retry: 5000\n\n"
+        backlog = Notification.objects.filter(user_id=user_id, is_read=False)
+        if last_id is not None:
+            backlog = backlog.filter(id__gt=last_id)
+        sent_up_to = last_id or 0
+        rows = [n async for n in backlog.order_by("-id")[:BACKLOG]]
+        for n in reversed(rows):
+            sent_up_to = max(sent_up_to, n.id)
+            yield sse_event({"id": n.id, "message": n.message, "created_at": n.created_at.isoformat()})
+
+        while True:
+            try:
+                payload = await sub.get(HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if payload["id"] > sent_up_to:
+                yield sse_event(payload)
+    finally:
+        unsubscribe(sub)
+
+
+def notification_stream_context(request):
+    """Template context processor: the stream URL, when NotificationStreamApp serves it."""
+    scope = getattr(request, "scope", None) or {}
+    return {"notification_stream_url": scope.get(STREAM_SCOPE_KEY)}
+
+
+async def _authenticated_user_id(scope):
+    cookies = SimpleCookie()
+    for name, value in scope.get("headers", []):
+        if name == b"cookie":
+            cookies.load(value.decode("latin-1"))
+    morsel = cookies.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return None
+    request = HttpRequest()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore(morsel.value)
+    user = await aget_user(request)
+    return user.pk if user.is_authenticated else None
+
+
+class NotificationStreamApp:
+    """ASGI app serving ``path`` itself and passing everything else to ``app``."""
+
+    def __init__(self, app, path="/notifications/stream/"):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path or scope["method"] != "GET":
+            if scope["type"] == "http":
+                scope = {**scope, STREAM_SCOPE_KEY: self.path}
+            return await self.app(scope, receive, send)
+
+        user_id = await _authenticated_user_id(scope)
+        if user_id is None:
+            await send({"type": "http.response.start", "status": 401, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers = dict(scope.get("headers", []))
+        query = dict(
+            part.split("=", 1) for part in scope.get("query_string", b"").decode().split("&") if "=" in part
+        )
+        last_id = parse_last_id(headers.get(b"last-event-id", b"").decode() or query.get("last_id"))
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+
+        async def stream():
+            async for chunk in notification_events(user_id, last_id):
+                await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+
+        async def wait_for_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        stream_task = asyncio.ensure_future(stream())
+        disconnect_task = asyncio.ensure_future(wait_for_disconnect())
+        try:
+            await asyncio.wait({stream_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (stream_task, disconnect_task):
+                task.cancel()
+            await asyncio.gather(stream_task, disconnect_task, return_exceptions=True)
@@ -0,0 +1,338 @@
+import math
+import re
+import threading
+import unicodedata
+from pathlib import Path
+
+from django.db.models import FloatField, Q
+from django.db.models.functions import ACos, Cos, Least, Radians, Sin
+
+# --------------------------------------------------
+# Structured salary and location
+# --------------------------------------------------
+# JobPosting.salary and .location stay the free text recruiters type. On
+# save (core.signals) they are parsed into indexed columns: salary_min /
+# salary_max as yearly amounts plus salary_currency, and location_key plus
+# latitude / longitude from the gazetteer bundled in core/data (no network
+# lookups). Listings, the API and recommendations filter on those columns
+# with salary ranges, a place and a radius around a place.
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / "data" / "gazetteer.tsv"
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+DEFAULT_RADIUS_KM = 50
+MAX_RADIUS_KM = 1000
+LOCATION_KEY_LENGTH = 100
+
+
+# --------------------------------------------------
+# Salary
+# --------------------------------------------------
+CURRENCY_SYMBOLS = (("us$", "USD"), ("c$", "CAD"), ("a$", "AUD"), ("$", "USD"), ("£", "GBP"), ("€", "EUR"), ("₹", "INR"))
+CURRENCY_WORDS = {
+    "usd": "USD", "dollars": "USD", "pkr": "PKR", "rs": "PKR", "rupees": "PKR", "inr": "INR",
+    "aed": "AED", "dirhams": "AED", "sar": "SAR", "riyals": "SAR", "qar": "QAR", "eur": "EUR",
+    "euros": "EUR", "gbp": "GBP", "pounds": "GBP", "cad": "CAD", "aud": "AUD",
+}
+MULTIPLIERS = {
+    "k": 1_000, "m": 1_000_000, "mn": 1_000_000, "million": 1_000_000,
+    "lac": 100_000, "lacs": 100_000, "lakh": 100_000, "lakhs": 100_000,
+    "crore": 10_000_000, "crores": 10_000_000,
+}
+MIN_YEARLY_SALARY = 1_000
+# pay per period → per year (40-hour weeks, 260 working days)
+PERIODS = (
+    (re.compile(r"hour|/\s*hr?\b|\bph\b"), 2080),
+    (re.compile(r"\bday\b|daily|/\s*d\b"), 260),
+    (re.compile(r"week"), 52),
+    (re.compile(r"month|/\s*mo\b|\bpm\b|p\.m\."), 12),
+)
+
+_AMOUNT = re.compile(r"(\d(?:[\d,.]*\d)?)\s*(k|mn|m|million|lacs?|lakhs?|crores?)?\b", re.IGNORECASE)
+_DOTTED_THOUSANDS = re.compile(r"\d{1,3}(?:\.\d{3})+")
+_RANGE_GAP = re.compile(r"\s*(?:-|–|—|to)\s*(?:[^\w\s]{1,2}|[a-z]{2,3}\.?)?\s*")
+_WORD = re.compile(r"[a-z]+")
+_UP_TO = re.compile(r"up\s*to|upto|max|under|below|<")
+_FROM = re.compile(r"from|min|starting|at\s*least|\+|>")
+
+
+def _currency(text):
+    for symbol, code in CURRENCY_SYMBOLS:
+        if symbol in text:
+            return code
+    for word in _WORD.findall(text):
+        if word in CURRENCY_WORDS:
+            return CURRENCY_WORDS[word]
+    return ""
+
+
+def _amounts(text):
+    amounts = []
+    previous_end = None
+    for match in _AMOUNT.finditer(text):
+        digits, suffix = match[1], match[2] or ""
+        if not suffix and _DOTTED_THOUSANDS.fullmatch(digits):
+            digits = digits.replace(".", "")  # 50.000
+        try:
+            value = float(digits.replace(",", ""))
+        except ValueError:
+            continue
+        multiplier = MULTIPLIERS.get(suffix.lower(), 1)
+        if (
+            multiplier > 1 and amounts and amounts[-1][1] == 1 and amounts[-1][0] < 1000
+            and _RANGE_GAP.fullmatch(text[previous_end:match.start()])
+        ):
+            amounts[-1] = (amounts[-1][0], multiplier)  # "50-70k"
+        amounts.append((value, multiplier))
+        previous_end = match.end()
+    return amounts
+
+
+def parse_salary(text):
+    """
+    (min, max, currency) from free text such as "$50,000 - $70,000",
+    "50-70k", "PKR 1.5 lakh per month" or "up to €60k". Amounts are per
+    year and either bound can be None; (None, None, "") when there is no
+    amount.
+    """
+    text = (text or "").strip().lower()
+    per_year = next((factor for pattern, factor in PERIODS if pattern.search(text)), 1)
+    values = [round(value * multiplier * per_year) for value, multiplier in _amounts(text)]
+    # "3-5 years exp, 100k": numbers too small to be a yearly pay are something else
+    values = [value for value in values if value >= MIN_YEARLY_SALARY][:2]
+    if not values:
+        return None, None, ""
+
+    if len(values) == 2:
+        low, high = sorted(values)
+    elif _UP_TO.search(text):
+        low, high = None, values[0]
+    elif _FROM.search(text):
+        low, high = values[0], None
+    else:
+        low = high = values[0]
+    return low, high, _currency(text)
+
+
+def salary_q(at_least=None, at_most=None):
+    """
+    Postings whose advertised range reaches ``at_least`` and starts at or
+    below ``at_most`` (yearly amounts). An open bound counts as its other end.
+    """
+    q = Q()
+    if at_least is not None:
+        q &= Q(salary_max__gte=at_least) | Q(salary_max__isnull=True, salary_min__gte=at_least)
+    if at_most is not None:
+        q &= Q(salary_min__lte=at_most) | Q(salary_min__isnull=True, salary_max__lte=at_most)
+    return q
+
+
+def salary_bounds(low, high):
+    """The (top, bottom) ``salary_q`` compares against, for in-memory filtering."""
+    return (high if high is not None else low), (low if low is not None else high)
+
+
+# --------------------------------------------------
+# Location
+# --------------------------------------------------
+COUNTRIES = {
+    "pakistan": "PK", "india": "IN", "uae": "AE", "united arab emirates": "AE", "qatar": "QA",
+    "saudi arabia": "SA", "ksa": "SA", "kuwait": "KW", "bahrain": "BH", "oman": "OM", "turkey": "TR",
+    "turkiye": "TR", "iran": "IR", "egypt": "EG", "jordan": "JO", "israel": "IL", "lebanon": "LB",
+    "bangladesh": "BD", "afghanistan": "AF", "sri lanka": "LK", "nepal": "NP", "singapore": "SG",
+    "malaysia": "MY", "indonesia": "ID", "thailand": "TH", "philippines": "PH", "vietnam": "VN",
+    "china": "CN", "taiwan": "TW", "south korea": "KR", "korea": "KR", "japan": "JP",
+    "uk": "GB", "united kingdom": "GB", "england": "GB", "scotland": "GB", "ireland": "IE",
+    "france": "FR", "germany": "DE", "netherlands": "NL", "belgium": "BE", "switzerland": "CH",
+    "austria": "AT", "czech republic": "CZ", "czechia": "CZ", "poland": "PL", "hungary": "HU",
+    "spain": "ES", "portugal": "PT", "italy": "IT", "sweden": "SE", "norway": "NO", "denmark": "DK",
+    "finland": "FI", "greece": "GR", "romania": "RO", "ukraine": "UA", "russia": "RU",
+    "usa": "US", "us": "US", "united states": "US", "america": "US", "canada": "CA", "mexico": "MX",
+    "brazil": "BR", "argentina": "AR", "colombia": "CO", "chile": "CL", "peru": "PE",
+    "nigeria": "NG", "kenya": "KE", "south africa": "ZA", "morocco": "MA", "ghana": "GH",
+    "australia": "AU", "new zealand": "NZ",
+}
+_PARTS = re.compile(r"[,;/|()]|\s-\s")
+_NON_WORD = re.compile(r"[\W_]+")
+_POINT = re.compile(r"\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*")
+
+
+def normalize_location(text):
+    """Lowercase words without accents or punctuation: "São Paulo, BR" → "sao paulo br"."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+class Place:
+    __slots__ = ("key", "name", "country", "latitude", "longitude")
+
+    def __init__(self, name, country, latitude, longitude):
+        self.name = name
+        self.country = country
+        self.latitude = latitude
+        self.longitude = longitude
+        self.key = f"{normalize_location(name).replace(' ', '-')}-{country.lower()}"
+
+    def __repr__(self):
+        return f"<Place {self.key}>"
+
+
+_gazetteer = None  # normalized name or alias: [Place], first row first
+_gazetteer_lock = threading.Lock()
+
+
+def gazetteer():
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                names = {}
+                with open(GAZETTEER_PATH, encoding="utf-8") as rows:
+                    for line in rows:
+                        if line.startswith("#") or line.startswith("name\t") or not line.strip():
+                            continue
+                        name, country, latitude, longitude, aliases = line.rstrip("\n").split("\t")
+                        place = Place(name, country, float(latitude), float(longitude))
+                        for alias in [name, *aliases.split("|")]:
+                            if alias.strip():
+                                names.setdefault(normalize_location(alias), []).append(place)
+                _gazetteer = names
+    return _gazetteer
+
+
+def _pick(places, countries):
+    for place in places:
+        if place.country in countries:
+            return place
+    return places[0]
+
+
+def resolve_location(text):
+    """
+    The gazetteer place ``text`` names, or None. Each comma-separated part
+    is tried whole, then by its words ("DHA Phase 5 Lahore"); a country
+    in the text picks between places sharing a name.
+    """
+    names = gazetteer()
+    parts = [normalize_location(part) for part in _PARTS.split(text or "")]
+    parts = [part for part in parts if part]
+    codes = {place.country for places in names.values() for place in places}
+    countries = {COUNTRIES.get(part) or (part.upper() if part.upper() in codes else None) for part in parts}
+
+    for part in parts:
+        if part in names:
+            return _pick(names[part], countries)
+    for part in parts:
+        words = part.split()
+        for size in (3, 2, 1):
+            for start in range(len(words) - size + 1):
+                places = names.get(" ".join(words[start:start + size]))
+                if places:
+                    return _pick(places, countries)
+    return None
+
+
+def locate(text):
+    """(location_key, latitude, longitude) for a posting's location text."""
+    place = resolve_location(text)
+    if place is not None:
+        return place.key, place.latitude, place.longitude
+    return normalize_location(text)[:LOCATION_KEY_LENGTH], None, None
+
+
+def parse_point(text):
+    """(latitude, longitude) from "lat,lon" or a place name; None if it is neither."""
+    match = _POINT.fullmatch(text or "")
+    if match:
+        latitude, longitude = float(match[1]), float(match[2])
+        if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+            return latitude, longitude
+        return None
+    place = resolve_location(text)
+    return None if place is None else (place.latitude, place.longitude)
+
+
+def parse_radius(raw):
+    try:
+        radius = float(raw)
+    except (TypeError, ValueError):
+        return DEFAULT_RADIUS_KM
+    return min(max(radius, 0.0), MAX_RADIUS_KM)
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance (haversine)."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """((min_lat, max_lat), (min_lon, max_lon) or None) enclosing the circle; None when it wraps the antimeridian."""
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    lon_range = (longitude - dlon, longitude + dlon)
+    if lon_range[0] < -180 or lon_range[1] > 180:
+        lon_range = None
+    return (latitude - dlat, latitude + dlat), lon_range
+
+
+def within_radius(jobs, latitude, longitude, radius_km):
+    """
+    ``jobs`` within ``radius_km`` of the point, annotated with distance_km.
+    The bounding box narrows on the (latitude, longitude) index first; the
+    exact distance is only computed for the rows inside it.
+    """
+    lat_range, lon_range = bounding_box(latitude, longitude, radius_km)
+    jobs = jobs.filter(latitude__range=lat_range)
+    if lon_range is not None:
+        jobs = jobs.filter(longitude__range=lon_range)
+    phi = math.radians(latitude)
+    cosine = (
+        math.sin(phi) * Sin(Radians("latitude"))
+        + math.cos(phi) * Cos(Radians("latitude")) * Cos(Radians("longitude") - math.radians(longitude))
+    )
+    distance = EARTH_RADIUS_KM * ACos(Least(cosine, 1.0, output_field=FloatField()))
+    return jobs.annotate(distance_km=distance).filter(distance_km__lte=radius_km)
+
+
+# --------------------------------------------------
+# Search parameters
+# --------------------------------------------------
+def parse_amount(raw):
+    try:
+        return int(float(raw)) if raw not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def filter_jobs(jobs, params):
+    """
+    Apply the structured parameters of a search to ``jobs``: salary_min /
+    salary_max (yearly amounts), salary_currency, location (a place, or a
+    substring match for text the gazetteer doesn't know) and near + radius
+    in km, which orders the result by distance.
+    """
+    q = salary_q(parse_amount(params.get("salary_min")), parse_amount(params.get("salary_max")))
+    if q:
+        jobs = jobs.filter(q)
+    if params.get("salary_currency"):
+        jobs = jobs.filter(salary_currency=params["salary_currency"].strip().upper())
+
+    location = (params.get("location") or "").strip()
+    if location:
+        place = resolve_location(location)
+        if place is not None:
+            # the text match keeps multi-place postings ("Lahore / Karachi") whose key is another place
+            jobs = jobs.filter(Q(location_key=place.key) | Q(location__icontains=location))
+        else:
+            jobs = jobs.filter(location__icontains=location)
+
+    if params.get("near"):
+        point = parse_point(params["near"])
+        if point is None:
+            return jobs.none()
+        jobs = within_radius(jobs, *point, parse_radius(params.get("radius"))).order_by("distance_km", "-created_at")
+    return jobs
@@ -0,0 +1,95 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import PasswordResetCode, Notification
+
+logger = logging.getLogger(__name__)
+
+# --------------------------------------------------
+# Expired-data sweeper
+# --------------------------------------------------
+# Deletes in small primary-key batches, each its own statement, so the
+# write lock is only ever held for one short DELETE at a time.
+
+
+def delete_in_batches(queryset, batch_size=1000):
+    model = queryset.model
+    total = 0
+    while True:
+        ids = list(queryset.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return total
+        deleted, _ = model.objects.filter(pk__in=ids).delete()
+        total += deleted
+
+
+def _sessions_in_db():
+    engine = settings.SESSION_ENGINE
+    return engine.endswith(".db") or engine.endswith(".cached_db")
+
+
+def sweep(batch_size=1000, notification_days=None):
+    """Delete expired reset codes, old read notifications and expired sessions; return counts."""
+    now = timezone.now()
+    if notification_days is None:
+        notification_days = getattr(settings, "NOTIFICATION_RETENTION_DAYS", 30)
+
+    counts = {
+        "password_reset_codes": delete_in_batches(
+            PasswordResetCode.objects.filter(created_at__lt=now - PasswordResetCode.TTL), batch_size
+        ),
+        "notifications": delete_in_batches(
+            Notification.objects.filter(is_read=True, created_at__lt=now - timedelta(days=notification_days)),
+            batch_size,
+        ),
+        "sessions": 0,
+    }
+    if _sessions_in_db():
+        counts["sessions"] = delete_in_batches(Session.objects.filter(expire_date__lt=now), batch_size)
+    return counts
+
+
+class SweeperThread(threading.Thread):
+    """Daemon thread that runs sweep() every ``interval`` seconds."""
+
+    def __init__(self, interval, batch_size=1000):
+        super().__init__(name="core-sweeper", daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                counts = sweep(batch_size=self.batch_size)
+                logger.info("Sweeper reclaimed %s", counts)
+            except Exception:
+                logger.exception("Sweeper run failed")
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self.stopped.set()
+
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def start_sweeper():
+    """Start the in-process sweeper once if SWEEPER_INTERVAL (seconds) is set."""
+    global _thread
+    interval = getattr(settings, "SWEEPER_INTERVAL", None)
+    if not interval:
+        return None
+    with _thread_lock:
+        if _thread is None:
+            _thread = SweeperThread(interval, getattr(settings, "SWEEPER_BATCH_SIZE", 1000))
+            _thread.start()
+    return _thread
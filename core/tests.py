@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.forms.models import model_to_dict
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .forms import JobForm
+from .models import Application, JobPosting, User
+
+
+@override_settings(RATELIMIT_ENABLED=False)
+class WriteQueryCountTests(TestCase):
+    """
+    Queries behind the write paths, signal receivers and on-commit work
+    included. Each test starts with a cold cache, so its first request also
+    loads the user; check_write_queries runs the edits back to back.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.seeker = User.objects.create_user("seeker", password="queries")
+        self.admin = User.objects.create_user("admin", password="queries", is_staff=True)
+        self.job = JobPosting.objects.create(
+            title="Backend developer", description="Python developer", company="Acme",
+            location="Remote", skills_required="python, django", created_by=self.admin,
+        )
+        # a neighbour, so the description edit rewrites similar-jobs lists
+        JobPosting.objects.create(
+            title="Django developer", description="Django and Python developer", company="Beta",
+            location="Remote", skills_required="python, django", created_by=self.admin,
+        )
+        self.client.defaults["SERVER_NAME"] = "localhost"
+        form = model_to_dict(self.job, fields=JobForm._meta.fields)
+        self.form = {key: "" if value is None else value for key, value in form.items()}
+
+    def post(self, queries, path, data=None):
+        with self.assertNumQueries(queries), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(path, data or {})
+        self.assertEqual(response.status_code, 302)
+        return response
+
+    def test_login(self):
+        self.post(9, reverse("login"), {"username": "seeker", "password": "queries"})
+        self.assertEqual(int(self.client.session["_auth_user_id"]), self.seeker.pk)
+
+    def test_apply(self):
+        self.client.force_login(self.seeker)
+        self.post(6, reverse("apply_job", args=[self.job.id]))
+        self.assertTrue(Application.objects.filter(user=self.seeker, job=self.job).exists())
+
+    def test_edit_job_salary(self):
+        self.client.force_login(self.admin)
+        self.post(6, reverse("edit_job", args=[self.job.id]), {**self.form, "salary": "50000"})
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.salary_min, 50000)
+
+    def test_edit_job_description(self):
+        self.client.force_login(self.admin)
+        self.post(20, reverse("edit_job", args=[self.job.id]), {
+            **self.form, "salary": "50000", "description": "Django developer",
+        })
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.description, "Django developer")
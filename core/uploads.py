@@ -0,0 +1,154 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# --------------------------------------------------
+# Profile upload pipeline
+# --------------------------------------------------
+# Uploads are spooled to a temporary file chunk by chunk and dropped as
+# soon as they pass their field's size limit. Accepted files are stored
+# under their SHA-256 (<upload_to>/<ab>/<hash><ext>), so identical files
+# share one copy on disk. Profile pictures get small WebP thumbnails,
+# rendered on a thread pool after the request commits; their names embed
+# the content hash, so browsers may cache them forever.
+
+DEFAULT_SIZE_LIMITS = {"profile_picture": 5 * 1024 * 1024, "resume": 10 * 1024 * 1024}
+THUMBNAIL_SIZES = {"1x": 120, "2x": 240}  # the profile page shows a 120px avatar
+THUMBNAIL_DIR = "thumbs"
+HASH_CHUNK = 64 * 1024
+
+_HASHED_NAME = re.compile(r"^[0-9a-f]{64}$")
+THUMBNAIL_NAME = re.compile(r"^[0-9a-f]{64}_\d+\.webp$")
+
+
+def upload_limit(field_name):
+    limits = {**DEFAULT_SIZE_LIMITS, **getattr(settings, "UPLOAD_SIZE_LIMITS", {})}
+    return limits.get(field_name, getattr(settings, "UPLOAD_MAX_SIZE", 10 * 1024 * 1024))
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream every upload to disk and stop reading a file once it exceeds
+    its field's limit. Rejected fields are listed on request.rejected_uploads
+    so the form can report them.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.limit = upload_limit(field_name)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.limit:
+            self.file.close()  # removes the temporary file
+            if self.request is not None:
+                if not hasattr(self.request, "rejected_uploads"):
+                    self.request.rejected_uploads = {}
+                self.request.rejected_uploads[self.field_name] = self.limit
+            raise SkipFile
+        return super().receive_data_chunk(raw_data, start)
+
+
+def content_hash(fileobj):
+    digest = hashlib.sha256()
+    for chunk in fileobj.chunks(HASH_CHUNK):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_deduplicated(fileobj, directory, extension):
+    """Save ``fileobj`` under its content hash; returns the storage name."""
+    digest = content_hash(fileobj)
+    name = f"{directory}/{digest[:2]}/{digest}{extension}"
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, fileobj)
+        if saved != name:  # identical copy written concurrently
+            default_storage.delete(saved)
+    return name
+
+
+def is_deduplicated(name):
+    return bool(_HASHED_NAME.match(os.path.splitext(os.path.basename(name or ""))[0]))
+
+
+def thumbnail_name(picture_name, size):
+    digest = os.path.splitext(os.path.basename(picture_name))[0]
+    return f"{THUMBNAIL_DIR}/{digest}_{size}.webp"
+
+
+def render_thumbnails(picture_name):
+    """Write the missing WebP thumbnails for a stored picture."""
+    missing = {
+        size: thumbnail_name(picture_name, size)
+        for size in THUMBNAIL_SIZES.values()
+        if not default_storage.exists(thumbnail_name(picture_name, size))
+    }
+    if not missing:
+        return
+    with default_storage.open(picture_name, "rb") as fh, Image.open(fh) as image:
+        largest = max(missing)
+        image.draft("RGB", (largest, largest))  # JPEG: decode at reduced scale
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+        for size, name in sorted(missing.items(), reverse=True):
+            image.thumbnail((size, size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, "WEBP", quality=80, method=4)
+            saved = default_storage.save(name, ContentFile(buffer.getvalue()))
+            if saved != name:
+                default_storage.delete(saved)
+
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def _render_in_background(picture_name):
+    try:
+        render_thumbnails(picture_name)
+    except Exception:
+        logger.exception("Thumbnail rendering failed for %s", picture_name)
+    finally:
+        with _lock:
+            _pending.discard(picture_name)
+
+
+def schedule_thumbnails(picture_name):
+    """Queue thumbnail rendering on the worker pool (once per picture at a time)."""
+    global _executor
+    with _lock:
+        if picture_name in _pending:
+            return None
+        _pending.add(picture_name)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "THUMBNAIL_WORKERS", 2), thread_name_prefix="thumbnails"
+            )
+    return _executor.submit(_render_in_background, picture_name)
+
+
+def thumbnail_urls(picture_name):
+    """{"1x": url, "2x": url} for a deduplicated picture, or None until they exist."""
+    if not is_deduplicated(picture_name):
+        return None
+    names = {density: thumbnail_name(picture_name, size) for density, size in THUMBNAIL_SIZES.items()}
+    if not all(default_storage.exists(name) for name in names.values()):
+        schedule_thumbnails(picture_name)
+        return None
+    return {density: default_storage.url(name) for density, name in names.items()}
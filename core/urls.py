@@ -1,18 +1,22 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+# read-heavy pages: async variants under ASGI (see settings.ASYNC_VIEWS)
+pages = async_views if settings.ASYNC_VIEWS else views
 from django.contrib.auth import views as auth_views
 
 urlpatterns = [
     # ---------- Public ----------
-    path('', views.home, name='home'),
+    path('', pages.home, name='home'),
     path('register/', views.register, name='register'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
 
     # ---------- Jobs ----------
-    path('jobs/', views.job_list, name='job_list'),
+    path('jobs/', pages.job_list, name='job_list'),
     path('apply/<int:job_id>/', views.apply_job, name='apply_job'),
-    path('recommendations/', views.recommendations, name='recommendations'),
+    path('recommendations/', pages.recommendations, name='recommendations'),
 
     # ---------- Admin ----------
     path('admin-login/', views.admin_login, name='admin_login'),
@@ -24,7 +28,15 @@ urlpatterns = [
 
     # ---------- Admin applications and users ----------
     path('admin/update-status/<int:app_id>/<str:status>/', views.update_application_status, name='update_application_status'),
+    path('admin/applications/bulk-status/', views.bulk_update_application_status, name='bulk_update_application_status'),
     path('admin/users/', views.admin_users, name='admin_users'),
+    path('admin/audit-logs/', views.audit_logs, name='audit_logs'),
+    path('admin/export/applications/', views.export_applications, name='export_applications'),
+    path('admin/export/users/', views.export_users, name='export_users'),
+    path('admin/audit-logs/export/', views.export_audit_logs, name='export_audit_logs'),
+    path('admin/profiling/', views.profiling_list, name='profiling_list'),
+    path('admin/profiling/<int:record_id>/', views.profiling_detail, name='profiling_detail'),
+    path('admin/profiling/<int:record_id>/stacks.folded', views.profiling_stacks, name='profiling_stacks'),
 
     # ---------- User Profile & Applications ----------
     path('profile/', views.profile, name='profile'),
@@ -32,7 +44,9 @@ urlpatterns = [
     path('my-applications/', views.my_applications, name='my_applications'),
     path('my-bookmarks/', views.my_bookmarks, name='my_bookmarks'),
     path('bookmark/<int:job_id>/', views.bookmark_job, name='bookmark_job'),
-    path('jobs/<int:job_id>/', views.job_detail, name='job_detail'),
+    path('jobs/<int:job_id>/', pages.job_detail, name='job_detail'),
+    path('media/thumbs/<str:name>', views.thumbnail, name='thumbnail'),
+    path('notifications/stream/', views.notification_stream, name='notification_stream'),
 
     path('forgot-password/', views.forgot_password, name='forgot_password'),
 path('verify-code/', views.verify_code, name='verify_code'),
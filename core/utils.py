@@ -1,9 +1,35 @@
-from django.core.mail import send_mail
-from .models import Notification
+import time
+
+from django.core.cache import cache
+from django.core.mail import send_mail, send_mass_mail
+from django.db import IntegrityError, transaction
+from .models import Notification, Application, Bookmark, JobPosting, AuditLog
+from .pubsub import publish
+
+IDEMPOTENCY_TTL = 60 * 60 * 24
+IDEMPOTENCY_PENDING = "core:idempotency:pending"
+IDEMPOTENCY_PENDING_TTL = 60  # a claim left by a crashed worker expires
+IDEMPOTENCY_WAIT = 10
+
+
+def _notification_payload(notification):
+    return {
+        "id": notification.id,
+        "message": notification.message,
+        "created_at": notification.created_at.isoformat(),
+    }
+
+
+def _publish_after_commit(notifications):
+    # deliver to open notification streams once the rows are visible
+    payloads = [(n.user_id, _notification_payload(n)) for n in notifications if n.pk]
+    transaction.on_commit(lambda: [publish(user_id, payload) for user_id, payload in payloads])
+
 
 def notify_user(user, message, email_subject=None):
     # In-app notification
-    Notification.objects.create(user=user, message=message)
+    notification = Notification.objects.create(user=user, message=message)
+    _publish_after_commit([notification])
 
     # Email notification
     if email_subject:
@@ -14,3 +40,146 @@ def notify_user(user, message, email_subject=None):
             recipient_list=[user.email],
             fail_silently=True,
         )
+
+
+def notify_users(notifications, email_subject=None):
+    """Batch form of notify_user: ``notifications`` is a list of (user, message)."""
+    created = Notification.objects.bulk_create([
+        Notification(user=user, message=message) for user, message in notifications
+    ])
+    _publish_after_commit(created)
+
+    if email_subject:
+        send_mass_mail(
+            [
+                (email_subject, message, "noreply@accessjobs.com", [user.email])
+                for user, message in notifications
+                if user.email
+            ],
+            fail_silently=True,
+        )
+
+
+# --------------------------------------------------
+# Single-statement writes for apply / bookmark
+# --------------------------------------------------
+# The unique_together constraints do the duplicate check: the INSERT either
+# lands or fails on the constraint, so a double click can't race between a
+# SELECT and the INSERT. The job is only looked up on the failure path.
+def _ensure_job_exists(job_id):
+    if not JobPosting.objects.filter(id=job_id).exists():
+        raise JobPosting.DoesNotExist
+
+
+def submit_application(user, job_id):
+    """Apply ``user`` to the job; returns False if they had already applied."""
+    try:
+        with transaction.atomic():
+            Application.objects.create(job_id=job_id, user=user)
+        return True
+    except IntegrityError:
+        _ensure_job_exists(job_id)
+        return False
+
+
+def set_bookmark(user, job_id, save=None):
+    """
+    Bookmark (save=True), remove (save=False) or toggle (save=None).
+    Returns (bookmarked, changed).
+    """
+    if save is not True:
+        deleted, _ = Bookmark.objects.filter(user=user, job_id=job_id).delete()
+        if deleted or save is False:
+            return False, bool(deleted)
+    try:
+        with transaction.atomic():
+            Bookmark.objects.create(user=user, job_id=job_id)
+        return True, True
+    except IntegrityError:
+        _ensure_job_exists(job_id)
+        return True, False
+
+
+class RequestInProgress(Exception):
+    """Another request with the same idempotency key has not finished yet."""
+
+
+def idempotent(request, scope, func):
+    """
+    Run ``func`` once per Idempotency-Key header (or ``idempotency_key`` form
+    field) and replay its result for retries with the same key. The first
+    request claims the key with cache.add(); concurrent ones wait for its
+    result and raise RequestInProgress if it takes longer than
+    IDEMPOTENCY_WAIT seconds.
+    """
+    key = request.headers.get("Idempotency-Key") or request.POST.get("idempotency_key")
+    if not key:
+        return func()
+    cache_key = f"core:idempotency:{request.user.pk}:{scope}:{key}"
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT
+    while not cache.add(cache_key, IDEMPOTENCY_PENDING, IDEMPOTENCY_PENDING_TTL):
+        result = cache.get(cache_key)
+        if result is not None and result != IDEMPOTENCY_PENDING:
+            return result
+        if time.monotonic() >= deadline:
+            raise RequestInProgress
+        time.sleep(0.05)  # the key vanishing means the first attempt failed; claim it again
+    try:
+        result = func()
+    except BaseException:
+        cache.delete(cache_key)
+        raise
+    cache.set(cache_key, result, IDEMPOTENCY_TTL)
+    return result
+
+
+# --------------------------------------------------
+# Bulk application status change
+# --------------------------------------------------
+def bulk_set_application_status(app_ids, status, actor=None):
+    """
+    Move many applications to ``status`` with one UPDATE, write their audit
+    rows with one INSERT and notify applicants in one batch. Returns a
+    per-id result: "updated", "unchanged" or "not_found". The rows are
+    locked while they are read, so a concurrent change can't slip in
+    between the read and the UPDATE.
+    """
+    results = {}
+    changed = []
+    with transaction.atomic():
+        apps = {
+            app.id: app
+            for app in Application.objects.filter(id__in=app_ids)
+            .select_for_update(of=("self",))
+            .select_related("user", "job")
+            .only("id", "status", "user__id", "user__username", "user__email", "job__id", "job__title")
+        }
+        for app_id in app_ids:
+            app = apps.get(app_id)
+            if app is None:
+                results[app_id] = "not_found"
+            elif app.status == status:
+                results[app_id] = "unchanged"
+            else:
+                results[app_id] = "updated"
+                changed.append(app)
+
+        if not changed:
+            return results
+
+        Application.objects.filter(id__in=[app.id for app in changed]).update(status=status)
+        # update() skips post_save, so write what log_application_save would have
+        AuditLog.objects.bulk_create([
+            AuditLog(
+                user=app.user,
+                action=f"Updated application for job: {app.job.title}",
+                extra_data={"status": status, "previous_status": app.status, "by": getattr(actor, "pk", None)},
+            )
+            for app in changed
+        ])
+
+    notify_users(
+        [(app.user, f"Your application for '{app.job.title}' is now {status}.") for app in changed],
+        email_subject="Application status update",
+    )
+    return results
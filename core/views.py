@@ -5,11 +5,33 @@ from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db.models import Count, Q
 from .forms import RegisterForm, JobForm, UserUpdateForm, ProfileForm
-from .models import User, JobPosting, Application, Profile, Bookmark
+from .models import User, JobPosting, Application, Profile, Bookmark, AuditLog
 import random
 from django.core.mail import send_mail
 from django.conf import settings
 from .models import PasswordResetCode
+from .recommender import recommend_jobs, parse_filters, top_k_size
+from .skills import jobs_with_skills
+from .structured import filter_jobs
+from .caching import anonymous_page_cache
+from .similarity import neighbours_version
+from .routers import read_replica
+from .utils import submit_application, set_bookmark, idempotent, bulk_set_application_status, RequestInProgress
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse, FileResponse
+from django.core.files.storage import default_storage
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from .uploads import THUMBNAIL_DIR, THUMBNAIL_NAME
+from django.views.decorators.http import require_POST
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.utils.dateparse import parse_date
+from .audit import iter_archived_lines, iter_live_lines
+from .exports import streaming_export, CHUNK_SIZE as EXPORT_CHUNK_SIZE
+from .ratelimit import ratelimit
+from .sse import notification_events, parse_last_id
+from . import profiling
+import json
 from django.utils import timezone
 
 # --------------------------------------------------
@@ -18,17 +40,62 @@ from django.utils import timezone
 def is_admin(user):
     return user.is_authenticated and (user.is_staff or user.is_superuser)
 
+# --------------------------------------------------
+# Helper: AJAX callers get JSON instead of a redirect
+# --------------------------------------------------
+def wants_json(request):
+    return (
+        request.headers.get("x-requested-with") == "XMLHttpRequest"
+        or "application/json" in request.headers.get("accept", "")
+    )
+
+# --------------------------------------------------
+# Helpers shared with the async variants in async_views.py
+# --------------------------------------------------
+def user_job_ids(user, job_id=None):
+    """Applied / bookmarked job-id querysets for a job seeker; (None, None) for staff and guests."""
+    if not user.is_authenticated or user.is_staff:
+        return None, None
+    applied = Application.objects.filter(user=user)
+    bookmarked = Bookmark.objects.filter(user=user)
+    if job_id is not None:
+        applied, bookmarked = applied.filter(job_id=job_id), bookmarked.filter(job_id=job_id)
+    return applied.values_list("job_id", flat=True), bookmarked.values_list("job_id", flat=True)
+
+def search_jobs(params):
+    jobs = JobPosting.objects.filter(duplicate_of__isnull=True).order_by("-created_at")
+    if params.get("q"):
+        jobs = jobs.filter(Q(title__icontains=params["q"]) | Q(description__icontains=params["q"]))
+    if params.get("company"):
+        jobs = jobs.filter(company__icontains=params["company"])
+    # salary range, location and near/radius (ordered by distance)
+    jobs = filter_jobs(jobs, params)
+    if params.get("skill"):
+        return jobs_with_skills(params["skill"], jobs)
+    return jobs
+
+def similar_jobs(job_id):
+    """Open postings precomputed as similar to ``job_id`` (core.similarity), closest first."""
+    today = timezone.localdate()
+    return (
+        JobPosting.objects.filter(neighbour_of__job_id=job_id, duplicate_of__isnull=True)
+        .filter(Q(deadline__isnull=True) | Q(deadline__gte=today))
+        .only("id", "title", "company", "location", "job_type")
+        .order_by("neighbour_of__rank")
+    )
+
 # --------------------------------------------------
 # Home Page
 # --------------------------------------------------
+@anonymous_page_cache
 def home(request):
-    jobs = JobPosting.objects.all().order_by('-created_at')[:5]
-
-    applied_ids = []
-    if request.user.is_authenticated and not request.user.is_staff:
-        applied_ids = Application.objects.filter(user=request.user).values_list("job_id", flat=True)
-
-    return render(request, "core/home.html", {"jobs": jobs, "applied_ids": applied_ids})
+    jobs = JobPosting.objects.filter(duplicate_of__isnull=True).order_by('-created_at')[:5]
+    applied_ids, bookmarked_ids = user_job_ids(request.user)
+    return render(request, "core/home.html", {
+        "jobs": jobs,
+        "applied_ids": set(applied_ids or ()),
+        "bookmarked_ids": set(bookmarked_ids or ()),
+    })
 
 # --------------------------------------------------
 # Register
@@ -47,6 +114,7 @@ def register(request):
 # --------------------------------------------------
 # Login View
 # --------------------------------------------------
+@ratelimit("login", "10/m", fields=("username",))
 def login_view(request):
     if request.method == "POST":
         form = AuthenticationForm(request, data=request.POST)
@@ -84,6 +152,7 @@ def admin_login(request):
 # --------------------------------------------------
 @login_required
 @user_passes_test(is_admin)
+@read_replica
 def admin_dashboard(request):
     total_users = User.objects.filter(is_staff=False).count()
     total_jobs = JobPosting.objects.count()
@@ -166,47 +235,168 @@ def admin_users(request):
     return render(request, "core/admin_users.html", {"users": users})
 
 # --------------------------------------------------
-# Job List (for all users) with search
+# Admin – Audit Logs (paginated viewer)
 # --------------------------------------------------
-def job_list(request):
-    query = request.GET.get("q", "")
-    location = request.GET.get("location", "")
-    company = request.GET.get("company", "")
+@login_required
+@user_passes_test(is_admin)
+def audit_logs(request):
+    logs = AuditLog.objects.select_related("user").order_by("-created_at", "-id")
+    page = Paginator(logs, 50).get_page(request.GET.get("page"))
+    return render(request, "core/audit_logs.html", {"logs": page, "page_obj": page})
+
+# --------------------------------------------------
+# Admin – Audit Logs streaming export (JSON lines)
+# --------------------------------------------------
+@login_required
+@user_passes_test(is_admin)
+def export_audit_logs(request):
+    since = parse_date(request.GET.get("since") or "")
+    until = parse_date(request.GET.get("until") or "")
+
+    logs = AuditLog.objects.all()
+    if since:
+        logs = logs.filter(created_at__date__gte=since)
+    if until:
+        logs = logs.filter(created_at__date__lte=until)
+
+    def lines():
+        if request.GET.get("include_archived"):
+            yield from iter_archived_lines(since, until)
+        yield from iter_live_lines(logs)
 
-    jobs = JobPosting.objects.all()
+    response = StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+    response["Content-Disposition"] = 'attachment; filename="audit-logs.jsonl"'
+    return response
 
-    if query:
-        jobs = jobs.filter(Q(title__icontains=query) | Q(description__icontains=query))
-    if location:
-        jobs = jobs.filter(location__icontains=location)
-    if company:
-        jobs = jobs.filter(company__icontains=company)
+# --------------------------------------------------
+# Admin – Request profiles (slowest first)
+# --------------------------------------------------
+@login_required
+@user_passes_test(is_admin)
+def profiling_list(request):
+    return render(request, "core/profiling_list.html", {
+        "profiles": profiling.profiles(),
+        "enabled": profiling.profiling_enabled(),
+        "sample_rate": profiling.sample_rate(),
+        "slow_ms": profiling.slow_ms(),
+    })
 
-    jobs = jobs.order_by("-created_at")
+@login_required
+@user_passes_test(is_admin)
+def profiling_detail(request, record_id):
+    record = profiling.get_profile(record_id)
+    if record is None:
+        raise Http404("That profile has been overwritten.")
+    top_frames = {}
+    for stack, count in record["stacks"].items():
+        leaf = stack.rsplit(";", 1)[-1]
+        top_frames[leaf] = top_frames.get(leaf, 0) + count
+    return render(request, "core/profiling_detail.html", {
+        "record": record,
+        "top_frames": sorted(top_frames.items(), key=lambda item: -item[1])[:20],
+    })
 
-    applied_ids = []
-    if request.user.is_authenticated and not request.user.is_staff:
-        applied_ids = Application.objects.filter(user=request.user).values_list("job_id", flat=True)
+@login_required
+@user_passes_test(is_admin)
+def profiling_stacks(request, record_id):
+    record = profiling.get_profile(record_id)
+    if record is None:
+        raise Http404("That profile has been overwritten.")
+    response = HttpResponse(profiling.folded(record), content_type="text/plain; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="request-{record_id}.folded"'
+    return response
+
+# --------------------------------------------------
+# Admin – Streaming CSV / XLSX exports
+# --------------------------------------------------
+def _export_filters(request, date_field, prefix=""):
+    filters = {}
+    job = request.GET.get("job")
+    status = request.GET.get("status")
+    since = parse_date(request.GET.get("since") or "")
+    until = parse_date(request.GET.get("until") or "")
+    if job and job.isdigit():
+        filters[f"{prefix}job_id"] = int(job)
+    if status in dict(Application.STATUS_CHOICES):
+        filters[f"{prefix}status"] = status
+    if since:
+        filters[f"{date_field}__date__gte"] = since
+    if until:
+        filters[f"{date_field}__date__lte"] = until
+    return filters
+
+@login_required
+@user_passes_test(is_admin)
+def export_applications(request):
+    columns = [
+        ("ID", "id"), ("Username", "user__username"), ("Email", "user__email"),
+        ("Job ID", "job_id"), ("Job", "job__title"), ("Company", "job__company"),
+        ("Status", "status"), ("Applied At", "applied_at"),
+    ]
+    rows = (
+        Application.objects.filter(**_export_filters(request, "applied_at"))
+        .order_by("id")
+        .values_list(*[field for _, field in columns])
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return streaming_export("applications", [label for label, _ in columns], rows, request.GET.get("format"))
+
+@login_required
+@user_passes_test(is_admin)
+def export_users(request):
+    columns = [
+        ("ID", "id"), ("Username", "username"), ("Email", "email"), ("Date Joined", "date_joined"),
+        ("Phone", "profile__phone"), ("Location", "profile__location"),
+        ("Skills", "profile__skills"), ("Experience", "profile__experience"),
+    ]
+    users = User.objects.filter(is_staff=False).filter(
+        **_export_filters(request, "date_joined", prefix="applications__")
+    )
+    if request.GET.get("job") or request.GET.get("status"):
+        users = users.distinct()
+    rows = users.order_by("id").values_list(*[field for _, field in columns]).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return streaming_export("users", [label for label, _ in columns], rows, request.GET.get("format"))
+
+# --------------------------------------------------
+# Job List (for all users) with search
+# --------------------------------------------------
+@anonymous_page_cache
+@read_replica
+def job_list(request):
+    jobs = search_jobs(request.GET)
+    applied_ids, bookmarked_ids = user_job_ids(request.user)
 
     return render(request, "core/job_list.html", {
         "jobs": jobs,
-        "query": query,
-        "location": location,
-        "company": company,
-        "applied_ids": applied_ids,
+        "query": request.GET.get("q", ""),
+        "location": request.GET.get("location", ""),
+        "company": request.GET.get("company", ""),
+        "skill": request.GET.get("skill", ""),
+        "applied_ids": set(applied_ids or ()),
+        "bookmarked_ids": set(bookmarked_ids or ()),
     })
 
 # --------------------------------------------------
 # Apply for Job
 # --------------------------------------------------
+IN_PROGRESS_MESSAGE = "A request with this idempotency key is still being processed; retry shortly."
+
+
 @login_required
 def apply_job(request, job_id):
-    job = get_object_or_404(JobPosting, id=job_id)
-    if Application.objects.filter(job=job, user=request.user).exists():
-        messages.info(request, "You have already applied for this job.")
-    else:
-        Application.objects.create(job=job, user=request.user)
+    try:
+        created = idempotent(request, f"apply:{job_id}", lambda: submit_application(request.user, job_id))
+    except JobPosting.DoesNotExist:
+        raise Http404("No JobPosting matches the given query.")
+    except RequestInProgress:
+        return HttpResponse(IN_PROGRESS_MESSAGE, status=409)
+
+    if wants_json(request):
+        return JsonResponse({"job_id": job_id, "applied": True, "created": created})
+    if created:
         messages.success(request, "Your application has been submitted.")
+    else:
+        messages.info(request, "You have already applied for this job.")
     return redirect("job_list")
 
 # --------------------------------------------------
@@ -222,51 +412,57 @@ def update_application_status(request, app_id, status):
         messages.success(request, f"Application marked as {status.capitalize()}.")
     return redirect("admin_dashboard")
 
+# --------------------------------------------------
+# Admin – Bulk Update Application Status
+# --------------------------------------------------
+@login_required
+@user_passes_test(is_admin)
+@require_POST
+def bulk_update_application_status(request):
+    if request.content_type == "application/json":
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"error": "Invalid JSON."}, status=400)
+        status, raw_ids = payload.get("status"), payload.get("ids") or []
+    else:
+        status, raw_ids = request.POST.get("status"), request.POST.getlist("ids")
+
+    try:
+        app_ids = list(dict.fromkeys(int(i) for i in raw_ids))
+    except (TypeError, ValueError):
+        app_ids = None
+    if status not in dict(Application.STATUS_CHOICES) or not app_ids:
+        if wants_json(request) or request.content_type == "application/json":
+            return JsonResponse({"error": "Provide a valid status and at least one application id."}, status=400)
+        messages.error(request, "Select at least one application and a valid status.")
+        return redirect("admin_dashboard")
+
+    results = bulk_set_application_status(app_ids, status, actor=request.user)
+
+    if wants_json(request) or request.content_type == "application/json":
+        return JsonResponse({"status": status, "results": {str(k): v for k, v in results.items()}})
+    updated = sum(1 for r in results.values() if r == "updated")
+    messages.success(request, f"{updated} application(s) marked as {status.capitalize()}.")
+    return redirect("admin_dashboard")
+
 # --------------------------------------------------
 # AI-Powered Job Recommendations
 # --------------------------------------------------
 @login_required
+@read_replica
 def recommendations(request):
     user = request.user
-    profile = getattr(user, "profile", None)
-    if not profile or not profile.skills:
-        return render(request, "core/recommendations.html", {
-            "recommendations": [],
-            "applied_ids": [],
-            "bookmarked_ids": [],
-        })
-
-    skills = [s.strip().lower() for s in profile.skills.split(",") if s.strip()]
-    if not skills:
-        return render(request, "core/recommendations.html", {
-            "recommendations": [],
-            "applied_ids": [],
-            "bookmarked_ids": [],
-        })
-
-    recommendations = []
-    all_jobs = JobPosting.objects.all()
-
-    for job in all_jobs:
-        job_desc = job.description.lower() if job.description else ""
-        matched_skills = [skill for skill in skills if skill in job_desc]
-        if matched_skills:
-            score = min(100, 50 + 10 * len(matched_skills))
-            explanation = "Matched skills: " + ", ".join([s.capitalize() for s in matched_skills])
-            recommendations.append({
-                "job": job,
-                "score": score,
-                "explanation": explanation,
-            })
-
-    recommendations.sort(key=lambda x: x["score"], reverse=True)
-    applied_ids = Application.objects.filter(user=user).values_list("job_id", flat=True)
-    bookmarked_ids = Bookmark.objects.filter(user=user).values_list("job_id", flat=True)
+    filters = parse_filters(request.GET)
+    recommendations, facet_counts = recommend_jobs(user, filters, limit=top_k_size())
+    applied_ids, bookmarked_ids = user_job_ids(user)
 
     return render(request, "core/recommendations.html", {
         "recommendations": recommendations,
-        "applied_ids": applied_ids,
-        "bookmarked_ids": bookmarked_ids,
+        "applied_ids": set(applied_ids or ()),
+        "bookmarked_ids": set(bookmarked_ids or ()),
+        "filters": filters,
+        "facet_counts": facet_counts,
     })
 
 # --------------------------------------------------
@@ -275,7 +471,7 @@ def recommendations(request):
 @login_required
 def profile(request):
     profile = getattr(request.user, "profile", None)
-    skills = profile.skills.split(",") if profile and profile.skills else []
+    skills = profile.skill_tags.order_by("display_name") if profile else []
     return render(request, "core/profile.html", {"profile": profile, "skills": skills})
 
 # --------------------------------------------------
@@ -286,10 +482,13 @@ def edit_profile(request):
     profile = getattr(request.user, 'profile', None)
     if request.method == "POST":
         user_form = UserUpdateForm(request.POST, instance=request.user)
-        profile_form = ProfileForm(request.POST, request.FILES, instance=profile)
+        profile_form = ProfileForm(
+            request.POST, request.FILES, instance=profile,
+            rejected_uploads=getattr(request, "rejected_uploads", None),
+        )
         if user_form.is_valid() and profile_form.is_valid():
-            user_form.save()
             profile_form.save()
+            user_form.save()
             messages.success(request, "Your profile has been updated successfully.")
             return redirect("profile")
         messages.error(request, "Please correct the errors below.")
@@ -299,6 +498,24 @@ def edit_profile(request):
 
     return render(request, "core/profile_edit.html", {"user_form": user_form, "profile_form": profile_form})
 
+# --------------------------------------------------
+# Profile picture thumbnails (content-addressed, so cacheable forever)
+# --------------------------------------------------
+def thumbnail(request, name):
+    if not THUMBNAIL_NAME.match(name):
+        raise Http404
+    etag = quote_etag(name)
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
+    path = f"{THUMBNAIL_DIR}/{name}"
+    if not default_storage.exists(path):
+        raise Http404
+    response = FileResponse(default_storage.open(path, "rb"), content_type="image/webp")
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
 # --------------------------------------------------
 # My Applications
 # --------------------------------------------------
@@ -321,33 +538,71 @@ def my_bookmarks(request):
 # --------------------------------------------------
 @login_required
 def bookmark_job(request, job_id):
-    job = get_object_or_404(JobPosting, id=job_id)
-    bookmark, created = Bookmark.objects.get_or_create(user=request.user, job=job)
-    if not created:
-        bookmark.delete()
-        messages.info(request, f"Removed bookmark for '{job.title}'.")
+    # action=save / action=remove are idempotent; no action toggles
+    action = request.POST.get("action") or request.GET.get("action")
+    save = {"save": True, "remove": False}.get(action)
+    try:
+        bookmarked, changed = idempotent(
+            request, f"bookmark:{job_id}", lambda: set_bookmark(request.user, job_id, save)
+        )
+    except JobPosting.DoesNotExist:
+        raise Http404("No JobPosting matches the given query.")
+    except RequestInProgress:
+        return HttpResponse(IN_PROGRESS_MESSAGE, status=409)
+
+    if wants_json(request):
+        return JsonResponse({"job_id": job_id, "bookmarked": bookmarked, "changed": changed})
+    if bookmarked:
+        messages.success(request, "Job bookmarked successfully!")
     else:
-        messages.success(request, f"Bookmarked '{job.title}' successfully!")
+        messages.info(request, "Bookmark removed.")
     return redirect('job_list')
 
 from django.contrib.auth.decorators import login_required
 
+@anonymous_page_cache(version=neighbours_version)
 def job_detail(request, job_id):
     job = get_object_or_404(JobPosting, id=job_id)
-    applied_ids = []
-    if request.user.is_authenticated:
-        applied_ids = Application.objects.filter(user=request.user).values_list('job_id', flat=True)
-    return render(request, "core/job_detail.html", {"job": job, "applied_ids": applied_ids})
+    applied_ids, bookmarked_ids = user_job_ids(request.user, job_id)
+    return render(request, "core/job_detail.html", {
+        "job": job,
+        "similar_jobs": similar_jobs(job_id),
+        "applied_ids": set(applied_ids or ()),
+        "bookmarked_ids": set(bookmarked_ids or ()),
+    })
+
+# --------------------------------------------------
+# Live notifications (Server-Sent Events)
+# --------------------------------------------------
+# Under ASGI, accessjobs.asgi answers this path with core.sse.NotificationStreamApp
+# before Django's handler, and pages only open the stream when it does. This view
+# only runs for a bare ASGI handler; under WSGI the endless stream would hold the
+# worker and never flush, so it answers 204, which stops EventSource reconnecting.
+async def notification_stream(request):
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+
+    last_id = parse_last_id(request.headers.get("Last-Event-ID") or request.GET.get("last_id"))
+    response = StreamingHttpResponse(notification_events(user.pk, last_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 # --------------------------------------------------
 # Forgot Password - send 5-digit code
 # --------------------------------------------------
+@ratelimit("forgot_password", "5/h", fields=("email",))
 def forgot_password(request):
     if request.method == "POST":
         email = request.POST.get("email")
         try:
             user = User.objects.get(email=email)
             code = f"{random.randint(10000, 99999)}"
+            # only the newest code is ever checked, so drop the older ones
+            PasswordResetCode.objects.filter(user=user).delete()
             PasswordResetCode.objects.create(user=user, code=code)
 
             # Send email